@@ -0,0 +1,185 @@
+"""
+Dashboard time-to-first-render: parquet reads vs the Arrow IPC hot cache,
+on a cold and a warm host.
+
+Renders dashboard/app.py headlessly with Streamlit's AppTest against the
+project's processed data. Before every render the Streamlit data cache is
+cleared, as on a new session or a Refresh click. "cold" also evicts the
+data files from the OS page cache first (posix_fadvise DONTNEED, no root
+needed); "warm" reads them from memory. The same comparison is made for
+the raw reads alone: the overview plus the detail columns of every symbol.
+
+    python -m benchmarks.dashboard_benchmark --runs 5
+
+The hot cache is published into a temporary directory, so nothing under
+data/ is written.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+import src.storage.hot_cache as hot_cache
+from src.storage.dataset import PROCESSED_DIR, list_symbols, read_symbol
+from src.storage.hot_cache import DETAIL_COLUMNS, hot_path, latest_path, read_hot
+from src.transform.generate_signals import LATEST_SIGNALS_FILE
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARK_DIR.parent
+APP_FILE = PROJECT_ROOT / "dashboard/app.py"
+RESULTS_FILE = BENCHMARK_DIR / "results/dashboard.json"
+
+RUNS = 5
+RENDER_TIMEOUT = 120
+
+
+# ----------------------------
+# PAGE CACHE
+# ----------------------------
+def evict(paths: list) -> bool:
+    """
+    Drop the files from the OS page cache. False where the platform has no
+    posix_fadvise, in which case cold runs are skipped.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def data_files() -> list:
+    files = list(PROCESSED_DIR.rglob("*.parquet"))
+    return files + list(hot_cache.HOT_CACHE_DIR.rglob("*.arrow"))
+
+
+# ----------------------------
+# MEASUREMENTS
+# ----------------------------
+def read_parquet_views(symbols: list) -> int:
+    rows = len(pd.read_parquet(LATEST_SIGNALS_FILE))
+    for symbol in symbols:
+        rows += len(read_symbol("signals", symbol, columns=DETAIL_COLUMNS).sort_values("Date"))
+    return rows
+
+
+def read_hot_views(symbols: list) -> int:
+    rows = len(read_hot(latest_path()))
+    for symbol in symbols:
+        rows += len(read_hot(hot_path(symbol)))
+    return rows
+
+
+def render_once() -> float:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    st.cache_data.clear()
+    app = AppTest.from_file(str(APP_FILE), default_timeout=RENDER_TIMEOUT)
+
+    start = time.perf_counter()
+    app.run()
+    seconds = time.perf_counter() - start
+
+    if app.exception:
+        raise RuntimeError(f"Dashboard raised: {app.exception[0].message}")
+    return seconds
+
+
+def timed(func, runs: int, cold: bool) -> dict:
+    samples = []
+    for _ in range(runs):
+        if cold:
+            evict(data_files())
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        "runs": runs,
+    }
+
+
+def run_benchmark(runs: int = RUNS, render: bool = True) -> dict:
+    symbols = list_symbols("signals")
+    if not symbols or not LATEST_SIGNALS_FILE.exists():
+        raise SystemExit("No signal data: run the pipeline first")
+
+    can_evict = evict([])
+    if not can_evict:
+        logger.warning("posix_fadvise not available, only warm runs are measured")
+    temperatures = ["cold", "warm"] if can_evict else ["warm"]
+
+    results = {"symbols": len(symbols), "reads": {}, "first_render": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = hot_cache.HOT_CACHE_DIR
+        hot_cache.HOT_CACHE_DIR = Path(tmp)
+        try:
+            hot_cache.sync_hot_cache()
+            hot_cache.publish_latest(pd.read_parquet(LATEST_SIGNALS_FILE))
+
+            sources = {
+                "parquet": ("0", lambda: read_parquet_views(symbols)),
+                "hot_cache": ("1", lambda: read_hot_views(symbols)),
+            }
+
+            for source, (flag, read) in sources.items():
+                os.environ["DASHBOARD_HOT_CACHE"] = flag
+                read()      # imports and first-touch allocations
+
+                for temperature in temperatures:
+                    key = f"{source}/{temperature}"
+                    results["reads"][key] = timed(read, runs, temperature == "cold")
+                    logger.info(f"reads {key}: {results['reads'][key]}")
+
+                    if render:
+                        render_once()
+                        results["first_render"][key] = timed(
+                            render_once, runs, temperature == "cold"
+                        )
+                        logger.info(f"render {key}: {results['first_render'][key]}")
+        finally:
+            hot_cache.HOT_CACHE_DIR = original_dir
+            os.environ.pop("DASHBOARD_HOT_CACHE", None)
+
+    results["recorded_at"] = pd.Timestamp.now(tz="UTC").isoformat()
+    return results
+
+
+def print_report(results: dict):
+    print(f"\nSymbols: {results['symbols']}")
+    for section in ["reads", "first_render"]:
+        if not results[section]:
+            continue
+        print(f"\n{section:<24}{'median ms':>12}{'min ms':>12}")
+        for key, r in results[section].items():
+            print(f"{key:<24}{r['median_ms']:>12.1f}{r['min_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard first-render benchmark")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--reads-only", action="store_true", help="Skip the AppTest renders")
+    parser.add_argument("--output", type=Path, default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs, render=not args.reads_only)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print_report(results)
@@ -0,0 +1,58 @@
+"""
+Throughput of the per-symbol process-pool executor on a synthetic
+universe: every task builds a symbol's price history and runs the fused
+prices -> signals transform on it. Nothing is read from or written to disk.
+
+    python -m benchmarks.executor_benchmark [--symbols 500] [--workers 1 2 4]
+"""
+
+import argparse
+import os
+
+import pandas as pd
+from loguru import logger
+
+from src.ingestion.price_provider import synthetic_ohlcv
+from src.pipeline.executor import run_per_symbol
+from src.transform.fused_transform import transform_prices
+
+HISTORY = pd.bdate_range("2018-01-01", "2026-01-09", name="Date")
+
+
+def transform_synthetic(symbol: str) -> int:
+    df = synthetic_ohlcv(symbol, HISTORY).reset_index()
+    return len(transform_prices(df))
+
+
+def run_benchmark(n_symbols: int = 500, workers: list = None):
+    symbols = [f"SYN{i:04d}.NS" for i in range(n_symbols)]
+    workers = workers or sorted({1, 2, os.cpu_count() or 1})
+
+    # Keep the per-task worker logs out of the report
+    logger.remove()
+    logger.add(lambda message: None)
+
+    print(f"\n{n_symbols} synthetic symbols, {len(HISTORY)} bars each, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'seconds':>10}{'symbols/s':>12}{'speedup':>10}")
+
+    baseline = None
+    for n in workers:
+        start = pd.Timestamp.now()
+        results = run_per_symbol(transform_synthetic, symbols, max_workers=n, label="benchmark")
+        seconds = (pd.Timestamp.now() - start).total_seconds()
+
+        failed = sum(not r.ok for r in results.values())
+        baseline = baseline or seconds
+        print(
+            f"{n:>8}{seconds:>10.2f}{n_symbols / seconds:>12.1f}{baseline / seconds:>9.2f}x"
+            + (f"  ({failed} failed)" if failed else "")
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-symbol executor scaling benchmark")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="*", default=None)
+    args = parser.parse_args()
+
+    run_benchmark(args.symbols, args.workers)
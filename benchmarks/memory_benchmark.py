@@ -0,0 +1,91 @@
+"""
+Bytes per row of the signal table with the original dtypes (object
+strings, int64, float64) versus the compact schema, in memory and as
+parquet on disk.
+
+    python -m benchmarks.memory_benchmark [--symbols N]
+"""
+
+import argparse
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from src.storage.dataset import ROW_GROUP_SIZE, list_symbols, read_table
+from src.storage.schema import CATEGORY_COLUMNS, FLOAT32_COLUMNS, INTEGER_COLUMNS
+
+
+def legacy_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The signal table as it was stored before the schema layer.
+    """
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype("object")
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("int64")
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float64")
+    return df
+
+
+def parquet_bytes(frames: list) -> int:
+    total = 0
+    for df in frames:
+        buffer = io.BytesIO()
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False),
+            buffer,
+            row_group_size=ROW_GROUP_SIZE
+        )
+        total += buffer.tell()
+    return total
+
+
+def measure(frames: list) -> dict:
+    rows = sum(len(df) for df in frames)
+    memory = sum(df.memory_usage(deep=True).sum() for df in frames)
+    return {
+        "rows": rows,
+        "memory_per_row": memory / rows,
+        "disk_per_row": parquet_bytes(frames) / rows,
+    }
+
+
+def run_benchmark(n_symbols: int = None):
+    symbols = list_symbols("signals")[:n_symbols]
+
+    if not symbols:
+        logger.error("No signal parquet files found")
+        return
+
+    # One frame per symbol, like the files and the dashboard detail view
+    compact = [read_table("signals", symbols=[s]) for s in symbols]
+    legacy = [legacy_dtypes(df) for df in compact]
+
+    before = measure(legacy)
+    after = measure(compact)
+
+    print(f"\nSignal table: {len(symbols)} symbols, {after['rows']} rows")
+    print(f"{'':<10}{'memory B/row':>14}{'parquet B/row':>15}")
+    for name, result in [("before", before), ("after", after)]:
+        print(f"{name:<10}{result['memory_per_row']:>14.1f}{result['disk_per_row']:>15.1f}")
+    print(
+        f"{'saved':<10}"
+        f"{1 - after['memory_per_row'] / before['memory_per_row']:>14.0%}"
+        f"{1 - after['disk_per_row'] / before['disk_per_row']:>15.0%}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signal table memory benchmark")
+    parser.add_argument("--symbols", type=int, default=None, help="Limit to the first N symbols")
+    args = parser.parse_args()
+
+    run_benchmark(args.symbols)
@@ -0,0 +1,388 @@
+"""
+Offline benchmark of every pipeline stage on synthetic data.
+
+Generates a deterministic OHLCV universe and headline set, runs each stage
+on it inside a temporary data directory and records seconds, rows/sec and
+peak traced memory per stage. Results are saved as JSON and compared with
+a stored baseline; stages slower or larger than the baseline by more than
+the tolerance are flagged and the exit code is 1.
+
+    python -m benchmarks.pipeline_benchmark --symbols 50 --years 8 --headlines 5
+    python -m benchmarks.pipeline_benchmark --save-baseline
+
+No network access is needed: prices come from synthetic_ohlcv and
+headlines from templates. Sentiment needs the local VADER lexicon and is
+skipped when it is missing.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import src.storage.dataset as dataset
+from src.backtest.backtest_signals import backtest
+from src.ingestion.price_provider import synthetic_ohlcv
+from src.storage.dataset import read_symbol, read_table, write_frame, write_symbol
+from src.transform.build_price_features import add_price_features
+from src.transform.classify_market_regime import classify_regime
+from src.transform.generate_signals import LATEST_SIGNAL_COLUMNS, generate_signals
+from src.transform.normalize_and_save_parquet import normalize_price_frame
+from src.validation.validate_prices import check_prices
+from src.visualization.chart_data import line_chart_data, ohlc_chart_data
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+RESULTS_FILE = BENCHMARK_DIR / "results/latest.json"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+
+# Allowed slowdown / memory growth against the baseline. Changes below the
+# absolute floors are timer or allocator noise and never count.
+TOLERANCE = 0.25
+MIN_SECONDS_DELTA = 0.02
+MIN_MB_DELTA = 1.0
+
+# Timed runs per stage; the fastest one is reported
+REPEAT = 3
+
+END_DATE = "2026-01-09"
+
+# Columns the dashboard overview and detail view read (see dashboard/app.py)
+OVERVIEW_COLUMNS = ["Date", "symbol", "market_regime", "signal_label", "signal_strength"]
+DETAIL_COLUMNS = [
+    "Date", "Open", "High", "Low", "Close", "sma_20", "sma_50",
+    "market_regime", "signal_label"
+]
+
+
+# ----------------------------
+# SYNTHETIC DATA
+# ----------------------------
+HEADLINE_SUBJECTS = ["shares", "stock", "Q3 results", "board", "management", "outlook"]
+HEADLINE_EVENTS = [
+    "surge after strong earnings", "fall on weak guidance", "remain flat ahead of results",
+    "hit record high", "slump as margins shrink", "rally on buyback news",
+    "face regulatory probe", "beat analyst estimates", "miss revenue targets",
+]
+
+
+def synthetic_prices(n_symbols: int, years: int) -> dict:
+    """
+    Raw price frames as fetch_prices stores them: typed Date and OHLCV.
+    """
+    dates = pd.bdate_range(end=END_DATE, periods=252 * years, name="Date")
+    frames = {}
+    for i in range(n_symbols):
+        symbol = f"SYN{i:04d}.NS"
+        df = synthetic_ohlcv(symbol, dates).reset_index()
+        df["symbol"] = symbol
+        frames[symbol] = df
+    return frames
+
+
+def synthetic_headlines(symbols: list, days: int, per_day: int) -> dict:
+    rng = np.random.default_rng(7)
+    end = pd.Timestamp(END_DATE, tz="UTC")
+    frames = {}
+
+    for symbol in symbols:
+        stock = symbol.replace(".NS", "")
+        n = days * per_day
+        subjects = rng.choice(HEADLINE_SUBJECTS, n)
+        events = rng.choice(HEADLINE_EVENTS, n)
+        offsets = rng.integers(0, days * 24 * 60, n)
+
+        frames[stock] = pd.DataFrame({
+            "date": end - pd.to_timedelta(offsets, unit="min"),
+            "stock": stock,
+            "headline": [f"{stock} {s} {e}" for s, e in zip(subjects, events)],
+            "source": "Synthetic",
+            "url": [f"https://example.com/{stock}/{k}" for k in range(n)],
+        })
+    return frames
+
+
+# ----------------------------
+# STAGES
+# ----------------------------
+# Each stage takes the shared context, stores its output in it and returns
+# the number of rows it processed.
+def stage_validate(ctx):
+    ctx["valid"] = check_prices(ctx["raw"]).clean
+    return sum(len(df) for df in ctx["raw"].values())
+
+
+def stage_normalize(ctx):
+    ctx["prices"] = {s: normalize_price_frame(df.copy()) for s, df in ctx["valid"].items()}
+    return sum(len(df) for df in ctx["prices"].values())
+
+
+def stage_write_prices(ctx):
+    for symbol, df in ctx["prices"].items():
+        write_symbol("prices", symbol, df)
+    return sum(len(df) for df in ctx["prices"].values())
+
+
+def stage_features(ctx):
+    ctx["features"] = {s: add_price_features(df) for s, df in ctx["prices"].items()}
+    return sum(len(df) for df in ctx["features"].values())
+
+
+def stage_regime(ctx):
+    ctx["regime"] = {s: classify_regime(df.copy()) for s, df in ctx["features"].items()}
+    return sum(len(df) for df in ctx["regime"].values())
+
+
+def stage_signals(ctx):
+    ctx["signals"] = {s: generate_signals(df) for s, df in ctx["regime"].items()}
+    return sum(len(df) for df in ctx["signals"].values())
+
+
+def stage_write_signals(ctx):
+    rows = []
+    for symbol, df in ctx["signals"].items():
+        write_symbol("signals", symbol, df)
+        rows.append(df[LATEST_SIGNAL_COLUMNS].tail(1))
+    write_frame(pd.concat(rows, ignore_index=True), ctx["latest_file"])
+    return sum(len(df) for df in ctx["signals"].values())
+
+
+def stage_backtest(ctx):
+    signals = pd.concat(ctx["signals"].values(), ignore_index=True)
+    backtest(signals)
+    return len(signals)
+
+
+def stage_sentiment_cold(ctx):
+    from src.news.analyze_sentiment import SentimentCache, score_headlines
+
+    cache_file = ctx["tmp"] / "sentiment_cache.parquet"
+    cache_file.unlink(missing_ok=True)
+    cache = SentimentCache(cache_file)
+    ctx["sentiment"] = {s: score_headlines(df.copy(), cache) for s, df in ctx["news"].items()}
+    cache.save()
+    return sum(len(df) for df in ctx["news"].values())
+
+
+def stage_sentiment_cached(ctx):
+    from src.news.analyze_sentiment import SentimentCache, score_headlines
+
+    cache = SentimentCache(ctx["tmp"] / "sentiment_cache.parquet")
+    for df in ctx["news"].values():
+        score_headlines(df.copy(), cache)
+    return sum(len(df) for df in ctx["news"].values())
+
+
+def stage_dashboard_overview(ctx):
+    latest = pd.read_parquet(ctx["latest_file"], columns=OVERVIEW_COLUMNS)
+    return len(latest)
+
+
+def stage_dashboard_overview_scan(ctx):
+    df = read_table("signals", columns=OVERVIEW_COLUMNS)
+    latest = df.sort_values("Date").groupby("symbol", observed=True).tail(1)
+    return len(df) if len(latest) else 0
+
+
+def stage_dashboard_detail(ctx):
+    rows = 0
+    for symbol in ctx["signals"]:
+        df = read_symbol("signals", symbol, columns=DETAIL_COLUMNS).sort_values("Date")
+        rows += len(df)
+    return rows
+
+
+def stage_dashboard_chart(ctx):
+    rows = 0
+    for df in ctx["signals"].values():
+        line_chart_data(df)
+        ohlc_chart_data(df)
+        rows += len(df)
+    return rows
+
+
+SENTIMENT_STAGES = ["analyze_sentiment_cold", "analyze_sentiment_cached"]
+
+STAGES = [
+    ("validate_prices", stage_validate),
+    ("normalize_prices", stage_normalize),
+    ("write_prices", stage_write_prices),
+    ("build_price_features", stage_features),
+    ("classify_market_regime", stage_regime),
+    ("generate_signals", stage_signals),
+    ("write_signals", stage_write_signals),
+    ("backtest_signals", stage_backtest),
+    ("analyze_sentiment_cold", stage_sentiment_cold),
+    ("analyze_sentiment_cached", stage_sentiment_cached),
+    ("dashboard_overview", stage_dashboard_overview),
+    ("dashboard_overview_scan", stage_dashboard_overview_scan),
+    ("dashboard_detail", stage_dashboard_detail),
+    ("dashboard_chart", stage_dashboard_chart),
+]
+
+
+def measure(func, ctx, repeat: int = REPEAT) -> dict:
+    """
+    Best of `repeat` timed runs, then one run under tracemalloc for peak
+    memory, so tracing overhead does not distort the timing.
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func(ctx)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+# ----------------------------
+# BASELINE
+# ----------------------------
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """
+    Stages whose time or peak memory grew by more than tolerance.
+    """
+    if baseline.get("params") != results["params"]:
+        logger.warning("Baseline was recorded with different parameters, not comparing")
+        return []
+
+    floors = {"seconds": MIN_SECONDS_DELTA, "peak_mb": MIN_MB_DELTA}
+
+    regressions = []
+    for stage, current in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if not previous:
+            continue
+        for metric, floor in floors.items():
+            grew = current[metric] - previous[metric]
+            if previous[metric] and grew > floor and grew > previous[metric] * tolerance:
+                regressions.append(
+                    f"{stage}: {metric} {previous[metric]} -> {current[metric]} "
+                    f"(+{current[metric] / previous[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def vader_available() -> bool:
+    try:
+        import src.news.analyze_sentiment  # noqa: F401  (loads the lexicon)
+    except LookupError:
+        return False
+    return True
+
+
+def run_benchmark(n_symbols: int, years: int, headlines_per_day: int,
+                  news_days: int = 30, stages: list = None) -> dict:
+    params = {
+        "symbols": n_symbols,
+        "years": years,
+        "headlines_per_day": headlines_per_day,
+        "news_days": news_days,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # Point the dataset API at the scratch directory
+        original_dir = dataset.PROCESSED_DIR
+        dataset.PROCESSED_DIR = tmp / "processed"
+
+        raw = synthetic_prices(n_symbols, years)
+        ctx = {
+            "tmp": tmp,
+            "raw": raw,
+            "news": synthetic_headlines(list(raw), news_days, headlines_per_day),
+            "latest_file": tmp / "processed/latest_signals.parquet",
+        }
+
+        skip = set()
+        if not vader_available():
+            logger.warning("VADER lexicon not installed, skipping sentiment stages")
+            skip.update(SENTIMENT_STAGES)
+
+        results = {}
+        try:
+            for name, func in STAGES:
+                if name in skip or (stages and name not in stages):
+                    continue
+                results[name] = measure(func, ctx)
+                logger.info(f"{name}: {results[name]}")
+        finally:
+            dataset.PROCESSED_DIR = original_dir
+
+    return {
+        "params": params,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "recorded_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "stages": results,
+    }
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"\nParams: {results['params']}")
+    print(f"{'stage':<28}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}{'vs base':>10}")
+
+    for stage, r in results["stages"].items():
+        ratio = ""
+        previous = (baseline or {}).get("stages", {}).get(stage)
+        if previous and previous["seconds"] and baseline.get("params") == results["params"]:
+            ratio = f"{r['seconds'] / previous['seconds']:.2f}x"
+        print(
+            f"{stage:<28}{r['rows']:>10}{r['seconds']:>10.3f}"
+            f"{r['rows_per_sec'] or 0:>12.0f}{r['peak_mb']:>10.1f}{ratio:>10}"
+        )
+
+
+def save_json(data: dict, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline pipeline stage benchmark")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--years", type=int, default=8)
+    parser.add_argument("--headlines", type=int, default=5, help="Headlines per symbol per day")
+    parser.add_argument("--news-days", type=int, default=30)
+    parser.add_argument("--stages", nargs="*", default=None, help="Only run these stages")
+    parser.add_argument("--output", type=Path, default=RESULTS_FILE)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.symbols, args.years, args.headlines, args.news_days, args.stages)
+    save_json(results, args.output)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        save_json(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
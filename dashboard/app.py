@@ -12,7 +12,22 @@ sys.path.append(str(PROJECT_ROOT))
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from src.backtest.backtest_signals import (
+    DIRECTIONS, EXPECTED_MOVE_HORIZON, load_backtest, output_path
+)
 from src.news.impact_engine import generate_impact_explanation
+from src.pipeline.manifest import RUNS_DIR, MAX_RUNS, load_runs, stage_history, assess_health
+from src.screener.signal_index import current_path, load_index, update_signal_index
+from src.storage.dataset import table_dir, read_table, read_symbol, symbol_path
+from src.storage.hot_cache import (
+    DETAIL_COLUMNS, hot_cache_enabled, hot_path, latest_path, read_hot, refresh_hot_cache
+)
+from src.storage.schema import apply_schema
+from src.transform.indicators import compute_indicators
+from src.transform.generate_signals import LATEST_SIGNALS_FILE
+from src.visualization.chart_data import (
+    RANGES, RESOLUTIONS, filter_range, line_chart_data, ohlc_chart_data
+)
 
 # =================================================
 # NIFTY 50 UNIVERSE (CANONICAL SYMBOLS – NO .NS)
@@ -33,8 +48,7 @@ NIFTY_50_SYMBOLS = [
 # =================================================
 # PATHS
 # =================================================
-SIGNAL_DIR = Path("data/processed/signals")
-NEWS_DIR = Path("data/processed/news")
+SIGNAL_DIR = table_dir("signals")
 
 # =================================================
 # STREAMLIT CONFIG
@@ -56,12 +70,21 @@ if st.button("🔄 Refresh Data"):
 # =================================================
 IST = pytz.timezone("Asia/Kolkata")
 
-def get_last_updated_time():
+def latest_signal_ts():
+    # The snapshot is rewritten after every signal run, so one stat is enough
+    if LATEST_SIGNALS_FILE.exists():
+        return LATEST_SIGNALS_FILE.stat().st_mtime
+
     files = list(SIGNAL_DIR.glob("*.parquet"))
     if not files:
+        return 0
+    return max(f.stat().st_mtime for f in files)
+
+def get_last_updated_time():
+    ts = latest_signal_ts()
+    if not ts:
         return None
-    latest = max(files, key=lambda f: f.stat().st_mtime)
-    return datetime.fromtimestamp(latest.stat().st_mtime, tz=IST)
+    return datetime.fromtimestamp(ts, tz=IST)
 
 last_updated_ts = get_last_updated_time()
 
@@ -76,48 +99,82 @@ else:
 # =================================================
 # CACHE INVALIDATION KEY
 # =================================================
-def latest_signal_ts():
-    files = list(SIGNAL_DIR.glob("*.parquet"))
-    if not files:
-        return 0
-    return max(f.stat().st_mtime for f in files)
-
 LATEST_TS = latest_signal_ts()
 
 # =================================================
-# LOAD OVERVIEW DATA (STRICT .NS FILES)
+# HOT CACHE (REBUILT HERE, NOT VERSIONED)
 # =================================================
-@st.cache_data(show_spinner=False)
-def load_signal_data(ts):
+@st.cache_resource(show_spinner=False, max_entries=1)
+def warm_hot_cache(ts):
+    # Once per data generation: republish what the pipeline changed.
+    # On failure the loaders below fall back to parquet.
     _ = ts  # force cache dependency
+    try:
+        refresh_hot_cache(LATEST_SIGNALS_FILE)
+    except OSError:
+        pass
+    return ts
+
+
+if hot_cache_enabled():
+    warm_hot_cache(LATEST_TS)
 
-    rows = []
-    available = set()
+# =================================================
+# LOAD OVERVIEW DATA (STRICT .NS FILES)
+# =================================================
+OVERVIEW_COLUMNS = ["Date", "symbol", "market_regime", "signal_label", "signal_strength"]
+
+
+def load_latest_rows():
+    # Fast path: the one-row-per-symbol snapshot written by generate_signals,
+    # memory-mapped from the hot cache when it has been published
+    if hot_cache_enabled() and latest_path().exists():
+        df = read_hot(latest_path(), columns=OVERVIEW_COLUMNS)
+    elif LATEST_SIGNALS_FILE.exists():
+        df = apply_schema(pd.read_parquet(LATEST_SIGNALS_FILE, columns=OVERVIEW_COLUMNS))
+    else:
+        df = None
+
+    if df is not None:
+        df["symbol"] = df["symbol"].astype(str)
+        return df[df["symbol"].isin([f"{s}.NS" for s in NIFTY_50_SYMBOLS])]
+
+    # Fallback: only the overview columns are decoded, for every symbol in one scan
+    df = read_table(
+        "signals",
+        symbols=[f"{symbol}.NS" for symbol in NIFTY_50_SYMBOLS],  # ✅ CORRECT
+        columns=OVERVIEW_COLUMNS
+    )
+
+    if df.empty:
+        return df
+
+    return (
+        df.sort_values("Date")
+        .groupby("symbol", observed=True)
+        .tail(1)
+    )
 
-    for symbol in NIFTY_50_SYMBOLS:
-        file_path = SIGNAL_DIR / f"{symbol}.NS.parquet"  # ✅ CORRECT
 
-        if not file_path.exists():
-            continue
+@st.cache_data(show_spinner=False)
+def load_signal_data(ts):
+    _ = ts  # force cache dependency
 
-        df = pd.read_parquet(file_path)
-        if df.empty:
-            continue
+    latest = load_latest_rows()
 
-        df = df.sort_values("Date")
-        latest = df.iloc[-1]
-        available.add(symbol)
+    if latest.empty:
+        return pd.DataFrame(), sorted(NIFTY_50_SYMBOLS)
 
-        rows.append({
-            "Stock": symbol,
-            "Date": pd.to_datetime(latest["Date"]).date(),
-            "Market Regime": latest["market_regime"],
-            "Signal": latest["signal_label"],
-            "Strength": latest["signal_strength"]
-        })
+    df_latest = pd.DataFrame({
+        "Stock": latest["symbol"].astype(str).str.replace(".NS", "", regex=False),
+        "Date": pd.to_datetime(latest["Date"]).dt.date,
+        "Market Regime": latest["market_regime"].astype(str),
+        "Signal": latest["signal_label"].astype(str),
+        "Strength": latest["signal_strength"].astype(str)
+    })
 
-    missing = sorted(set(NIFTY_50_SYMBOLS) - available)
-    return pd.DataFrame(rows), missing
+    missing = sorted(set(NIFTY_50_SYMBOLS) - set(df_latest["Stock"]))
+    return df_latest.reset_index(drop=True), missing
 
 df_overview, missing_stocks = load_signal_data(LATEST_TS)
 
@@ -139,7 +196,36 @@ df_overview = (
 latest_date = df_overview["Date"].max()
 oldest_date = df_overview["Date"].min()
 
-st.success("🟢 Pipeline status: Healthy")
+# =================================================
+# 🩺 PIPELINE HEALTH (FROM RUN MANIFESTS)
+# =================================================
+def latest_run_ts():
+    files = list(RUNS_DIR.glob("*.json"))
+    if not files:
+        return 0
+    return max(f.stat().st_mtime for f in files)
+
+
+@st.cache_data(show_spinner=False)
+def load_pipeline_runs(ts):
+    _ = ts  # force cache dependency
+    return load_runs(limit=MAX_RUNS)
+
+
+runs = load_pipeline_runs(latest_run_ts())
+health, health_reasons = assess_health(runs)
+
+HEALTH_BADGES = {
+    "Healthy": (st.success, "🟢"),
+    "Degraded": (st.warning, "🟠"),
+    "Failed": (st.error, "🔴"),
+    "Unknown": (st.info, "⚪"),
+}
+show_badge, health_icon = HEALTH_BADGES[health]
+show_badge(
+    f"{health_icon} Pipeline status: {health}"
+    + "".join(f"\n\n• {reason}" for reason in health_reasons)
+)
 
 st.info(
     f"📅 **Data coverage:** {oldest_date} → {latest_date}\n\n"
@@ -152,30 +238,189 @@ if missing_stocks:
 
 st.dataframe(df_overview, use_container_width=True, hide_index=True)
 
+with st.expander("🩺 Pipeline Health"):
+    if not runs:
+        st.info("No run manifests recorded yet.")
+    else:
+        history = stage_history(runs)
+        last = history[history["run_id"] == runs[-1]["run_id"]]
+
+        st.caption(
+            f"Last run {runs[-1]['run_id']} | {runs[-1]['status']} | "
+            f"{runs[-1]['wall_seconds']:.1f}s | {len(runs)} runs recorded"
+        )
+        st.dataframe(
+            pd.DataFrame({
+                "Stage": last["stage"],
+                "Status": last["status"],
+                "Wall (s)": last["wall_seconds"],
+                "CPU (s)": last["cpu_seconds"],
+                "Rows in": last["rows_in"],
+                "Rows out": last["rows_out"],
+                "Read (MB)": (last["bytes_read"] / 2**20).round(1),
+                "Written (MB)": (last["bytes_written"] / 2**20).round(1),
+                "Peak RSS (MB)": last["peak_rss_mb"],
+                "Failures": last["failures"],
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        fig_runs = go.Figure()
+        for stage, rows in history.groupby("stage", sort=False):
+            fig_runs.add_trace(go.Scatter(
+                x=rows["started_at"], y=rows["wall_seconds"],
+                mode="lines+markers", name=stage
+            ))
+        fig_runs.update_layout(height=350, yaxis_title="Stage wall time (s)")
+        st.plotly_chart(fig_runs, use_container_width=True)
+
+# =================================================
+# 🔎 SCREENER (FROM THE SIGNAL INDEX)
+# =================================================
+st.divider()
+st.subheader("🔎 Screener")
+
+
+def signal_tables_ts():
+    files = list(SIGNAL_DIR.glob("*.parquet"))
+    return max((f.stat().st_mtime for f in files), default=0)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def build_signal_index(ts):
+    # data/index is not versioned: build it here once per change of the
+    # signal tables (a no-op when the stored index is already fresh)
+    _ = ts  # force cache dependency
+    try:
+        update_signal_index()
+    except OSError:
+        pass
+    return ts
+
+
+def signal_index_ts():
+    # CURRENT is replaced whenever a new index generation is switched in
+    path = current_path()
+    return path.stat().st_mtime_ns if path.exists() else 0
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_signal_index(ts):
+    # Memory-mapped arrays, shared by every session instead of copied per
+    # rerun; only the latest generation stays mapped
+    _ = ts  # force cache dependency
+    return load_index() if ts else None
+
+
+build_signal_index(signal_tables_ts())
+signal_index = load_signal_index(signal_index_ts())
+
+if signal_index is None:
+    st.info("No signal index built yet.")
+else:
+    ANY = "Any"
+    col_regime, col_signal, col_strength, col_confidence, col_sessions = st.columns(5)
+    filters = {
+        "market_regime": col_regime.selectbox(
+            "Regime", [ANY] + signal_index.categories["market_regime"]
+        ),
+        "signal_label": col_signal.selectbox(
+            "Signal", [ANY] + signal_index.categories["signal_label"]
+        ),
+        "signal_strength": col_strength.selectbox(
+            "Strength", [ANY] + signal_index.categories["signal_strength"]
+        ),
+    }
+    min_confidence = col_confidence.slider("Min confidence", 0, 100, 0, step=5)
+    sessions = col_sessions.number_input("On each of the last N sessions", 1, 250, 1)
+
+    screened = signal_index.screen(
+        sessions=int(sessions),
+        min_confidence=min_confidence or None,
+        **{column: value for column, value in filters.items() if value != ANY}
+    )
+    st.caption(f"{len(screened)} stocks matched on all of the last {int(sessions)} session(s)")
+    st.dataframe(
+        pd.DataFrame({
+            "Stock": screened["symbol"].str.replace(".NS", "", regex=False),
+            "Sessions matched": screened["matched_sessions"],
+            "Last match": screened["last_match"].dt.date,
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
 # =================================================
 # 📈 STOCK DETAIL
 # =================================================
 st.divider()
 st.subheader("📈 Stock Detail View")
 
+# Most recently viewed stocks kept in memory; older ones are evicted
+STOCK_CACHE_ENTRIES = 12
+
+
+def stock_source(symbol):
+    # Hot cache copy (DETAIL_COLUMNS, pre-sorted) if published, else parquet
+    path = hot_path(symbol)
+    if hot_cache_enabled() and path.exists():
+        return path
+    return symbol_path("signals", symbol)
+
+
+def stock_generation(symbol):
+    # Changes whenever the pipeline rewrites the symbol's file
+    path = stock_source(symbol)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(show_spinner=False, max_entries=STOCK_CACHE_ENTRIES)
+def load_stock_data(symbol, generation):
+    _ = generation  # force cache dependency
+
+    path = stock_source(symbol)
+    if path.suffix == ".arrow":
+        return read_hot(path)
+
+    df = read_symbol("signals", symbol, columns=DETAIL_COLUMNS)
+    return df.sort_values("Date").reset_index(drop=True)
+
+
 selected_stock = st.selectbox("Select a stock", df_overview["Stock"].unique())
 
-stock_file = SIGNAL_DIR / f"{selected_stock}.NS.parquet"  # ✅ CORRECT
-df_stock = pd.read_parquet(stock_file).sort_values("Date")
+stock_symbol = f"{selected_stock}.NS"  # ✅ CORRECT
+df_stock = load_stock_data(stock_symbol, stock_generation(stock_symbol))
+
+if df_stock.empty:
+    st.warning(f"⚠️ No signal history for {selected_stock}.")
+    st.stop()
+
 latest = df_stock.iloc[-1]
 
+if signal_index is not None and stock_symbol in signal_index.symbols:
+    flips = {
+        "Bearish → Bullish": signal_index.last_flip(stock_symbol, "Bearish", "Bullish"),
+        "Bullish → Bearish": signal_index.last_flip(stock_symbol, "Bullish", "Bearish"),
+    }
+    st.caption("🔁 Last signal flips: " + " | ".join(
+        f"{name}: {date.date() if date is not None else 'never'}" for name, date in flips.items()
+    ))
+
 # =================================================
 # 📰 NEWS
 # =================================================
 st.divider()
 st.subheader("📰 Latest News (Last 7 Days)")
 
-news_file = NEWS_DIR / f"{selected_stock}.parquet"
 df_news = pd.DataFrame()
 latest_sentiment, latest_confidence = "Neutral", 0
 
-if news_file.exists():
-    df_news = pd.read_parquet(news_file)
+if symbol_path("news", selected_stock).exists():
+    df_news = read_symbol("news", selected_stock)
 
 if df_news.empty:
     st.info("No significant news found.")
@@ -214,26 +459,130 @@ st.info(generate_impact_explanation(
 # =================================================
 st.subheader("📈 Price Chart")
 
-chart_type = st.radio("Chart Type", ["Line Chart", "Candlestick"], horizontal=True)
+# Indicators the line chart always draws, and the ones a user can add.
+# Only the selected overlays are computed, on the full history so EMAs
+# are warmed up before the visible range starts.
+CHART_INDICATORS = ["sma_20", "sma_50"]
+OVERLAY_INDICATORS = {
+    "EMA 12": ["ema_12"],
+    "EMA 26": ["ema_26"],
+    "SMA 200": ["sma_200"],
+    "Bollinger (20, 2)": ["bb_upper_20", "bb_lower_20"],
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=4 * STOCK_CACHE_ENTRIES)
+def load_chart_data(symbol, generation, range_key, chart_type, resolution, overlays=()):
+    # Downsampled chart points per (symbol, range, resolution, overlays)
+    df = load_stock_data(symbol, generation)
+    if chart_type == "Line Chart":
+        df = compute_indicators(df, CHART_INDICATORS + list(overlays))
+
+    df = filter_range(df, range_key)
+
+    if chart_type == "Line Chart":
+        return line_chart_data(df, extra_columns=overlays), "LTTB"
+
+    return ohlc_chart_data(df, None if resolution == "Auto" else resolution)
+
+
+col_type, col_range, col_resolution = st.columns(3)
+chart_type = col_type.radio("Chart Type", ["Line Chart", "Candlestick"], horizontal=True)
+range_key = col_range.radio("Range", list(RANGES), index=len(RANGES) - 1, horizontal=True)
+resolution = "Auto"
+overlays = []
+if chart_type == "Candlestick":
+    resolution = col_resolution.selectbox("Candle Resolution", ["Auto"] + list(RESOLUTIONS))
+else:
+    chosen = col_resolution.multiselect("Overlays", list(OVERLAY_INDICATORS))
+    overlays = [name for label in chosen for name in OVERLAY_INDICATORS[label]]
+
+df_chart, shown_resolution = load_chart_data(
+    stock_symbol, stock_generation(stock_symbol), range_key, chart_type, resolution,
+    tuple(overlays)
+)
 
 fig = go.Figure()
 
 if chart_type == "Line Chart":
-    fig.add_trace(go.Scatter(x=df_stock["Date"], y=df_stock["Close"], name="Close"))
-    fig.add_trace(go.Scatter(x=df_stock["Date"], y=df_stock["sma_20"], name="SMA 20"))
-    fig.add_trace(go.Scatter(x=df_stock["Date"], y=df_stock["sma_50"], name="SMA 50"))
+    fig.add_trace(go.Scatter(x=df_chart["Date"], y=df_chart["Close"], name="Close"))
+    fig.add_trace(go.Scatter(x=df_chart["Date"], y=df_chart["sma_20"], name="SMA 20"))
+    fig.add_trace(go.Scatter(x=df_chart["Date"], y=df_chart["sma_50"], name="SMA 50"))
+    for name in overlays:
+        fig.add_trace(go.Scatter(x=df_chart["Date"], y=df_chart[name], name=name))
 else:
     fig.add_trace(go.Candlestick(
-        x=df_stock["Date"],
-        open=df_stock["Open"],
-        high=df_stock["High"],
-        low=df_stock["Low"],
-        close=df_stock["Close"]
+        x=df_chart["Date"],
+        open=df_chart["Open"],
+        high=df_chart["High"],
+        low=df_chart["Low"],
+        close=df_chart["Close"]
     ))
 
+st.caption(f"{len(df_chart)} points shown ({shown_resolution})")
+
 fig.update_layout(height=500, xaxis_rangeslider_visible=False)
 st.plotly_chart(fig, use_container_width=True)
 
+# =================================================
+# 🎯 SIGNAL RELIABILITY (FROM BACKTEST OUTPUTS)
+# =================================================
+st.divider()
+st.subheader("🎯 Signal Reliability")
+
+
+def backtest_ts():
+    path = output_path("by_symbol")
+    return path.stat().st_mtime if path.exists() else 0
+
+
+@st.cache_data(show_spinner=False)
+def load_reliability(ts):
+    _ = ts  # force cache dependency
+    return load_backtest("by_symbol"), load_backtest("calibration")
+
+
+by_symbol, calibration = load_reliability(backtest_ts())
+stock_stats = by_symbol[by_symbol["symbol"] == stock_symbol] if not by_symbol.empty else by_symbol
+
+if stock_stats.empty:
+    st.info("No backtest results for this stock yet.")
+else:
+    current_signal = str(latest["signal_label"])
+    current = stock_stats[stock_stats["signal_label"] == current_signal]
+
+    if current_signal in DIRECTIONS and not current.empty:
+        cols = st.columns(len(current))
+        for col, (_, row) in zip(cols, current.iterrows()):
+            col.metric(
+                f"{current_signal} hit rate, {row['horizon']}d",
+                f"{row['hit_rate']:.0%}",
+                f"{row['mean_edge']:+.2%} avg edge",
+            )
+        st.caption(f"Past {current_signal} signals for {selected_stock}, the current signal")
+
+    st.dataframe(
+        pd.DataFrame({
+            "Signal": stock_stats["signal_label"].astype(str),
+            "Horizon (days)": stock_stats["horizon"],
+            "Signals": stock_stats["count"],
+            "Hit rate": (stock_stats["hit_rate"] * 100).round(1),
+            "Avg return (%)": (stock_stats["mean_return"] * 100).round(2),
+            "Avg edge (%)": (stock_stats["mean_edge"] * 100).round(2),
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    stock_calibration = calibration[calibration["symbol"] == stock_symbol]
+    if not stock_calibration.empty:
+        row = stock_calibration.iloc[0]
+        st.caption(
+            f"Expected move calibration: realised {EXPECTED_MOVE_HORIZON}-day moves averaged "
+            f"{row['realised_to_expected']:.2f}x the expected move and stayed inside it "
+            f"{row['coverage']:.0%} of the time (68% if well calibrated)"
+        )
+
 # =================================================
 # DISCLAIMER
 # =================================================
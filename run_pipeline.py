@@ -1,17 +1,105 @@
-import subprocess
+import argparse
 import sys
 
-def run(cmd):
-    print(f"\n▶ Running: {cmd}")
-    result = subprocess.run(cmd, shell=True)
-    if result.returncode != 0:
-        sys.exit(result.returncode)
+import pandas as pd
+
+from src.pipeline.dag import PipelineError
+from src.pipeline.manifest import build_manifest, write_manifest
+from src.pipeline.stages import build_pipeline, DEFAULT_PERSIST
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the market intelligence pipeline")
+    parser.add_argument(
+        "--persist",
+        nargs="*",
+        default=DEFAULT_PERSIST,
+        help="Stages whose output is written to disk"
+    )
+    parser.add_argument(
+        "--persist-all",
+        action="store_true",
+        help="Write the output of every stage. Fused modes have no features or "
+             "market_regime stage: add --write-intermediates for those tables"
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Download the full price history instead of only new bars"
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Compute features, regime and signals in a single stage"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fused transform that only recomputes new or revised bars"
+    )
+    parser.add_argument(
+        "--panel",
+        action="store_true",
+        help="Fused transform vectorised across all symbols at once"
+    )
+    parser.add_argument(
+        "--write-intermediates",
+        action="store_true",
+        help="With --fused, --incremental or --panel, also write the features "
+             "and market_regime tables"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute symbols whose raw prices did not change"
+    )
+    parser.add_argument(
+        "--strict-validation",
+        action="store_true",
+        help="Fail the run when price validation rejects a symbol"
+    )
+    parser.add_argument(
+        "--skip-news",
+        action="store_true",
+        help="Run only the price branch"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Stages allowed to run at the same time"
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    run("python src/ingestion/fetch_prices.py")
-    run("python src/news/fetch_news.py")
-    run("python src/news/analyze_sentiment.py")
-    run("python src/transform/build_price_features.py")
-    run("python src/transform/classify_market_regime.py")
-    run("python src/transform/generate_signals.py")
+    args = parse_args()
+
+    pipeline = build_pipeline(
+        full_refresh=args.full_refresh,
+        include_news=not args.skip_news,
+        fused=args.fused,
+        write_intermediates=args.write_intermediates,
+        incremental=args.incremental,
+        panel=args.panel,
+        force=args.force,
+        strict_validation=args.strict_validation
+    )
+
+    persist = pipeline.stages.keys() if args.persist_all else args.persist
+    persist = [name for name in persist if name in pipeline.stages]
+
+    print(f"\n▶ Running stages: {' -> '.join(pipeline.order)}")
+
+    started_at = pd.Timestamp.now(tz="UTC")
+
+    try:
+        pipeline.run(persist=persist, max_workers=args.workers)
+    except PipelineError as e:
+        write_manifest(build_manifest(pipeline, started_at, "failed", vars(args), str(e)))
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+    write_manifest(build_manifest(pipeline, started_at, "success", vars(args)))
+
     print("\n✅ Market Intelligence Pipeline completed successfully")
@@ -0,0 +1,333 @@
+"""
+Historical reliability of the generated signals.
+
+All symbols' signal tables are read in one scan and stacked, sorted by
+symbol then Date. Everything after that is whole-array NumPy: forward
+returns are one shifted division masked where the shift crosses into the
+next symbol, and every grouped statistic is a bincount over combined
+group codes. There are no per-row or per-symbol Python loops.
+
+Outputs, under data/processed/backtest:
+- summary.parquet: hit rate and mean forward return per signal, regime,
+  confidence bucket and their combination, for each horizon
+- by_symbol.parquet: the same per (symbol, signal), for the dashboard
+- calibration.parquet: expected_move_pct against the realised move over
+  its horizon, per expected-move decile and per symbol
+
+A directional signal is a hit when the forward return has its sign.
+expected_move_pct is a one-sigma 5-day move, so a well calibrated
+forecast has about 68% of realised moves inside it (coverage).
+
+In the pipeline, the backtest_signals stage runs on the signal frames of
+the run, in memory, and writes the outputs only when persisted. Run as a
+module it backtests the stored tables and is cached: outputs are
+recomputed only when a signal file or this module changes (see
+src.pipeline.build_cache).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.pipeline.build_cache import BuildCache, code_version
+from src.storage.dataset import PROCESSED_DIR, list_symbols, read_table, symbol_path, write_frame
+
+BACKTEST_DIR = PROCESSED_DIR / "backtest"
+OUTPUTS = ["summary", "by_symbol", "calibration"]
+
+BACKTEST_COLUMNS = [
+    "Date", "symbol", "Close", "market_regime", "signal_label",
+    "confidence_score", "expected_move_pct"
+]
+
+# Forward horizons in trading bars
+HORIZONS = [1, 5, 20]
+
+# expected_move_pct is volatility_20 * sqrt(5): a 5-day move
+EXPECTED_MOVE_HORIZON = 5
+
+CONFIDENCE_EDGES = [0, 60, 75, 90, 101]
+CONFIDENCE_LABELS = ["<60", "60-74", "75-89", "90+"]
+
+CALIBRATION_BINS = 10
+
+DIRECTIONS = {"Bullish": 1, "Bearish": -1}
+
+ALL = "All"
+
+
+# ----------------------------
+# FORWARD RETURNS
+# ----------------------------
+def forward_returns(close: np.ndarray, codes: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    close[t + horizon] / close[t] - 1 on a long array sorted by symbol, NaN
+    where t + horizon is past the end of the symbol's history.
+    """
+    out = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        same = codes[horizon:] == codes[:-horizon]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = close[horizon:] / close[:-horizon] - 1
+        out[:-horizon] = np.where(same, ratio, np.nan)
+    return out
+
+
+# ----------------------------
+# GROUPED STATISTICS
+# ----------------------------
+def group_codes(columns: dict, n_rows: int) -> tuple:
+    """
+    One integer per row combining the codes of `columns` (name -> Categorical),
+    and the shape needed to decode it with np.unravel_index. No columns
+    means a single group.
+    """
+    if not columns:
+        return np.zeros(n_rows, dtype="int64"), (1,)
+
+    codes = [np.asarray(c.codes, dtype="int64") for c in columns.values()]
+    shape = tuple(max(len(c.categories), 1) for c in columns.values())
+    return np.ravel_multi_index(codes, shape), shape
+
+
+def decode_groups(columns: dict, keys: np.ndarray, shape: tuple) -> dict:
+    positions = np.unravel_index(keys, shape)
+    return {
+        name: np.asarray(c.categories)[pos]
+        for (name, c), pos in zip(columns.items(), positions)
+    }
+
+
+def hit_stats(columns: dict, fwd: np.ndarray, direction: np.ndarray) -> pd.DataFrame:
+    """
+    count, hit rate and mean forward return per group of `columns`,
+    all from bincounts. Rows without a forward return are left out.
+    """
+    valid = ~np.isnan(fwd)
+    keys, shape = group_codes(columns, len(fwd))
+    keys, fwd, direction = keys[valid], fwd[valid], direction[valid]
+
+    size = int(np.prod(shape))
+    directional = direction != 0
+    hits = directional & (np.sign(fwd) == direction)
+
+    count = np.bincount(keys, minlength=size)
+    scored = np.bincount(keys, weights=directional, minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stats = {
+            "count": count,
+            "hit_rate": np.bincount(keys, weights=hits, minlength=size) / scored,
+            "mean_return": np.bincount(keys, weights=fwd, minlength=size) / count,
+            # Return in the signal's direction: what following it earned
+            "mean_edge": np.bincount(keys, weights=fwd * direction, minlength=size) / scored,
+        }
+
+    present = np.flatnonzero(count)
+    frame = pd.DataFrame(decode_groups(columns, present, shape), index=range(len(present)))
+    for name, values in stats.items():
+        frame[name] = values[present]
+    return frame
+
+
+def summarise(columns: dict, groupings: list, returns: dict, direction: np.ndarray) -> pd.DataFrame:
+    """
+    hit_stats for every grouping (tuple of column names) and horizon. Columns
+    a grouping does not split on are reported as "All".
+    """
+    frames = []
+    for grouping in groupings:
+        subset = {name: columns[name] for name in grouping}
+        for horizon, fwd in returns.items():
+            stats = hit_stats(subset, fwd, direction)
+            for name in columns:
+                if name not in grouping:
+                    stats[name] = ALL
+            stats["horizon"] = horizon
+            frames.append(stats)
+
+    order = list(columns) + ["horizon", "count", "hit_rate", "mean_return", "mean_edge"]
+    return pd.concat(frames, ignore_index=True)[order]
+
+
+# ----------------------------
+# CALIBRATION
+# ----------------------------
+def calibration_stats(keys: np.ndarray, size: int, expected: np.ndarray,
+                      realised: np.ndarray) -> pd.DataFrame:
+    """
+    Expected vs realised absolute moves per group key.
+    """
+    covered = np.abs(realised) <= np.abs(expected)
+    count = np.bincount(keys, minlength=size)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_expected = np.bincount(keys, weights=np.abs(expected), minlength=size) / count
+        mean_realised = np.bincount(keys, weights=np.abs(realised), minlength=size) / count
+        return pd.DataFrame({
+            "count": count,
+            "mean_expected_abs": mean_expected,
+            "mean_realised_abs": mean_realised,
+            "realised_to_expected": mean_realised / mean_expected,
+            "coverage": np.bincount(keys, weights=covered, minlength=size) / count,
+        })
+
+
+def calibrate(symbols: pd.Categorical, expected_pct: np.ndarray, realised: np.ndarray) -> pd.DataFrame:
+    """
+    Universe rows per decile of |expected move| (symbol "All") and one row
+    per symbol over all its deciles (bin -1).
+    """
+    expected = expected_pct / 100
+    valid = ~np.isnan(realised) & ~np.isnan(expected) & (expected != 0)
+    expected, realised = expected[valid], realised[valid]
+    symbol_codes = np.asarray(symbols.codes)[valid]
+
+    if not len(expected):
+        return pd.DataFrame()
+
+    edges = np.unique(np.quantile(np.abs(expected), np.linspace(0, 1, CALIBRATION_BINS + 1)))
+    bins = np.clip(np.searchsorted(edges, np.abs(expected), side="right") - 1, 0, len(edges) - 2)
+
+    universe = calibration_stats(bins, len(edges) - 1, expected, realised)
+    universe.insert(0, "bin", np.arange(len(universe)))
+    universe.insert(0, "symbol", ALL)
+
+    per_symbol = calibration_stats(symbol_codes, len(symbols.categories), expected, realised)
+    per_symbol.insert(0, "bin", -1)
+    per_symbol.insert(0, "symbol", np.asarray(symbols.categories))
+
+    frame = pd.concat([universe, per_symbol], ignore_index=True)
+    return frame[frame["count"] > 0].reset_index(drop=True)
+
+
+# ----------------------------
+# BACKTEST
+# ----------------------------
+def backtest(signals: pd.DataFrame) -> dict:
+    """
+    Backtest a long signal frame (BACKTEST_COLUMNS, any number of symbols).
+    Returns {"summary", "by_symbol", "calibration"} DataFrames.
+    """
+    df = signals[BACKTEST_COLUMNS].copy()
+    for name in ["symbol", "market_regime", "signal_label"]:
+        df[name] = df[name].astype(str).astype("category")
+    df = df.sort_values(["symbol", "Date"], kind="stable").reset_index(drop=True)
+
+    symbol = df["symbol"].array
+    close = df["Close"].to_numpy(dtype="float64")
+    codes = np.asarray(symbol.codes)
+
+    returns = {h: forward_returns(close, codes, h) for h in HORIZONS}
+    direction = df["signal_label"].map(DIRECTIONS).fillna(0).to_numpy(dtype="float64")
+
+    confidence = pd.Categorical.from_codes(
+        np.searchsorted(CONFIDENCE_EDGES, df["confidence_score"].to_numpy(), side="right") - 1,
+        categories=CONFIDENCE_LABELS,
+    )
+    columns = {
+        "signal_label": df["signal_label"].array,
+        "market_regime": df["market_regime"].array,
+        "confidence_bucket": confidence,
+    }
+
+    summary = summarise(
+        columns,
+        [(), ("signal_label",), ("market_regime",), ("confidence_bucket",),
+         ("signal_label", "market_regime"), tuple(columns)],
+        returns,
+        direction,
+    )
+    by_symbol = summarise(
+        {"symbol": symbol, "signal_label": columns["signal_label"]},
+        [("symbol",), ("symbol", "signal_label")],
+        returns,
+        direction,
+    )
+    calibration = calibrate(
+        symbol,
+        df["expected_move_pct"].to_numpy(dtype="float64"),
+        returns.get(EXPECTED_MOVE_HORIZON, forward_returns(close, codes, EXPECTED_MOVE_HORIZON)),
+    )
+
+    return {"summary": summary, "by_symbol": by_symbol, "calibration": calibration}
+
+
+def output_path(name: str) -> Path:
+    return BACKTEST_DIR / f"{name}.parquet"
+
+
+def load_backtest(name: str) -> pd.DataFrame:
+    path = output_path(name)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_parquet(path)
+
+
+def save_backtest(results: dict):
+    for name, frame in results.items():
+        write_frame(frame, output_path(name))
+
+
+def load_signals(frames: dict = None) -> pd.DataFrame:
+    """
+    BACKTEST_COLUMNS of every stored signal table, with `frames` (symbol ->
+    signal frame, e.g. the output of a pipeline run) taking the place of
+    the stored table of their symbol.
+    """
+    frames = frames or {}
+    stored = [symbol for symbol in list_symbols("signals") if symbol not in frames]
+
+    parts = [read_table("signals", symbols=stored, columns=BACKTEST_COLUMNS)] if stored else []
+    parts += [df.assign(symbol=symbol)[BACKTEST_COLUMNS] for symbol, df in frames.items()]
+
+    if not parts:
+        return pd.DataFrame(columns=BACKTEST_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def run_backtest(force: bool = False) -> dict:
+    """
+    Backtest every stored signal table, unless no signal file changed since
+    the last run. Returns the output frames, read back from the cache when
+    nothing was recomputed.
+    """
+    symbols = list_symbols("signals")
+
+    if not symbols:
+        logger.error("No signal parquet files found")
+        return {}
+
+    cache = BuildCache("backtest_signals", code_version(sys.modules[__name__]), force=force)
+    fingerprint = cache.fingerprint(*[symbol_path("signals", s) for s in symbols])
+
+    if cache.is_fresh("universe", fingerprint, [output_path(name) for name in OUTPUTS]):
+        logger.info("Backtest up to date, signals unchanged")
+        return {name: load_backtest(name) for name in OUTPUTS}
+
+    signals = load_signals()
+    results = backtest(signals)
+    save_backtest(results)
+
+    cache.record("universe", fingerprint)
+    cache.save()
+
+    overall = results["summary"]
+    overall = overall[(overall["signal_label"] == ALL) & (overall["market_regime"] == ALL)
+                      & (overall["confidence_bucket"] == ALL)]
+    logger.success(
+        f"Backtested {len(signals)} rows of {len(symbols)} symbols: "
+        + ", ".join(f"{h}d hit rate {r:.1%}" for h, r in zip(overall["horizon"], overall["hit_rate"]))
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest stored signals")
+    parser.add_argument("--force", action="store_true", help="Recompute even if signals are unchanged")
+    args = parser.parse_args()
+
+    run_backtest(force=args.force)
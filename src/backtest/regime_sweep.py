@@ -0,0 +1,280 @@
+"""
+Parameter sweep over the regime classification windows.
+
+Each grid point is a (fast, mid, slow) SMA triple for classify_regime plus
+a signal margin: how far Close must be beyond SMA 20 for a Bullish or
+Bearish signal to count (confidence_score cannot serve as the threshold,
+every directional signal scores 85). Every point is evaluated on the whole
+stored price history of the universe: the regime and signals are
+recomputed with the production rules, and the forward returns that
+followed them are scored as in backtest_signals.
+
+The rolling windows are computed once, before any grid point runs: every
+distinct SMA window of the grid, the signal rules' own SMA 20/50 and
+volatility, and the forward returns go into a shared cache of .npy files
+on the dates x symbols panel. Grid points then run on a process pool and
+memory-map the arrays they need, so no window is computed twice however
+many points use it, and workers share the cache through the page cache.
+
+    python -m src.backtest.regime_sweep
+    python -m src.backtest.regime_sweep --windows 10,20,50 5,20,100 --margins 0 0.01
+
+The ranked table is written to data/processed/backtest/regime_sweep.parquet.
+"""
+
+import argparse
+import itertools
+import tempfile
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.backtest.backtest_signals import BACKTEST_DIR, DIRECTIONS, EXPECTED_MOVE_HORIZON, HORIZONS
+from src.pipeline.executor import run_per_symbol
+from src.storage.dataset import read_table, write_frame
+from src.transform.classify_market_regime import REGIME_WINDOWS, classify_regime
+from src.transform.panel import (
+    VOLATILITY_WINDOW, _bar_order, _shift, _to_bars, build_panel,
+    generate_signals_panel, rolling_mean, rolling_std
+)
+
+SWEEP_FILE = BACKTEST_DIR / "regime_sweep.parquet"
+
+DEFAULT_WINDOWS = [
+    REGIME_WINDOWS,
+    (5, 20, 100),
+    (20, 50, 200),
+    (5, 10, 20),
+    (10, 50, 200),
+]
+
+# Minimum |Close / SMA 20 - 1| of a counted signal; 0 is the production rule
+DEFAULT_MARGINS = [0.0, 0.01, 0.02]
+
+# SMA windows generate_signals reads whatever the regime windows are
+SIGNAL_WINDOWS = (20, 50)
+SIGNAL_SMA = "sma_20"
+
+# Points are ranked on the edge t-statistic at this horizon
+RANK_HORIZON = EXPECTED_MOVE_HORIZON
+
+
+@dataclass(frozen=True)
+class GridPoint:
+    windows: tuple
+    margin: float = 0.0
+
+    def __str__(self):
+        return f"{'/'.join(map(str, self.windows))} margin {self.margin:.1%}"
+
+
+def build_grid(windows: list = None, margins: list = None) -> list:
+    windows = [tuple(w) for w in (windows or DEFAULT_WINDOWS)]
+    for triple in windows:
+        if len(triple) != 3 or not triple[0] < triple[1] < triple[2]:
+            raise ValueError(f"Regime windows must be increasing fast/mid/slow: {triple}")
+
+    return [
+        GridPoint(triple, margin)
+        for triple, margin in itertools.product(windows, margins or DEFAULT_MARGINS)
+    ]
+
+
+# ----------------------------
+# SHARED ROLLING CACHE
+# ----------------------------
+def build_rolling_cache(prices: dict, grid: list, cache_dir: Path) -> int:
+    """
+    Write Close, every SMA the grid needs, volatility and forward returns
+    to cache_dir, one .npy per array. Arrays are in bar order (see
+    src.transform.panel), so a rolling window or a forward shift only ever
+    spans one symbol's consecutive bars; cells before a symbol's first bar
+    are NaN. Returns the number of SMA windows computed.
+    """
+    panel = build_panel(prices)
+    order = _bar_order(panel.present)
+    close = _to_bars(panel.values["Close"], order)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_return = np.log(close / _shift(close))
+
+        arrays = {
+            "Close": close,
+            f"volatility_{VOLATILITY_WINDOW}": rolling_std(log_return, VOLATILITY_WINDOW),
+        }
+        for horizon in HORIZONS:
+            forward = np.full_like(close, np.nan)
+            forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+            arrays[f"forward_{horizon}"] = forward
+
+    windows = sorted({w for point in grid for w in point.windows} | set(SIGNAL_WINDOWS))
+    for window in windows:
+        arrays[f"sma_{window}"] = rolling_mean(close, window)
+
+    for name, values in arrays.items():
+        np.save(cache_dir / f"{name}.npy", values)
+    return len(windows)
+
+
+_mapped = {}
+
+
+def cached(cache_dir: Path, name: str) -> np.ndarray:
+    # Each worker maps an array once and keeps it for its later grid points
+    key = (str(cache_dir), name)
+    if key not in _mapped:
+        _mapped[key] = np.load(cache_dir / f"{name}.npy", mmap_mode="r")
+    return _mapped[key]
+
+
+# ----------------------------
+# EVALUATION
+# ----------------------------
+def edge_stats(edge: np.ndarray) -> tuple:
+    """
+    Mean directional return and its t-statistic.
+    """
+    if len(edge) < 2:
+        return np.nan, np.nan
+    std = edge.std(ddof=1)
+    mean = edge.mean()
+    return mean, mean / std * np.sqrt(len(edge)) if std > 0 else np.nan
+
+
+def evaluate_point(cache_dir: Path, point: GridPoint) -> dict:
+    """
+    Regime and signals for one grid point with the production rules, then
+    hit rate and edge of the signals that clear its margin.
+    """
+    columns = ["Close", f"volatility_{VOLATILITY_WINDOW}"]
+    columns += [f"sma_{w}" for w in sorted(set(point.windows) | set(SIGNAL_WINDOWS))]
+    cols = {name: cached(cache_dir, name) for name in columns}
+
+    classify_regime(cols, windows=point.windows)
+    signals = generate_signals_panel(cols)
+
+    present = ~np.isnan(cols["Close"])
+    regime = cols["market_regime"]
+    label = signals["signal_label"]
+    direction = np.select([label == name for name in DIRECTIONS], list(DIRECTIONS.values()), 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = np.abs(cols["Close"] / cols[SIGNAL_SMA] - 1)
+    direction = np.where(distance >= point.margin, direction, 0)
+
+    # Regime changes between consecutive bars of the same symbol
+    consecutive = present[1:] & present[:-1]
+    switches = (regime[1:] != regime[:-1]) & consecutive
+
+    row = {
+        "fast": point.windows[0],
+        "mid": point.windows[1],
+        "slow": point.windows[2],
+        "margin": point.margin,
+        "coverage": float((direction != 0)[present].mean()),
+        "regime_switch_rate": float(switches.sum() / max(consecutive.sum(), 1)),
+    }
+
+    for horizon in HORIZONS:
+        forward = np.asarray(cached(cache_dir, f"forward_{horizon}"))
+        scored = (direction != 0) & ~np.isnan(forward)
+        edge = forward[scored] * direction[scored]
+        mean_edge, t_stat = edge_stats(edge)
+
+        row[f"signals_{horizon}d"] = int(scored.sum())
+        row[f"hit_rate_{horizon}d"] = float((edge > 0).mean()) if len(edge) else np.nan
+        row[f"edge_{horizon}d"] = mean_edge
+        row[f"t_stat_{horizon}d"] = t_stat
+
+        # How far apart the regimes' own forward returns are, signal or not
+        bullish = (regime == "Bullish") & ~np.isnan(forward)
+        bearish = (regime == "Bearish") & ~np.isnan(forward)
+        row[f"regime_spread_{horizon}d"] = (
+            forward[bullish].mean() - forward[bearish].mean()
+            if bullish.any() and bearish.any() else np.nan
+        )
+
+    return row
+
+
+def rank_results(rows: list) -> pd.DataFrame:
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+
+    table = table.sort_values(
+        [f"t_stat_{RANK_HORIZON}d", f"hit_rate_{RANK_HORIZON}d"],
+        ascending=False, na_position="last", kind="stable"
+    ).reset_index(drop=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
+
+
+# ----------------------------
+# SWEEP
+# ----------------------------
+def run_sweep(grid: list = None, max_workers: int = None, save: bool = True) -> pd.DataFrame:
+    grid = grid or build_grid()
+    prices = read_table("prices", columns=["Date", "symbol", "Close"])
+
+    if prices.empty:
+        logger.error("No price parquet files found")
+        return pd.DataFrame()
+
+    frames = {
+        str(symbol): df.reset_index(drop=True)
+        for symbol, df in prices.groupby("symbol", observed=True)
+    }
+
+    with tempfile.TemporaryDirectory(prefix="regime_sweep_") as tmp:
+        cache_dir = Path(tmp)
+        windows = build_rolling_cache(frames, grid, cache_dir)
+        logger.info(
+            f"Rolling cache: {windows} SMA windows over {len(frames)} symbols "
+            f"shared by {len(grid)} grid points"
+        )
+
+        results = run_per_symbol(
+            partial(evaluate_point, cache_dir), grid,
+            max_workers=max_workers, label="regime_sweep"
+        )
+
+    table = rank_results([r.value for r in results.values() if r.ok])
+
+    if save and not table.empty:
+        write_frame(table, SWEEP_FILE)
+        logger.success(f"Saved {len(table)} ranked grid points to {SWEEP_FILE}")
+    return table
+
+
+def parse_windows(text: str) -> tuple:
+    try:
+        return tuple(int(w) for w in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected fast,mid,slow windows, got {text!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regime window parameter sweep")
+    parser.add_argument(
+        "--windows", nargs="+", type=parse_windows,
+        help="fast,mid,slow SMA window triples (default: a built-in grid)"
+    )
+    parser.add_argument(
+        "--margins", nargs="+", type=float,
+        help="Minimum distance of Close beyond SMA 20, as a fraction, for a signal to count"
+    )
+    parser.add_argument("--workers", type=int, help="Processes evaluating grid points")
+    parser.add_argument("--top", type=int, default=10, help="Rows of the ranked table to print")
+    args = parser.parse_args()
+
+    table = run_sweep(build_grid(args.windows, args.margins), max_workers=args.workers)
+
+    if not table.empty:
+        shown = ["rank", "fast", "mid", "slow", "margin", "coverage"]
+        shown += [f"{m}_{RANK_HORIZON}d" for m in ["signals", "hit_rate", "edge", "t_stat", "regime_spread"]]
+        print(table[shown].head(args.top).to_string(index=False))
@@ -0,0 +1,200 @@
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from loguru import logger
+
+from src.pipeline.instrumentation import bind_stage, current_stage
+
+DEFAULT_WORKERS = 8
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_RATE_LIMIT = 4.0      # requests per second, per host
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+
+
+@dataclass
+class FetchResult:
+    symbol: str
+    ok: bool = False
+    rows: int = 0
+    attempts: int = 0
+    error: str = ""
+
+
+class RateLimiter:
+    """
+    Spaces out requests to one host so that at most `rate` start per second,
+    no matter how many worker threads share it.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self.rate = rate
+            self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+
+    def acquire(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_RATE_LIMITERS = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(host: str, rate: float) -> RateLimiter:
+    """
+    The one limiter of a host, shared by every caller. A caller asking for
+    a different rate updates it, rather than getting a second limiter that
+    would let the host see both rates combined.
+    """
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(host)
+        if limiter is None:
+            limiter = _RATE_LIMITERS[host] = RateLimiter(rate)
+        elif limiter.rate != rate:
+            limiter.set_rate(rate)
+        return limiter
+
+
+def _make_batches(starts: dict, batch_size: int) -> list:
+    # A batched request has one start date, so group symbols by it first
+    by_start = {}
+    for symbol, start in starts.items():
+        by_start.setdefault(start, []).append(symbol)
+
+    batches = []
+    for start, symbols in by_start.items():
+        for i in range(0, len(symbols), batch_size):
+            batches.append((symbols[i:i + batch_size], start))
+    return batches
+
+
+def download_universe(
+    starts: dict,
+    provider,
+    on_frame=None,
+    max_workers: int = DEFAULT_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    max_retries: int = MAX_RETRIES,
+    backoff: float = BACKOFF_SECONDS,
+) -> dict:
+    """
+    Download prices for many symbols concurrently.
+
+    `starts` maps symbol -> start date. Symbols sharing a start date are sent
+    to the provider in batches of `batch_size`, and batches run on a bounded
+    thread pool behind a per-host rate limiter. `on_frame(symbol, df)` is
+    called from the worker thread for every symbol that returned data; if
+    it raises, only that symbol fails (and is retried).
+
+    Symbols missing from a response are retried one by one with exponential
+    backoff. Retries wait in a schedule instead of sleeping in a worker, so
+    they never hold up the rest of the universe.
+
+    Returns a dict of symbol -> FetchResult.
+    """
+    results = {symbol: FetchResult(symbol) for symbol in starts}
+    limiter = get_rate_limiter(provider.host, rate_limit)
+    stage = current_stage()
+
+    def run_batch(symbols, start):
+        limiter.acquire()
+        frames = provider.download(symbols, start)
+
+        # on_frame writes from this worker thread; count it to the caller's stage.
+        # A symbol whose frame cannot be handled fails on its own, not the batch.
+        done, errors = {}, {}
+        with bind_stage(stage):
+            for symbol, df in frames.items():
+                if df is None or df.empty:
+                    continue
+                if on_frame is not None:
+                    try:
+                        on_frame(symbol, df)
+                    except Exception as e:
+                        errors[symbol] = f"{type(e).__name__}: {e}"
+                        continue
+                done[symbol] = len(df)
+        return done, errors
+
+    # (ready_at, seq, symbols, start) - seq keeps heap ordering stable
+    pending = []
+    seq = 0
+    for symbols, start in _make_batches(starts, max(batch_size, 1)):
+        heapq.heappush(pending, (0.0, seq, symbols, start))
+        seq += 1
+
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            now = time.monotonic()
+            while pending and pending[0][0] <= now:
+                _, _, symbols, start = heapq.heappop(pending)
+                for symbol in symbols:
+                    results[symbol].attempts += 1
+                future = pool.submit(run_batch, symbols, start)
+                running[future] = (symbols, start)
+
+            timeout = None
+            if pending:
+                timeout = max(pending[0][0] - time.monotonic(), 0.0)
+
+            if not running:
+                time.sleep(timeout or 0.0)
+                continue
+
+            finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                symbols, start = running.pop(future)
+
+                try:
+                    done, errors = future.result()
+                    error = "no data returned"
+                except Exception as e:
+                    done, errors = {}, {}
+                    error = str(e) or type(e).__name__
+
+                for symbol in symbols:
+                    result = results[symbol]
+
+                    if symbol in done:
+                        result.ok = True
+                        result.rows = done[symbol]
+                        result.error = ""
+                        continue
+
+                    result.error = errors.get(symbol, error)
+                    if result.attempts <= max_retries:
+                        delay = backoff * 2 ** (result.attempts - 1)
+                        logger.warning(
+                            f"{symbol} failed ({result.error}), retrying in {delay:.1f}s"
+                        )
+                        heapq.heappush(
+                            pending, (time.monotonic() + delay, seq, [symbol], start)
+                        )
+                        seq += 1
+                    else:
+                        logger.error(
+                            f"{symbol} failed after {result.attempts} attempts: {result.error}"
+                        )
+
+    return results
@@ -1,12 +1,27 @@
-import yfinance as yf
+import argparse
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 from loguru import logger
 from src.config.symbols import NIFTY_50_SYMBOLS
+from src.ingestion.price_provider import YFinanceProvider
+from src.ingestion.download_engine import (
+    download_universe,
+    DEFAULT_WORKERS,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_RATE_LIMIT,
+)
+from src.storage.raw_prices import (
+    RAW_PRICE_DIR,
+    migrate_csv_files,
+    raw_price_path,
+    read_raw_prices,
+    typed_prices,
+    write_raw_prices,
+)
 
 
 # Where raw price data will be stored
-RAW_PRICE_DIR = Path("data/raw/prices")
 RAW_PRICE_DIR.mkdir(parents=True, exist_ok=True)
 
 # Stocks we track (NIFTY large caps)
@@ -14,28 +29,153 @@ RAW_PRICE_DIR.mkdir(parents=True, exist_ok=True)
 
 START_DATE = "2018-01-01"
 
-def fetch_stock_data(symbol: str):
-    logger.info(f"Fetching data for {symbol}")
+# Calendar days re-requested before the last stored bar, so bars that
+# Yahoo revises after the close (late prints, adjustments) get replaced
+OVERLAP_DAYS = 5
 
-    df = yf.download(
-        symbol,
-        start=START_DATE,
-        interval="1d",
-        progress=False
+
+def get_last_stored_date(file_path: Path):
+    """
+    Return the last Date stored in a raw price file, or None when the file
+    is missing, empty or in a layout we cannot append to.
+    """
+    if not file_path.exists():
+        return None
+
+    try:
+        dates = pq.read_table(file_path, columns=["Date"]).column("Date").to_pandas()
+    except (OSError, KeyError):
+        return None
+
+    dates = dates.dropna()
+    if dates.empty:
+        return None
+
+    return dates.max()
+
+
+def get_request_start(symbol: str, full_refresh: bool = False):
+    """
+    Work out where the download for a symbol should start.
+    Returns (start, last_stored_date); the date is None for a full download.
+    """
+    file_path = raw_price_path(symbol)
+    last_date = None if full_refresh else get_last_stored_date(file_path)
+
+    if last_date is None:
+        return START_DATE, None
+
+    start = (last_date - pd.Timedelta(days=OVERLAP_DAYS)).strftime("%Y-%m-%d")
+    return start, last_date
+
+
+def save_price_data(symbol: str, df: pd.DataFrame, last_date=None) -> pd.DataFrame:
+    df = typed_prices(df, symbol)
+
+    if last_date is not None:
+        existing = read_raw_prices(symbol)
+
+        # Newly downloaded bars win over stored ones for the overlap window
+        df = (
+            pd.concat([existing, df], ignore_index=True)
+            .drop_duplicates(subset="Date", keep="last")
+            .sort_values("Date")
+            .reset_index(drop=True)
+        )
+
+    write_raw_prices(symbol, df)
+
+    logger.success(f"Saved data for {symbol} ({len(df)} rows)")
+
+    return df
+
+
+def fetch_stock_data(symbol: str, full_refresh: bool = False, provider=None):
+    """
+    Fetch and store one symbol through the download engine. Returns its
+    stored raw DataFrame, or None when nothing was received.
+    """
+    _, frames = fetch_all_prices([symbol], full_refresh, provider=provider, max_workers=1)
+    return frames.get(symbol)
+
+
+def fetch_all_prices(
+    symbols=NIFTY_50_SYMBOLS,
+    full_refresh: bool = False,
+    provider=None,
+    max_workers: int = DEFAULT_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+):
+    """
+    Download and store prices for `symbols` through the download engine:
+    concurrent, batched and rate limited per host. Returns (results, frames): the per-symbol FetchResult dict from the
+    download engine and the stored raw DataFrame of every updated symbol.
+    """
+    provider = provider or YFinanceProvider()
+
+    # Files stored as CSV by earlier versions are appended to, not refetched
+    migrate_csv_files()
+
+    plans = {symbol: get_request_start(symbol, full_refresh) for symbol in symbols}
+    starts = {symbol: start for symbol, (start, _) in plans.items()}
+
+    logger.info(
+        f"Fetching {len(symbols)} symbols "
+        f"(workers={max_workers}, batch_size={batch_size})"
     )
 
-    if df.empty:
-        logger.warning(f"No data received for {symbol}")
-        return
+    frames = {}
 
-    df.reset_index(inplace=True)
-    df["symbol"] = symbol
+    def on_frame(symbol, df):
+        frames[symbol] = save_price_data(symbol, df, plans[symbol][1])
+
+    results = download_universe(
+        starts,
+        provider,
+        on_frame=on_frame,
+        max_workers=max_workers,
+        batch_size=batch_size,
+        rate_limit=rate_limit,
+    )
 
-    file_path = RAW_PRICE_DIR / f"{symbol}.csv"
-    df.to_csv(file_path, index=False)
+    failed = sorted(symbol for symbol, result in results.items() if not result.ok)
+    logger.info(f"Fetched {len(results) - len(failed)}/{len(results)} symbols")
+    if failed:
+        logger.warning("Failed symbols: " + ", ".join(failed))
+
+    return results, frames
 
-    logger.success(f"Saved data for {symbol}")
 
 if __name__ == "__main__":
-    for symbol in NIFTY_50_SYMBOLS:
-        fetch_stock_data(symbol)
+    parser = argparse.ArgumentParser(description="Download EOD prices")
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Ignore stored files and download the full history again"
+    )
+    parser.add_argument(
+        "--migrate-only",
+        action="store_true",
+        help="Convert stored raw CSV files to parquet and exit"
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help="Max requests per second to the price host"
+    )
+    args = parser.parse_args()
+
+    if args.migrate_only:
+        migrate_csv_files()
+        raise SystemExit(0)
+
+    fetch_all_prices(
+        full_refresh=args.full_refresh,
+        max_workers=args.workers,
+        batch_size=args.batch_size,
+        rate_limit=args.rate_limit,
+    )
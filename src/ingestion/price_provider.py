@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+PRICE_COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+
+
+class YFinanceProvider:
+    """
+    Yahoo Finance daily bars. One call can carry many tickers, which
+    yfinance turns into a single batched request.
+    """
+
+    host = "query2.finance.yahoo.com"
+
+    def download(self, symbols: list, start: str) -> dict:
+        df = yf.download(
+            symbols,
+            start=start,
+            interval="1d",
+            group_by="ticker",
+            threads=False,
+            progress=False
+        )
+
+        frames = {}
+        if df is None or df.empty:
+            return frames
+
+        for symbol in symbols:
+            if symbol not in df.columns.get_level_values(0):
+                continue
+
+            symbol_df = df[symbol].dropna(how="all")
+            symbol_df.columns.name = None
+            if not symbol_df.empty:
+                frames[symbol] = symbol_df
+
+        return frames
+
+
+class FakePriceProvider:
+    """
+    Offline stand-in for YFinanceProvider.
+
+    Produces a deterministic random walk per symbol, can sleep to simulate
+    network latency and can fail given symbols a number of times before
+    succeeding, so the download engine can be exercised without Yahoo.
+    """
+
+    host = "fake-prices.local"
+
+    def __init__(self, latency: float = 0.0, end: str = "2026-01-09",
+                 failures: dict = None):
+        self.latency = latency
+        self.end = end
+        self.failures = dict(failures or {})
+        self.calls = 0
+
+    def download(self, symbols: list, start: str) -> dict:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        frames = {}
+        dates = pd.bdate_range(start, self.end, name="Date")
+
+        for symbol in symbols:
+            if self.failures.get(symbol, 0) > 0:
+                self.failures[symbol] -= 1
+                continue
+            if len(dates) == 0:
+                continue
+            frames[symbol] = synthetic_ohlcv(symbol, dates)
+
+        return frames
+
+
+def synthetic_ohlcv(symbol: str, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Deterministic OHLCV bars for a symbol. The walk is seeded by the symbol
+    and anchored at a fixed epoch, so overlapping date ranges agree.
+    """
+    seed = sum(ord(c) * (i + 1) for i, c in enumerate(symbol))
+    epoch = pd.Timestamp("2000-01-03")
+    offsets = np.busday_count(
+        epoch.date(), dates.values.astype("datetime64[D]")
+    )
+
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0003, 0.015, size=int(offsets.max()) + 1)
+    walk = 100 * np.exp(np.cumsum(steps))
+
+    close = walk[offsets]
+    spread = np.abs(steps[offsets]) + 0.005
+
+    return pd.DataFrame(
+        {
+            "Close": close,
+            "High": close * (1 + spread),
+            "Low": close * (1 - spread),
+            "Open": close * (1 + steps[offsets] / 2),
+            "Volume": (1_000_000 * (1 + spread * 20)).astype("int64"),
+        },
+        index=dates
+    )
@@ -1,14 +1,28 @@
+import hashlib
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from loguru import logger
 from nltk.sentiment import SentimentIntensityAnalyzer
 
+from src.storage.dataset import write_frame
+
 # ----------------------------
 # PATHS
 # ----------------------------
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 NEWS_DIR = PROJECT_ROOT / "data/processed/news"
+SENTIMENT_CACHE_FILE = PROJECT_ROOT / "data/cache/sentiment_cache.parquet"
+
+# ----------------------------
+# CACHE SETTINGS
+# ----------------------------
+# Part of every cache key: bump it when scoring or thresholds change so
+# old entries stop matching
+SCORER_VERSION = "vader-1"
+
+CACHE_MAX_AGE_DAYS = 90
+CACHE_MAX_ENTRIES = 200_000
 
 # ----------------------------
 # INIT SENTIMENT MODEL
@@ -31,27 +45,125 @@ def analyze_sentiment(text: str):
     return sentiment, round(confidence, 2)
 
 
-def process_news_file(file_path: Path):
-    logger.info(f"Analyzing sentiment → {file_path.name}")
+def headline_key(headline: str) -> str:
+    """
+    Content address of a headline. Only whitespace is normalised: VADER
+    reads capitals and punctuation, so those must stay part of the key.
+    """
+    text = " ".join(str(headline).split())
+    return hashlib.sha256(f"{SCORER_VERSION}\n{text}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Headline hash -> (sentiment, confidence), persisted between runs.
+    Entries unused for CACHE_MAX_AGE_DAYS are evicted on save, and the
+    least recently used ones beyond CACHE_MAX_ENTRIES. The file is only
+    rewritten when an entry was added or evicted, not when hits merely
+    moved last_used, so a run that scores nothing new leaves it untouched.
+    """
+
+    def __init__(self, path: Path = SENTIMENT_CACHE_FILE):
+        self.path = Path(path)
+        self.entries = {}       # key -> [sentiment, confidence, last_used]
+        self.hits = 0
+        self.misses = 0
+        self.changed = False    # entries added since the last save
+
+        if self.path.exists():
+            df = pd.read_parquet(self.path)
+            for key, sentiment, confidence, last_used in df.itertuples(index=False):
+                self.entries[key] = [sentiment, confidence, last_used]
+
+    def score(self, headline: str):
+        key = headline_key(headline)
+        now = pd.Timestamp.now(tz="UTC")
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            sentiment, confidence = analyze_sentiment(headline)
+            entry = self.entries[key] = [sentiment, confidence, now]
+            self.changed = True
+        else:
+            self.hits += 1
+            entry[2] = now
+
+        return entry[0], entry[1]
+
+    def save(self):
+        df = pd.DataFrame(
+            [(key, *entry) for key, entry in self.entries.items()],
+            columns=["key", "sentiment", "confidence", "last_used"]
+        )
+
+        if not df.empty:
+            cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=CACHE_MAX_AGE_DAYS)
+            df["last_used"] = pd.to_datetime(df["last_used"], utc=True)
+            df = df[df["last_used"] >= cutoff]
+            df = df.sort_values("last_used").tail(CACHE_MAX_ENTRIES)
+
+        # Nothing added or evicted: only last_used moved
+        if not self.changed and len(df) == len(self.entries):
+            return
+
+        write_frame(df, self.path)
+        self.changed = False
+
+        logger.info(
+            f"Sentiment cache: {self.hits} hits, {self.misses} scored, "
+            f"{len(df)} entries kept"
+        )
+
+
+def score_headlines(df: pd.DataFrame, cache: SentimentCache = None) -> pd.DataFrame:
+    """
+    Fill sentiment/confidence for the rows that do not have them yet.
+    Rows that already carry both are left untouched.
+    """
+    for col in ["sentiment", "confidence"]:
+        if col not in df.columns:
+            df[col] = None
+
+    missing = df["sentiment"].isna() | df["confidence"].isna()
+
+    sentiments = []
+    confidences = []
+
+    for headline in df.loc[missing, "headline"]:
+        if cache is None:
+            sentiment, confidence = analyze_sentiment(headline)
+        else:
+            sentiment, confidence = cache.score(headline)
+        sentiments.append(sentiment)
+        confidences.append(confidence)
+
+    df["sentiment"] = df["sentiment"].astype("object")
+    df.loc[missing, "sentiment"] = sentiments
+    df.loc[missing, "confidence"] = confidences
+    df["confidence"] = df["confidence"].astype("float64")
+
+    return df
 
+
+def process_news_file(file_path: Path, cache: SentimentCache = None):
     df = pd.read_parquet(file_path)
 
     if df.empty:
-        logger.warning("Empty file, skipping")
+        logger.warning(f"Empty file, skipping → {file_path.name}")
         return
 
-    sentiments = []
-    confidences = []
+    # Files whose rows are all scored are not rewritten
+    if "sentiment" in df.columns and "confidence" in df.columns:
+        if not (df["sentiment"].isna() | df["confidence"].isna()).any():
+            logger.info(f"Already scored → {file_path.name}")
+            return
 
-    for headline in df["headline"]:
-        sentiment, confidence = analyze_sentiment(headline)
-        sentiments.append(sentiment)
-        confidences.append(confidence)
+    logger.info(f"Analyzing sentiment → {file_path.name}")
 
-    df["sentiment"] = sentiments
-    df["confidence"] = confidences
+    df = score_headlines(df, cache)
 
-    df.to_parquet(file_path, index=False)
+    write_frame(df, file_path)
     logger.success(f"Updated sentiment → {file_path.name}")
 
 
@@ -62,8 +174,12 @@ def run_sentiment_pipeline():
         logger.warning("No news files found")
         return
 
+    cache = SentimentCache()
+
     for file in files:
-        process_news_file(file)
+        process_news_file(file, cache)
+
+    cache.save()
 
     logger.success("🧠 News sentiment analysis completed")
 
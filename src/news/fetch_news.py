@@ -1,11 +1,19 @@
 import os
+import time
+import threading
 import requests
 import pandas as pd
-from pathlib import Path
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from loguru import logger
 from dotenv import load_dotenv
 
+from src.news.news_store import (
+    advance_watermark, count_articles, get_watermark, hold_watermark, load_news,
+    merge_news, save_news
+)
+from src.pipeline.instrumentation import bind_stage, current_stage
+
 # ----------------------------
 # LOAD ENV
 # ----------------------------
@@ -15,13 +23,6 @@ NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 if not NEWS_API_KEY:
     raise ValueError("❌ NEWS_API_KEY not found. Check your .env file")
 
-# ----------------------------
-# PATHS
-# ----------------------------
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-NEWS_OUTPUT_DIR = PROJECT_ROOT / "data/processed/news"
-NEWS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
 # ----------------------------
 # COMPANY NAME MAP (IMPORTANT)
 # ----------------------------
@@ -46,44 +47,145 @@ from src.config.symbols import NIFTY_50_SYMBOLS
 # ----------------------------
 # NEWS API CONFIG
 # ----------------------------
-BASE_URL = "https://newsapi.org/v2/everything"
-DAYS_LOOKBACK = 7
+# Overridable so the fetcher can be pointed at a local stub server
+BASE_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+DAYS_LOOKBACK = 7               # first fetch of a stock
+MAX_LOOKBACK_DAYS = 30          # oldest `from` the developer plan accepts
 PAGE_SIZE = 20
+MAX_PAGES = 5                   # the developer plan serves 100 results per query
+
+MAX_CONCURRENT_REQUESTS = 8
+DAILY_REQUEST_BUDGET = 100      # NewsAPI developer plan
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER = 5         # seconds, when a 429 has no Retry-After
+REQUEST_TIMEOUT = 15
 
 
-def fetch_news_for_stock(symbol: str):
+class NewsFetchError(Exception):
     """
-    Fetch last 7 days news for a stock.
-    Always creates a parquet file (even if no news).
+    A stock's articles could not be fetched (API error, exhausted budget or
+    still rate limited after retrying).
     """
 
-    stock_code = symbol.replace(".NS", "")
-    query = COMPANY_NAME_MAP.get(stock_code, stock_code)
 
-    logger.info(f"Fetching news for {stock_code} | Query: {query}")
+class NewsQuota:
+    """
+    Gate for NewsAPI calls shared by all worker threads.
 
-    from_date = (datetime.utcnow() - timedelta(days=DAYS_LOOKBACK)).strftime("%Y-%m-%d")
+    Caps in-flight requests, stops once the request budget for the run is
+    spent and, after a 429, holds every request back until Retry-After
+    has passed instead of letting the other threads keep hammering the API.
+    """
 
-    params = {
-        "q": query,
-        "from": from_date,
-        "language": "en",
-        "sortBy": "publishedAt",
-        "pageSize": PAGE_SIZE,
-        "apiKey": NEWS_API_KEY
-    }
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 budget: int = DAILY_REQUEST_BUDGET):
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.remaining = budget
+        self.blocked_until = 0.0
 
-    response = requests.get(BASE_URL, params=params)
+    def acquire(self) -> bool:
+        self._slots.acquire()
 
-    if response.status_code != 200:
-        logger.error(f"{stock_code} failed: {response.text}")
-        articles = []
-    else:
-        articles = response.json().get("articles", [])
+        with self._lock:
+            if self.remaining <= 0:
+                self._slots.release()
+                return False
+            self.remaining -= 1
+            wait = self.blocked_until - time.monotonic()
 
-    # ----------------------------
-    # ALWAYS CREATE FILE
-    # ----------------------------
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def release(self):
+        self._slots.release()
+
+    def back_off(self, seconds: float):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def create_session(pool_size: int = MAX_CONCURRENT_REQUESTS) -> requests.Session:
+    """
+    One keep-alive connection pool for the whole run, so each query reuses
+    an open TLS connection instead of doing a fresh handshake.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_retry_after(value) -> float:
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def request_articles(session: requests.Session, params: dict,
+                     quota: NewsQuota, stock_code: str) -> list:
+    for attempt in range(1, MAX_RETRIES + 1):
+        if not quota.acquire():
+            raise NewsFetchError("request budget exhausted")
+
+        try:
+            response = session.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+        finally:
+            quota.release()
+
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            logger.warning(
+                f"{stock_code} rate limited, retrying in {retry_after:.0f}s "
+                f"(attempt {attempt}/{MAX_RETRIES})"
+            )
+            quota.back_off(retry_after)
+            continue
+
+        if response.status_code != 200:
+            raise NewsFetchError(f"HTTP {response.status_code}: {response.text}")
+
+        return response.json().get("articles", [])
+
+    raise NewsFetchError(f"still rate limited after {MAX_RETRIES} attempts")
+
+
+def request_new_articles(session: requests.Session, params: dict, quota: NewsQuota,
+                         stock_code: str, watermark=None) -> tuple:
+    """
+    Page back from the newest article until a page is not full or reaches
+    the watermark, so a busy day does not leave a gap behind the newest
+    PAGE_SIZE articles.
+
+    Returns (articles, error); error says why paging stopped before
+    reaching the watermark, and is None when nothing was missed.
+    """
+    articles = []
+    for page in range(1, MAX_PAGES + 1):
+        try:
+            batch = request_articles(session, {**params, "page": page}, quota, stock_code)
+        except (requests.RequestException, NewsFetchError) as e:
+            return articles, str(e)
+
+        articles += batch
+        if len(batch) < PAGE_SIZE:
+            return articles, None
+
+        oldest = min(pd.Timestamp(article["publishedAt"]) for article in batch)
+        if watermark is not None and oldest <= watermark:
+            return articles, None
+
+    return articles, f"more than {MAX_PAGES * PAGE_SIZE} new articles"
+
+
+def build_news_frame(stock_code: str, articles: list) -> pd.DataFrame:
+    """
+    Turn NewsAPI articles into rows.
+    Always returns at least one row (a placeholder when there is no news).
+    """
     rows = []
 
     if not articles:
@@ -108,23 +210,124 @@ def fetch_news_for_stock(symbol: str):
     df = pd.DataFrame(rows)
     df["date"] = pd.to_datetime(df["date"])
 
-    output_file = NEWS_OUTPUT_DIR / f"{stock_code}.parquet"
-    df.to_parquet(output_file, index=False)
+    return df
+
+
+def get_from_date(watermark=None) -> str:
+    """
+    Start of the request window: the stock's watermark (newest article
+    already stored), or the default lookback for a stock seen for the
+    first time.
+    """
+    now = pd.Timestamp.now(tz="UTC")
+
+    if watermark is None:
+        start = now - pd.Timedelta(days=DAYS_LOOKBACK)
+    else:
+        start = max(watermark, now - pd.Timedelta(days=MAX_LOOKBACK_DAYS))
+
+    return start.tz_convert("UTC").strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def fetch_news_for_stock(symbol: str, session: requests.Session = None,
+                         quota: NewsQuota = None, save: bool = True):
+    """
+    Fetch the articles published since the stock's watermark and merge
+    them into its stored news. Always creates a parquet file (even if no
+    news, or the request failed). When the fetch stopped before reaching
+    the watermark, the watermark is held, so the next fetch asks for the
+    missed articles again.
+
+    Returns (merged recent news, error); error is None when every new
+    article was fetched.
+    """
+
+    stock_code = symbol.replace(".NS", "")
+    query = COMPANY_NAME_MAP.get(stock_code, stock_code)
+
+    logger.info(f"Fetching news for {stock_code} | Query: {query}")
+
+    watermark = get_watermark(stock_code)
+    from_date = get_from_date(watermark)
+
+    params = {
+        "q": query,
+        "from": from_date,
+        "language": "en",
+        "sortBy": "publishedAt",
+        "pageSize": PAGE_SIZE,
+        "apiKey": NEWS_API_KEY
+    }
+
+    session = session or create_session(pool_size=1)
+    quota = quota or NewsQuota(max_concurrent=1)
 
-    logger.success(f"Saved news → {output_file.name} ({len(df)} rows)")
+    articles, error = request_new_articles(session, params, quota, stock_code, watermark)
+    if error is not None:
+        logger.error(f"{stock_code} failed: {error} ({len(articles)} articles fetched)")
+    hold_watermark(stock_code, held=error is not None)
+
+    # ----------------------------
+    # MERGE INTO THE STORE
+    # ----------------------------
+    stored = load_news(stock_code)
+    df = merge_news(stored, build_news_frame(stock_code, articles))
 
+    added = count_articles(df) - count_articles(stored)
+    logger.info(f"{stock_code}: {added} new articles")
 
-def run_news_pipeline():
+    # Unchanged files are not rewritten; a missing one is always created
+    if save and (stored.empty or added):
+        save_news(stock_code, df)
+    elif save:
+        # A watermark held by an earlier fetch catches up with what is stored
+        advance_watermark(stock_code, df)
+
+    return df, error
+
+
+def run_news_pipeline(symbols=NIFTY_50_SYMBOLS,
+                      max_workers: int = MAX_CONCURRENT_REQUESTS,
+                      budget: int = DAILY_REQUEST_BUDGET,
+                      save: bool = True):
+    """
+    Fetch news for every symbol.
+
+    Returns (frames, errors): stock code -> news DataFrame, and stock code
+    -> error for every stock whose fetch failed. A stock with a failed
+    request still has a frame (its stored news); one that crashed has none.
+    """
     logger.info("📰 Starting news fetch pipeline")
 
-    for symbol in NIFTY_50_SYMBOLS:
-        try:
-            fetch_news_for_stock(symbol)
-        except Exception as e:
-            logger.error(f"{symbol} crashed: {e}")
+    session = create_session(pool_size=max_workers)
+    quota = NewsQuota(max_concurrent=max_workers, budget=budget)
+    stage = current_stage()
+
+    def fetch(symbol):
+        with bind_stage(stage):
+            try:
+                return fetch_news_for_stock(symbol, session=session, quota=quota, save=save)
+            except Exception as e:
+                logger.error(f"{symbol} crashed: {e}")
+                return None, f"{type(e).__name__}: {e}"
+
+    with session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fetched = list(pool.map(fetch, symbols))
 
+    frames, errors = {}, {}
+    for symbol, (df, error) in zip(symbols, fetched):
+        stock_code = symbol.replace(".NS", "")
+        if df is not None:
+            frames[stock_code] = df
+        if error is not None:
+            errors[stock_code] = error
+
+    if errors:
+        logger.error(f"News fetch failed for {len(errors)}/{len(symbols)} stocks")
     logger.success("📰 News fetching completed")
 
+    return frames, errors
+
 
 if __name__ == "__main__":
     run_news_pipeline()
@@ -0,0 +1,215 @@
+"""
+Append-only news store.
+
+data/processed/news/<stock>.parquet holds the recent articles of a stock
+(what the dashboard and sentiment scoring read). Articles older than
+ARCHIVE_AFTER_DAYS are compacted into one file per month under
+data/processed/news/archive/<stock>/<YYYY-MM>.parquet.
+
+Articles are keyed by URL, or by a hash of the headline when there is no
+URL, so re-fetched articles are dropped and keep their existing sentiment.
+watermarks.json records the newest publishedAt stored per stock; the
+fetcher asks the API only for articles from that point on, and holds the
+watermark when it could not page back that far.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import pandas as pd
+from pathlib import Path
+from loguru import logger
+
+from src.storage.dataset import write_frame
+
+# ----------------------------
+# PATHS
+# ----------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+NEWS_DIR = PROJECT_ROOT / "data/processed/news"
+ARCHIVE_DIR = NEWS_DIR / "archive"
+WATERMARK_FILE = NEWS_DIR / "watermarks.json"
+
+ARCHIVE_AFTER_DAYS = 30
+
+# Row written when a stock has no news at all, so its file always exists
+PLACEHOLDER_SOURCE = "N/A"
+
+_watermark_lock = threading.Lock()
+
+# Stocks whose last fetch stopped before reaching their watermark. Saving
+# them must not advance it past the articles that were missed.
+_held_watermarks = set()
+
+
+# ----------------------------
+# KEYS
+# ----------------------------
+def article_keys(df: pd.DataFrame) -> pd.Series:
+    urls = df["url"].fillna("").astype(str)
+    headlines = df["headline"].fillna("").astype(str)
+
+    hashed = headlines.map(
+        lambda h: "h:" + hashlib.sha256(" ".join(h.split()).encode("utf-8")).hexdigest()
+    )
+    return urls.where(urls != "", hashed)
+
+
+def is_placeholder(df: pd.DataFrame) -> pd.Series:
+    return (df["source"] == PLACEHOLDER_SOURCE) & (df["url"].fillna("") == "")
+
+
+def count_articles(df: pd.DataFrame) -> int:
+    return 0 if df.empty else int((~is_placeholder(df)).sum())
+
+
+# ----------------------------
+# WATERMARKS
+# ----------------------------
+def read_watermarks() -> dict:
+    if not WATERMARK_FILE.exists():
+        return {}
+    return json.loads(WATERMARK_FILE.read_text())
+
+
+def get_watermark(stock_code: str):
+    value = read_watermarks().get(stock_code)
+    return pd.Timestamp(value) if value else None
+
+
+def hold_watermark(stock_code: str, held: bool = True):
+    with _watermark_lock:
+        if held:
+            _held_watermarks.add(stock_code)
+        else:
+            _held_watermarks.discard(stock_code)
+
+
+def update_watermark(stock_code: str, published: pd.Timestamp):
+    with _watermark_lock:
+        watermarks = read_watermarks()
+
+        if stock_code in _held_watermarks:
+            return
+
+        current = watermarks.get(stock_code)
+        if current and pd.Timestamp(current) >= published:
+            return
+
+        watermarks[stock_code] = published.isoformat()
+
+        WATERMARK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = WATERMARK_FILE.with_name(f".{WATERMARK_FILE.name}.tmp")
+        tmp_file.write_text(json.dumps(watermarks, indent=2, sort_keys=True))
+        os.replace(tmp_file, WATERMARK_FILE)
+
+
+def advance_watermark(stock_code: str, df: pd.DataFrame):
+    """
+    Move the watermark up to the newest real article of `df`.
+    """
+    real = df[~is_placeholder(df)] if not df.empty else df
+    if not real.empty:
+        update_watermark(stock_code, real["date"].max())
+
+
+# ----------------------------
+# READ / MERGE
+# ----------------------------
+def news_path(stock_code: str) -> Path:
+    return NEWS_DIR / f"{stock_code}.parquet"
+
+
+def load_news(stock_code: str) -> pd.DataFrame:
+    path = news_path(stock_code)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_parquet(path)
+
+
+def merge_news(stored: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stored articles plus the fresh ones not seen before. Stored rows win,
+    so their sentiment is kept; placeholders are dropped once real
+    articles exist. Without any, a stored placeholder is kept as is so the
+    file does not change on every run.
+    """
+    frames = [df for df in [stored, fresh] if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+
+    real = df[~is_placeholder(df)]
+    if real.empty:
+        return df.head(1).reset_index(drop=True)
+
+    real = real[~article_keys(real).duplicated(keep="first")]
+    return real.sort_values("date").reset_index(drop=True)
+
+
+def read_news(stock_code: str, since=None) -> pd.DataFrame:
+    """
+    Recent and archived articles of a stock, optionally from `since` on.
+    Only the archive months that can contain such rows are opened.
+    """
+    frames = []
+
+    archive = ARCHIVE_DIR / stock_code
+    if archive.exists():
+        first_month = pd.Timestamp(since).strftime("%Y-%m") if since is not None else ""
+        for path in sorted(archive.glob("*.parquet")):
+            if path.stem >= first_month:
+                frames.append(pd.read_parquet(path))
+
+    frames.append(load_news(stock_code))
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    if since is not None:
+        df = df[df["date"] >= pd.Timestamp(since, tz="UTC")]
+    return df.sort_values("date").reset_index(drop=True)
+
+
+# ----------------------------
+# WRITE / COMPACT
+# ----------------------------
+def compact_news(stock_code: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Move articles older than ARCHIVE_AFTER_DAYS into the monthly archive
+    files. Returns the rows that stay in the recent file.
+    """
+    if df.empty or is_placeholder(df).all():
+        return df
+
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=ARCHIVE_AFTER_DAYS)
+    old = df[df["date"] < cutoff]
+    if old.empty:
+        return df
+
+    archive = ARCHIVE_DIR / stock_code
+    months = old["date"].dt.tz_convert("UTC").dt.strftime("%Y-%m")
+
+    for month, rows in old.groupby(months):
+        path = archive / f"{month}.parquet"
+        stored = pd.read_parquet(path) if path.exists() else pd.DataFrame()
+        write_frame(merge_news(stored, rows), path)
+
+    logger.info(f"Archived {len(old)} {stock_code} articles older than {ARCHIVE_AFTER_DAYS} days")
+    return df[df["date"] >= cutoff].reset_index(drop=True)
+
+
+def save_news(stock_code: str, df: pd.DataFrame):
+    """
+    Write the recent file of a stock (after compaction) and advance its
+    watermark to the newest stored article, unless the watermark is held
+    (see hold_watermark).
+    """
+    df = compact_news(stock_code, df)
+    write_frame(df, news_path(stock_code))
+    advance_watermark(stock_code, df)
+
+    logger.success(f"Saved news → {stock_code}.parquet ({len(df)} rows)")
@@ -0,0 +1,164 @@
+"""
+Build cache for per-symbol stages, in the spirit of make/ninja.
+
+For every (stage, symbol) the fingerprint of the inputs that produced the
+current output is kept in data/cache/build_state.json. A fingerprint
+combines the content hash of the input files or frames with the stage's
+code version (the source of the functions it runs) and its parameters, so
+editing a transform invalidates its outputs. A symbol is skipped when its
+fingerprint matches and all of its outputs exist; `force` disables skipping.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BUILD_STATE_FILE = PROJECT_ROOT / "data/cache/build_state.json"
+
+_state_lock = threading.Lock()
+
+
+# ----------------------------
+# FINGERPRINTS
+# ----------------------------
+def code_version(*funcs, params: dict = None) -> str:
+    """
+    Hash of the source of `funcs` (functions or whole modules) and `params`.
+    """
+    digest = hashlib.sha256()
+    for func in funcs:
+        digest.update(inspect.getsource(func).encode("utf-8"))
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(version: str, *inputs) -> str:
+    """
+    Fingerprint of a symbol's inputs (paths or DataFrames) under a code version.
+    A missing input file gives a fingerprint that never matches.
+    """
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for item in inputs:
+        if isinstance(item, pd.DataFrame):
+            digest.update(frame_hash(item).encode("utf-8"))
+        elif Path(item).exists():
+            digest.update(file_hash(item).encode("utf-8"))
+        else:
+            digest.update(f"missing:{item}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ----------------------------
+# STATE
+# ----------------------------
+def _read_state(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+class BuildCache:
+    """
+    Fingerprints of one stage: split() the keys into stale and fresh,
+    record() the fingerprint of every key that was rebuilt, then save().
+    run_memoized does all three for the file-based stages.
+    """
+
+    def __init__(self, stage: str, version: str, force: bool = False,
+                 path: Path = BUILD_STATE_FILE):
+        self.stage = stage
+        self.version = version
+        self.force = force
+        self.path = Path(path)
+        self.entries = _read_state(self.path).get(stage, {})
+        self.updates = {}
+
+    def fingerprint(self, *inputs) -> str:
+        return fingerprint(self.version, *inputs)
+
+    def is_fresh(self, key: str, fp: str, outputs=()) -> bool:
+        if self.force:
+            return False
+        return self.entries.get(str(key)) == fp and all(Path(p).exists() for p in outputs)
+
+    def split(self, fingerprints: dict, outputs) -> tuple:
+        """
+        (stale, fresh) keys of `fingerprints`; outputs(key) lists the files
+        the stage writes for that key.
+        """
+        stale, fresh = [], []
+        for key, fp in fingerprints.items():
+            (fresh if self.is_fresh(key, fp, outputs(key)) else stale).append(key)
+
+        if fresh:
+            logger.info(f"{self.stage}: {len(fresh)} unchanged symbol(s) skipped")
+        return stale, fresh
+
+    def record(self, key: str, fp: str):
+        self.updates[str(key)] = fp
+
+    def save(self, only=None):
+        """
+        Persist recorded fingerprints; with `only`, just those keys (the
+        ones whose output was actually written).
+        """
+        updates = dict(self.updates)
+        if only is not None:
+            only = {str(key) for key in only}
+            updates = {k: v for k, v in updates.items() if k in only}
+        if not updates:
+            return
+
+        # Other stages may have saved meanwhile: merge into the file's state
+        with _state_lock:
+            state = _read_state(self.path)
+            state.setdefault(self.stage, {}).update(updates)
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.path.with_name(f".{self.path.name}.tmp")
+            tmp_file.write_text(json.dumps(state, indent=1, sort_keys=True))
+            os.replace(tmp_file, self.path)
+
+        self.entries.update(updates)
+        for key in updates:
+            del self.updates[key]
+
+
+def run_memoized(stage: str, version: str, func, inputs: dict, outputs,
+                 max_workers: int = None, force: bool = False) -> dict:
+    """
+    run_per_symbol over the keys of `inputs` (key -> list of input paths)
+    whose fingerprint changed or whose outputs(key) are missing.
+    Fingerprints are stored for the keys that succeeded.
+    """
+    from src.pipeline.executor import run_per_symbol
+
+    cache = BuildCache(stage, version, force=force)
+    fingerprints = {key: cache.fingerprint(*paths) for key, paths in inputs.items()}
+    stale, _ = cache.split(fingerprints, outputs)
+
+    results = run_per_symbol(func, stale, max_workers, label=stage)
+
+    for key, result in results.items():
+        if result.ok:
+            cache.record(key, fingerprints[key])
+    cache.save()
+
+    return results
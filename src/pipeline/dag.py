@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from loguru import logger
+
+from src.pipeline.instrumentation import StageMetrics, count_rows, track_stage
+
+
+@dataclass
+class Stage:
+    """
+    One node of the pipeline.
+
+    `func` receives the outputs of the stages named in `inputs` as keyword
+    arguments and returns this stage's output. `persist`, if given, writes
+    that output to disk and only runs when the stage is configured to persist.
+    """
+
+    name: str
+    func: Callable
+    inputs: list = field(default_factory=list)
+    persist: Optional[Callable] = None
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+class Pipeline:
+    def __init__(self, stages: list):
+        self.stages = {stage.name: stage for stage in stages}
+
+        if len(self.stages) != len(stages):
+            raise PipelineError("Duplicate stage names")
+
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise PipelineError(f"{stage.name} depends on unknown stage(s): {missing}")
+
+        self.order = self._topological_order()
+
+        # Stage name -> StageMetrics of the last run
+        self.metrics = {}
+
+    def _topological_order(self) -> list:
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise PipelineError("Cycle in pipeline: " + " -> ".join(path + [name]))
+
+            state[name] = "visiting"
+            for dep in self.stages[name].inputs:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+        return order
+
+    def run(self, persist=(), max_workers: int = 2) -> dict:
+        """
+        Run every stage once its inputs are ready, keeping outputs in memory.
+        Stages whose inputs are all available run in parallel, so independent
+        branches overlap. Returns a dict of stage name -> output; per-stage
+        metrics are left in self.metrics, also when the run fails.
+        """
+        persist = set(persist)
+        unknown = persist - set(self.stages)
+        if unknown:
+            raise PipelineError(f"Cannot persist unknown stage(s): {sorted(unknown)}")
+
+        outputs = {}
+        failed = set()
+        remaining = list(self.order)
+        running = {}
+        self.metrics = {name: StageMetrics(name) for name in self.order}
+
+        def execute(stage):
+            logger.info(f"▶ Running stage: {stage.name}")
+            inputs = {name: outputs[name] for name in stage.inputs}
+
+            with track_stage(self.metrics[stage.name]) as metrics:
+                metrics.rows_in = count_rows(inputs)
+                result = stage.func(**inputs)
+                metrics.rows_out = count_rows(result)
+
+                if stage.name in persist and stage.persist is not None:
+                    stage.persist(result)
+                    logger.info(f"💾 Persisted stage: {stage.name}")
+
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while remaining or running:
+                for name in list(remaining):
+                    stage = self.stages[name]
+
+                    if any(dep in failed for dep in stage.inputs):
+                        logger.error(f"Skipping {name}: upstream stage failed")
+                        self.metrics[name].status = "skipped"
+                        failed.add(name)
+                        remaining.remove(name)
+                    elif all(dep in outputs for dep in stage.inputs):
+                        running[pool.submit(execute, stage)] = name
+                        remaining.remove(name)
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        outputs[name] = future.result()
+                        self.metrics[name].status = "ok"
+                        logger.success(f"✔ Stage completed: {name}")
+                    except Exception as e:
+                        logger.exception(f"Stage {name} failed: {e}")
+                        self.metrics[name].status = "failed"
+                        self.metrics[name].error = f"{type(e).__name__}: {e}"
+                        failed.add(name)
+
+        if failed:
+            raise PipelineError(f"Pipeline failed at: {sorted(failed)}")
+
+        return outputs
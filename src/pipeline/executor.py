@@ -0,0 +1,163 @@
+"""
+Parallel executor for the per-symbol stages.
+
+Runs one task per key (a symbol or a file) on a process pool and collects
+a TaskResult per key instead of stopping at the first failure. Log
+records emitted inside a worker are captured and replayed in the parent
+in input order, so the output reads the same as a serial run. Runs
+in-process when there is one worker or the pool cannot start; if the pool
+breaks part way, only the keys without a result are rerun in-process.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+
+from loguru import logger
+
+from src.pipeline.instrumentation import StageMetrics, bind_stage, record_io
+
+# Overridable per run, e.g. PIPELINE_WORKERS=1 to force serial execution
+DEFAULT_WORKERS = int(os.getenv("PIPELINE_WORKERS", os.cpu_count() or 1))
+
+# Tasks handed to a worker at a time, relative to the number of workers
+CHUNKS_PER_WORKER = 4
+
+
+@dataclass
+class TaskResult:
+    key: str
+    ok: bool
+    value: object = None
+    error: str = None
+    seconds: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    logs: list = field(default_factory=list)
+
+
+# ----------------------------
+# WORKER SIDE
+# ----------------------------
+_captured = []
+
+
+def _capture(message):
+    record = message.record
+    _captured.append({
+        "level": record["level"].name,
+        "message": record["message"],
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "time": record["time"],
+    })
+
+
+def _init_worker():
+    # Hold records back for the parent instead of writing them directly
+    logger.remove()
+    logger.add(_capture, level=0, format="{message}")
+
+
+def _run_task(func, key) -> TaskResult:
+    _captured.clear()
+    start = time.perf_counter()
+
+    # A worker process cannot reach the parent's stage, so the task's I/O is
+    # counted here and added to the stage by run_per_symbol
+    with bind_stage(StageMetrics(str(key))) as io:
+        try:
+            result = TaskResult(key, True, value=func(key))
+        except Exception as e:
+            logger.error(f"{key} failed: {e}")
+            result = TaskResult(key, False, error=f"{type(e).__name__}: {e}")
+
+    result.seconds = time.perf_counter() - start
+    result.bytes_read = io.bytes_read
+    result.bytes_written = io.bytes_written
+
+    # Empty when running in the parent, which logs directly
+    result.logs = _captured[:]
+    return result
+
+
+# ----------------------------
+# PARENT SIDE
+# ----------------------------
+def _replay(logs: list):
+    for entry in logs:
+        def patch(record, entry=entry):
+            record.update(
+                name=entry["name"], function=entry["function"],
+                line=entry["line"], time=entry["time"]
+            )
+
+        logger.patch(patch).log(entry["level"], entry["message"])
+
+
+def _run_serial(func, keys: list) -> list:
+    return [_run_task(func, key) for key in keys]
+
+
+def _run_pool(func, keys: list, max_workers: int, chunksize: int, results: list) -> list:
+    # Results are appended as they arrive, so the caller keeps them if the
+    # pool breaks part way through
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+        # map yields in input order, so logs are replayed in that order
+        for result in pool.map(partial(_run_task, func), keys, chunksize=chunksize):
+            _replay(result.logs)
+            results.append(result)
+    return results
+
+
+def run_per_symbol(func, keys, max_workers: int = None, chunksize: int = None,
+                   label: str = "task") -> dict:
+    """
+    Run func(key) for every key and return key -> TaskResult.
+
+    func must be a module-level function so it can be sent to a worker
+    process. max_workers=1 runs everything in this process.
+    """
+    keys = list(keys)
+    max_workers = max(1, min(max_workers or DEFAULT_WORKERS, len(keys) or 1))
+    chunksize = chunksize or max(1, len(keys) // (max_workers * CHUNKS_PER_WORKER))
+
+    start = time.perf_counter()
+
+    if max_workers == 1:
+        results = _run_serial(func, keys)
+    else:
+        results = []
+        try:
+            _run_pool(func, keys, max_workers, chunksize, results)
+        except (OSError, BrokenProcessPool) as e:
+            done = {result.key for result in results}
+            missing = [key for key in keys if key not in done]
+            logger.warning(
+                f"{label}: process pool unavailable ({e}), "
+                f"running the remaining {len(missing)} serially"
+            )
+            results += _run_serial(func, missing)
+
+    results = {result.key: result for result in results}
+    record_io(
+        read=sum(result.bytes_read for result in results.values()),
+        written=sum(result.bytes_written for result in results.values())
+    )
+    summarize(results, label, time.perf_counter() - start, max_workers)
+    return results
+
+
+def summarize(results: dict, label: str, seconds: float, workers: int):
+    failed = [key for key, result in results.items() if not result.ok]
+
+    logger.info(
+        f"{label}: {len(results) - len(failed)}/{len(results)} succeeded "
+        f"in {seconds:.2f}s on {workers} worker(s)"
+    )
+    if failed:
+        logger.error(f"{label} failed for: {', '.join(map(str, failed))}")
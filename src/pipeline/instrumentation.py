@@ -0,0 +1,121 @@
+"""
+Per-stage metrics for pipeline runs.
+
+Pipeline.run wraps every stage in `track_stage`, which measures wall and
+CPU time, rows in and out and peak RSS. Code running inside the stage adds
+parquet bytes read/written (`record_io`, called by src.storage.dataset)
+and per-symbol failures (`record_failure`). The active stage is kept per
+thread, so stages running side by side do not mix their counters; outside
+a pipeline run both calls are no-ops.
+
+Work a stage hands to a thread pool is counted by binding the stage in the
+worker thread (`bind_stage`). Process pool workers cannot reach the
+parent's stage: run_per_symbol collects their I/O per task and adds it to
+the stage in the parent.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+_local = threading.local()
+
+# Counters of one stage may be updated from several worker threads
+_counter_lock = threading.Lock()
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    status: str = "pending"          # ok | failed | skipped
+    started_at: str = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0         # CPU of the thread running the stage
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_read: int = 0              # Arrow bytes decoded from parquet, workers included
+    bytes_written: int = 0           # parquet bytes written
+    peak_rss_mb: float = None        # process high-water mark after the stage
+    failures: dict = field(default_factory=dict)   # symbol -> error
+    error: str = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def count_rows(value) -> int:
+    """
+    Rows in a stage input/output: a DataFrame or a dict of DataFrames.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(count_rows(v) for v in value.values())
+    return 0
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def current_stage():
+    return getattr(_local, "stage", None)
+
+
+def record_io(read: int = 0, written: int = 0):
+    stage = current_stage()
+    if stage is not None:
+        with _counter_lock:
+            stage.bytes_read += read
+            stage.bytes_written += written
+
+
+def record_failure(key: str, error):
+    stage = current_stage()
+    if stage is not None:
+        with _counter_lock:
+            stage.failures[str(key)] = str(error)
+
+
+@contextmanager
+def bind_stage(metrics):
+    """
+    Make `metrics` the active stage of this thread for the block. Used in
+    worker threads with the stage captured by the thread that submitted
+    the work, so their I/O and failures count towards it.
+    """
+    previous = current_stage()
+    _local.stage = metrics
+    try:
+        yield metrics
+    finally:
+        _local.stage = previous
+
+
+@contextmanager
+def track_stage(metrics: StageMetrics):
+    """
+    Make `metrics` the active stage of this thread and time the block.
+    """
+    metrics.started_at = pd.Timestamp.now(tz="UTC").isoformat()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+
+    try:
+        with bind_stage(metrics):
+            yield metrics
+    finally:
+        metrics.wall_seconds = round(time.perf_counter() - wall, 3)
+        metrics.cpu_seconds = round(time.thread_time() - cpu, 3)
+        metrics.peak_rss_mb = peak_rss_mb()
@@ -0,0 +1,135 @@
+"""
+Run manifests: one JSON file per pipeline run under data/runs, holding the
+run's settings, outcome and per-stage metrics. The newest MAX_RUNS files
+are kept as a rolling history, which the dashboard health view reads.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+RUNS_DIR = PROJECT_ROOT / "data/runs"
+
+MAX_RUNS = 90
+
+# Health thresholds
+STALE_AFTER_HOURS = 96          # covers a weekend plus a holiday
+SLOW_FACTOR = 2.0               # stage wall time vs its recent median
+SLOW_MIN_SECONDS = 5.0          # ignore slowdowns of short stages
+HISTORY_WINDOW = 10             # earlier runs the median is taken over
+
+
+def build_manifest(pipeline, started_at: pd.Timestamp, status: str,
+                   settings: dict = None, error: str = None) -> dict:
+    finished_at = pd.Timestamp.now(tz="UTC")
+    stages = [pipeline.metrics[name].to_dict() for name in pipeline.order
+              if name in pipeline.metrics]
+
+    return {
+        "run_id": started_at.strftime("%Y%m%dT%H%M%SZ"),
+        "started_at": started_at.isoformat(),
+        "finished_at": finished_at.isoformat(),
+        "wall_seconds": round((finished_at - started_at).total_seconds(), 3),
+        "status": status,
+        "error": error,
+        "settings": settings or {},
+        "symbol_failures": sum(len(stage["failures"]) for stage in stages),
+        "stages": stages,
+    }
+
+
+def write_manifest(manifest: dict, runs_dir: Path = RUNS_DIR) -> Path:
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    path = runs_dir / f"{manifest['run_id']}.json"
+
+    tmp_file = path.with_name(f".{path.name}.tmp")
+    tmp_file.write_text(json.dumps(manifest, indent=2, default=str))
+    os.replace(tmp_file, path)
+
+    # Rolling history: run ids sort chronologically
+    for old in sorted(runs_dir.glob("*.json"))[:-MAX_RUNS]:
+        old.unlink()
+
+    logger.info(f"Run manifest → {path.name}")
+    return path
+
+
+def load_runs(runs_dir: Path = RUNS_DIR, limit: int = None) -> list:
+    """
+    Manifests of past runs, oldest first.
+    """
+    files = sorted(runs_dir.glob("*.json"))
+    if limit:
+        files = files[-limit:]
+    return [json.loads(path.read_text()) for path in files]
+
+
+def stage_history(runs: list) -> pd.DataFrame:
+    """
+    One row per (run, stage) with its metrics, for plotting over time.
+    """
+    rows = []
+    for run in runs:
+        for stage in run["stages"]:
+            rows.append({
+                "run_id": run["run_id"],
+                "started_at": pd.Timestamp(run["started_at"]),
+                "run_status": run["status"],
+                "stage": stage["name"],
+                "status": stage["status"],
+                "wall_seconds": stage["wall_seconds"],
+                "cpu_seconds": stage["cpu_seconds"],
+                "rows_in": stage["rows_in"],
+                "rows_out": stage["rows_out"],
+                "bytes_read": stage["bytes_read"],
+                "bytes_written": stage["bytes_written"],
+                "peak_rss_mb": stage["peak_rss_mb"],
+                "failures": len(stage["failures"]),
+            })
+    return pd.DataFrame(rows)
+
+
+def assess_health(runs: list, now: pd.Timestamp = None):
+    """
+    (status, reasons) for the latest run: "Healthy", "Degraded", "Failed"
+    or "Unknown" when no run has been recorded.
+    """
+    if not runs:
+        return "Unknown", ["No pipeline run has been recorded yet"]
+
+    now = now or pd.Timestamp.now(tz="UTC")
+    latest = runs[-1]
+
+    if latest["status"] != "success":
+        failed = [s["name"] for s in latest["stages"] if s["status"] == "failed"]
+        return "Failed", [f"Last run failed at: {', '.join(failed) or latest.get('error')}"]
+
+    reasons = []
+
+    age = now - pd.Timestamp(latest["finished_at"])
+    if age > pd.Timedelta(hours=STALE_AFTER_HOURS):
+        reasons.append(f"Last successful run finished {age.total_seconds() / 3600:.0f}h ago")
+
+    for stage in latest["stages"]:
+        if stage["failures"]:
+            reasons.append(f"{stage['name']}: {len(stage['failures'])} symbol(s) failed")
+
+    history = stage_history(runs[-HISTORY_WINDOW - 1:-1])
+    if not history.empty:
+        history = history[history["status"] == "ok"]
+        medians = history.groupby("stage")["wall_seconds"].median()
+
+        for stage in latest["stages"]:
+            median = medians.get(stage["name"])
+            seconds = stage["wall_seconds"]
+            if median and seconds > SLOW_MIN_SECONDS and seconds > SLOW_FACTOR * median:
+                reasons.append(
+                    f"{stage['name']} took {seconds:.1f}s, "
+                    f"{seconds / median:.1f}x its recent median"
+                )
+
+    return ("Degraded" if reasons else "Healthy"), reasons
@@ -0,0 +1,368 @@
+"""
+Market intelligence pipeline declared as DAG stages.
+
+Price branch: fetch_prices -> validate_prices -> normalize_prices
+              -> build_price_features -> classify_market_regime
+              -> generate_signals -> backtest_signals
+              (fused/incremental/panel: ... -> normalize_prices
+               -> generate_signals -> backtest_signals)
+News branch:  fetch_news -> analyze_sentiment
+
+Every stage passes a dict of symbol -> DataFrame to the next one in memory.
+Raw prices are always written by fetch_prices because incremental
+ingestion appends to them; other stages only write when asked to.
+
+validate_prices is the gate: offending bars are quarantined and never
+reach the transforms. Symbols whose raw prices have not changed since their
+signals were last written are dropped right after it (see
+src.pipeline.build_cache), unless the pipeline is built with force=True.
+"""
+
+from functools import partial
+from loguru import logger
+
+from src.pipeline.build_cache import BuildCache, code_version
+from src.pipeline.dag import Stage, Pipeline
+from src.pipeline.instrumentation import record_failure
+from src.storage.dataset import write_symbol, symbol_path
+
+# Stages written to disk when nothing else is configured: the tables the
+# dashboard reads, and the clean price table the standalone runners,
+# panel and regime sweep read
+DEFAULT_PERSIST = [
+    "normalize_prices", "generate_signals", "backtest_signals", "analyze_sentiment"
+]
+
+
+def write_frames(frames: dict, table: str):
+    for key, df in frames.items():
+        write_symbol(table, key, df)
+
+
+def map_frames(func, frames: dict, label: str) -> dict:
+    """
+    Apply a per-symbol transform. One bad symbol is logged and dropped
+    rather than failing the whole stage.
+    """
+    results = {}
+    for key, df in frames.items():
+        try:
+            results[key] = func(df)
+        except Exception as e:
+            logger.error(f"{label} failed for {key}: {e}")
+            record_failure(key, e)
+    return results
+
+
+# ----------------------------
+# PRICE BRANCH
+# ----------------------------
+def signal_outputs(symbol: str, write_intermediates: bool = False) -> list:
+    tables = ["signals"] + (["features", "market_regime"] if write_intermediates else [])
+    return [symbol_path(table, symbol) for table in tables]
+
+
+def signals_build_cache(write_intermediates: bool = False, force: bool = False) -> BuildCache:
+    """
+    Fingerprints of raw price frame -> stored signals, shared by all modes
+    (chained, fused, incremental and panel produce the same tables).
+    """
+    from src.transform.normalize_and_save_parquet import normalize_price_frame
+    from src.transform.build_price_features import add_price_features
+    from src.transform.classify_market_regime import classify_regime
+    from src.transform.generate_signals import generate_signals
+    from src.transform import indicators
+    from src.validation.validate_prices import check_prices, row_checks
+
+    version = code_version(
+        check_prices, row_checks, indicators,
+        normalize_price_frame, add_price_features, classify_regime, generate_signals,
+        params={"write_intermediates": write_intermediates}
+    )
+    return BuildCache("pipeline_signals", version, force=force)
+
+
+def fetch_prices_stage(full_refresh: bool = False) -> dict:
+    from src.ingestion.fetch_prices import fetch_all_prices
+    results, frames = fetch_all_prices(full_refresh=full_refresh)
+
+    for symbol, result in results.items():
+        if not result.ok:
+            record_failure(symbol, result.error)
+    return frames
+
+
+def validate_prices_stage(fetch_prices: dict, cache: BuildCache = None,
+                          write_intermediates: bool = False, strict: bool = False) -> dict:
+    """
+    Validate the whole fetched universe (the trading calendar is derived from
+    it), then pass on the clean rows of symbols whose raw prices changed.
+    With `strict`, a rejected symbol fails the stage.
+    """
+    from src.validation.validate_prices import validate_prices
+
+    result = validate_prices(fetch_prices)
+    if strict and not result.passed:
+        raise ValueError(f"Rejected by validation: {result.report['rejected_symbols']}")
+
+    frames = result.clean
+    if cache is None:
+        return frames
+
+    # Fingerprints of the raw frames, saved once the signals are persisted
+    fingerprints = {symbol: cache.fingerprint(fetch_prices[symbol]) for symbol in frames}
+    stale, _ = cache.split(fingerprints, lambda s: signal_outputs(s, write_intermediates))
+    for symbol in stale:
+        cache.record(symbol, fingerprints[symbol])
+
+    return {symbol: frames[symbol] for symbol in stale}
+
+
+def normalize_prices_stage(validate_prices: dict) -> dict:
+    from src.transform.normalize_and_save_parquet import normalize_price_frame
+    return map_frames(normalize_price_frame, validate_prices, "normalize_prices")
+
+
+def build_price_features_stage(normalize_prices: dict) -> dict:
+    from src.transform.build_price_features import add_price_features
+    return map_frames(add_price_features, normalize_prices, "build_price_features")
+
+
+def classify_market_regime_stage(build_price_features: dict) -> dict:
+    from src.transform.classify_market_regime import classify_regime
+    return map_frames(classify_regime, build_price_features, "classify_market_regime")
+
+
+def generate_signals_stage(classify_market_regime: dict) -> dict:
+    from src.transform.generate_signals import generate_signals
+    return map_frames(generate_signals, classify_market_regime, "generate_signals")
+
+
+def fused_signals_stage(normalize_prices: dict) -> dict:
+    from src.transform.fused_transform import transform_prices
+    return map_frames(transform_prices, normalize_prices, "generate_signals")
+
+
+def panel_signals_stage(normalize_prices: dict) -> dict:
+    """
+    Fused transform computed for all symbols at once on a dates x symbols panel.
+    """
+    from src.transform.panel import build_panel, transform_panel, panel_to_frames
+
+    panel = build_panel(normalize_prices)
+    return panel_to_frames(panel, transform_panel(panel))
+
+
+def incremental_signals_stage(normalize_prices: dict) -> dict:
+    """
+    Fused transform that only recomputes new or revised bars against the
+    stored signal tables. Symbols that are already up to date are dropped.
+    """
+    from src.transform.incremental_transform import update_signals
+
+    results = {}
+    for symbol, df in normalize_prices.items():
+        try:
+            signals, recomputed = update_signals(df, symbol)
+        except Exception as e:
+            logger.error(f"generate_signals failed for {symbol}: {e}")
+            record_failure(symbol, e)
+            continue
+
+        if signals is not None:
+            logger.info(f"{symbol}: {recomputed} rows recomputed")
+            results[symbol] = signals
+    return results
+
+
+def backtest_signals_stage(generate_signals: dict) -> dict:
+    """
+    Backtest this run's signals, together with the stored tables of the
+    symbols it did not recompute (their signals are unchanged).
+    """
+    from src.backtest.backtest_signals import backtest, load_signals
+
+    signals = load_signals(generate_signals)
+    if signals.empty:
+        logger.warning("No signals to backtest")
+        return {}
+    return backtest(signals)
+
+
+# ----------------------------
+# NEWS BRANCH
+# ----------------------------
+def fetch_news_stage() -> dict:
+    # Imported lazily: fetch_news refuses to import without NEWS_API_KEY
+    from src.news.fetch_news import run_news_pipeline
+    frames, errors = run_news_pipeline(save=False)
+
+    for stock_code, error in errors.items():
+        record_failure(stock_code, error)
+    return frames
+
+
+def analyze_sentiment_stage(fetch_news: dict) -> dict:
+    from src.news.analyze_sentiment import SentimentCache, score_headlines
+
+    cache = SentimentCache()
+    frames = map_frames(partial(score_headlines, cache=cache), fetch_news, "analyze_sentiment")
+    cache.save()
+    return frames
+
+
+# ----------------------------
+# PERSISTENCE
+# ----------------------------
+def persist_prices(frames: dict):
+    write_frames(frames, "prices")
+
+
+def persist_features(frames: dict):
+    write_frames(frames, "features")
+
+
+def persist_market_regime(frames: dict):
+    write_frames(frames, "market_regime")
+
+
+def refresh_signal_views():
+    """
+    Everything derived from the stored signal tables: the latest_signals
+    snapshot, the dashboard hot cache and the screener index.
+    """
+    from src.screener.signal_index import update_signal_index
+    from src.storage.hot_cache import refresh_hot_cache
+    from src.transform.generate_signals import LATEST_SIGNALS_FILE, refresh_latest_signals
+
+    refresh_latest_signals()
+    refresh_hot_cache(LATEST_SIGNALS_FILE)
+    update_signal_index()
+
+
+def persist_signals(frames: dict, cache: BuildCache = None):
+    write_frames(frames, "signals")
+    refresh_signal_views()
+
+    if cache is not None:
+        cache.save(only=frames)
+
+
+def persist_fused_signals(frames: dict, write_intermediates: bool = False,
+                          cache: BuildCache = None):
+    from src.transform.fused_transform import save_outputs
+    for symbol, df in frames.items():
+        save_outputs(symbol, df, write_intermediates)
+    refresh_signal_views()
+
+    if cache is not None:
+        cache.save(only=frames)
+
+
+def persist_backtest(results: dict):
+    from src.backtest.backtest_signals import save_backtest
+    save_backtest(results)
+
+
+def persist_news(frames: dict):
+    from src.news.news_store import save_news
+    for stock_code, df in frames.items():
+        save_news(stock_code, df)
+
+
+def build_pipeline(full_refresh: bool = False, include_news: bool = True,
+                   fused: bool = False, write_intermediates: bool = False,
+                   incremental: bool = False, panel: bool = False,
+                   force: bool = False, strict_validation: bool = False) -> Pipeline:
+    """
+    With `fused`, features, regime and signals are computed by a single
+    generate_signals stage and only the signal table is written, unless
+    `write_intermediates` asks for the features and market_regime tables too.
+    `incremental` is the fused stage recomputing only new or revised bars,
+    `panel` the fused stage vectorised across the whole universe.
+    `force` recomputes symbols whose raw prices did not change.
+    `strict_validation` fails the run when validation rejects a symbol
+    instead of leaving that symbol out.
+    """
+    cache = signals_build_cache(write_intermediates, force=force)
+
+    stages = [
+        Stage("fetch_prices", partial(fetch_prices_stage, full_refresh=full_refresh)),
+        Stage(
+            "validate_prices",
+            partial(
+                validate_prices_stage, cache=cache,
+                write_intermediates=write_intermediates, strict=strict_validation
+            ),
+            inputs=["fetch_prices"],
+        ),
+        Stage(
+            "normalize_prices",
+            normalize_prices_stage,
+            inputs=["validate_prices"],
+            persist=persist_prices,
+        ),
+    ]
+
+    if fused or incremental or panel:
+        if incremental:
+            signals_stage = incremental_signals_stage
+        elif panel:
+            signals_stage = panel_signals_stage
+        else:
+            signals_stage = fused_signals_stage
+
+        stages.append(
+            Stage(
+                "generate_signals",
+                signals_stage,
+                inputs=["normalize_prices"],
+                persist=partial(
+                    persist_fused_signals, write_intermediates=write_intermediates, cache=cache
+                ),
+            )
+        )
+    else:
+        stages += [
+            Stage(
+                "build_price_features",
+                build_price_features_stage,
+                inputs=["normalize_prices"],
+                persist=persist_features,
+            ),
+            Stage(
+                "classify_market_regime",
+                classify_market_regime_stage,
+                inputs=["build_price_features"],
+                persist=persist_market_regime,
+            ),
+            Stage(
+                "generate_signals",
+                generate_signals_stage,
+                inputs=["classify_market_regime"],
+                persist=partial(persist_signals, cache=cache),
+            ),
+        ]
+
+    stages.append(
+        Stage(
+            "backtest_signals",
+            backtest_signals_stage,
+            inputs=["generate_signals"],
+            persist=persist_backtest,
+        )
+    )
+
+    if include_news:
+        stages += [
+            # Fetched news is stored once, with its sentiment, by analyze_sentiment
+            Stage("fetch_news", fetch_news_stage),
+            Stage(
+                "analyze_sentiment",
+                analyze_sentiment_stage,
+                inputs=["fetch_news"],
+                persist=persist_news,
+            ),
+        ]
+
+    return Pipeline(stages)
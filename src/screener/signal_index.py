@@ -0,0 +1,376 @@
+"""
+Precomputed indexes over the signal history of the whole universe, for
+screener queries that never open a signal file.
+
+Everything is laid out on the dates x symbols grid of every stored session
+and saved as .npy files in a generation directory under data/index/signals,
+memory-mapped on load:
+
+- dates.npy: (D,) datetime64, every session in any signal file, sorted
+- positions.npy: (D, N) int32, row of that session in the symbol's signal
+  file, -1 when the symbol has no bar that day
+- <column>.npy: (D, N) int8 category codes of each label column, -1 if no bar
+- <column>=<value>.bitmap.npy: (D, ceil(N / 8)) uint8, packed bitmap of the
+  symbols carrying that label on each date
+- confidence_score.npy: (D, N) int8, -1 if no bar
+- meta.json: symbols and the categories of each label column
+
+Every build writes a new generation directory and then points the CURRENT
+file at it with an atomic os.replace, so a reader always loads one complete
+generation. The previous generation is kept for readers that resolved
+CURRENT just before the switch; older ones are removed.
+
+A query ANDs the packed bitmaps of the requested labels over the sessions
+it covers and unpacks only the result; per-symbol questions (last flip,
+position of a date) read one column of the code or position matrix.
+The index is rebuilt from one scan of the signal tables whenever a signal
+file changes: by the pipeline when it persists signals (see
+src.pipeline.stages.refresh_signal_views) and by the dashboard where it
+runs, since data/index is not versioned.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.pipeline.build_cache import BuildCache, code_version
+from src.storage.dataset import list_symbols, read_table, symbol_path
+from src.storage.schema import CATEGORY_COLUMNS
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+INDEX_DIR = PROJECT_ROOT / "data/index/signals"
+
+# Generations left on disk: the current one and the one before it
+KEEP_GENERATIONS = 2
+
+LABEL_COLUMNS = ["market_regime", "signal_label", "signal_strength"]
+INDEX_COLUMNS = ["Date", "symbol", "confidence_score"] + LABEL_COLUMNS
+
+# Labels a flip passes through without ending it: Bearish -> Neutral ->
+# Bullish is a Bearish to Bullish flip on the day Bullish appears
+PASS_THROUGH_LABELS = ["Neutral", "Sideways"]
+
+
+@dataclass
+class SignalIndex:
+    dates: np.ndarray                 # (D,) datetime64[ns]
+    symbols: list                     # (N,)
+    positions: np.ndarray             # (D, N) int32
+    codes: dict                       # column -> (D, N) int8
+    categories: dict                  # column -> list of labels
+    bitmaps: dict                     # (column, label) -> (D, ceil(N / 8)) uint8
+    confidence: np.ndarray            # (D, N) int8
+    _symbol_rows: dict = field(default_factory=dict, repr=False)
+
+    # ----------------------------
+    # LOOKUPS
+    # ----------------------------
+    def symbol_column(self, symbol: str) -> int:
+        if symbol not in self._symbol_rows:
+            self._symbol_rows.update({s: j for j, s in enumerate(self.symbols)})
+        if symbol not in self._symbol_rows:
+            raise KeyError(f"{symbol} is not in the signal index")
+        return self._symbol_rows[symbol]
+
+    def session_rows(self, sessions: int = None, start=None, end=None) -> slice:
+        """
+        Rows of the last `sessions` sessions, or of the sessions in
+        [start, end] when those are given.
+        """
+        if start is not None or end is not None:
+            lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), "left")
+            hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), "right")
+            return slice(int(lo), int(hi))
+        return slice(max(len(self.dates) - (sessions or 1), 0), len(self.dates))
+
+    def position(self, symbol: str, date) -> int:
+        """
+        Row of `date` in the symbol's signal file, or -1 if it has no bar then.
+        """
+        row = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date)))
+        if row == len(self.dates) or self.dates[row] != np.datetime64(pd.Timestamp(date)):
+            return -1
+        return int(self.positions[row, self.symbol_column(symbol)])
+
+    # ----------------------------
+    # CROSS-SECTIONAL QUERIES
+    # ----------------------------
+    def match(self, rows: slice, min_confidence: int = None, **labels) -> np.ndarray:
+        """
+        (sessions, N) bool: symbol had a bar with all `labels` (column=value
+        or column=[values]) and at least `min_confidence` on each session.
+        """
+        packed = np.packbits(self.positions[rows] >= 0, axis=1)
+
+        for column, values in labels.items():
+            if column not in self.codes:
+                raise KeyError(f"{column} is not an indexed label column")
+            values = [values] if isinstance(values, str) else list(values)
+
+            either = np.zeros_like(packed)
+            for value in values:
+                bitmap = self.bitmaps.get((column, value))
+                if bitmap is not None:
+                    either |= bitmap[rows]
+            packed &= either
+
+        if min_confidence is not None:
+            packed &= np.packbits(self.confidence[rows] >= min_confidence, axis=1)
+
+        return np.unpackbits(packed, axis=1, count=len(self.symbols)).astype(bool)
+
+    def screen(self, sessions: int = 1, min_sessions: int = None, start=None, end=None,
+               min_confidence: int = None, **labels) -> pd.DataFrame:
+        """
+        Symbols matching on at least `min_sessions` (default: every one) of
+        the last `sessions` sessions, or of the sessions in [start, end].
+        """
+        rows = self.session_rows(sessions, start, end)
+        hits = self.match(rows, min_confidence, **labels)
+        needed = hits.shape[0] if min_sessions is None else min_sessions
+
+        counts = hits.sum(axis=0)
+        selected = np.flatnonzero((counts >= needed) & (counts > 0))
+
+        # Last matching session: first hit counting back from the end
+        last = hits.shape[0] - 1 - np.argmax(hits[::-1, selected], axis=0) if len(selected) else []
+
+        return pd.DataFrame({
+            "symbol": [self.symbols[j] for j in selected],
+            "matched_sessions": counts[selected],
+            "last_match": pd.to_datetime(self.dates[rows][last]),
+        })
+
+    def sessions_matching(self, sessions: int = None, start=None, end=None,
+                          min_confidence: int = None, **labels) -> pd.Series:
+        """
+        Number of matching symbols per session.
+        """
+        rows = self.session_rows(sessions, start, end)
+        hits = self.match(rows, min_confidence, **labels)
+        return pd.Series(hits.sum(axis=1), index=pd.to_datetime(self.dates[rows]), name="symbols")
+
+    # ----------------------------
+    # PER-SYMBOL QUERIES
+    # ----------------------------
+    def flips(self, symbol: str, from_value: str, to_value: str,
+              column: str = "signal_label") -> pd.DatetimeIndex:
+        """
+        Sessions on which `column` of the symbol turned to `to_value` with
+        `from_value` as the previous label, skipping PASS_THROUGH_LABELS.
+        """
+        j = self.symbol_column(symbol)
+        categories = self.categories[column]
+        if from_value not in categories or to_value not in categories:
+            return pd.DatetimeIndex([])
+
+        skipped = [categories.index(v) for v in PASS_THROUGH_LABELS
+                   if v in categories and v not in (from_value, to_value)]
+        bars = np.flatnonzero(self.positions[:, j] >= 0)
+        codes = self.codes[column][bars, j]
+        kept = ~np.isin(codes, skipped)
+        bars, codes = bars[kept], codes[kept]
+
+        flipped = (codes[:-1] == categories.index(from_value)) & (codes[1:] == categories.index(to_value))
+        return pd.DatetimeIndex(self.dates[bars[1:][flipped]])
+
+    def last_flip(self, symbol: str, from_value: str, to_value: str,
+                  column: str = "signal_label"):
+        flips = self.flips(symbol, from_value, to_value, column)
+        return flips[-1] if len(flips) else None
+
+
+# ----------------------------
+# BUILD
+# ----------------------------
+def build_index(signals: pd.DataFrame) -> SignalIndex:
+    """
+    Index a long signal frame (INDEX_COLUMNS, any number of symbols).
+    """
+    df = signals[INDEX_COLUMNS].copy()
+    df["symbol"] = df["symbol"].astype(str)
+    df = df.sort_values(["symbol", "Date"], kind="stable").reset_index(drop=True)
+
+    symbols = sorted(df["symbol"].unique())
+    day = df["Date"].to_numpy(dtype="datetime64[ns]")
+    dates = np.unique(day)
+
+    rows = np.searchsorted(dates, day)
+    cols = np.searchsorted(np.asarray(symbols), df["symbol"].to_numpy())
+    shape = (len(dates), len(symbols))
+
+    # Position within the symbol's own (Date-sorted) file
+    starts = np.searchsorted(cols, np.arange(len(symbols)))
+    positions = np.full(shape, -1, dtype="int32")
+    positions[rows, cols] = np.arange(len(df)) - starts[cols]
+
+    confidence = np.full(shape, -1, dtype="int8")
+    confidence[rows, cols] = df["confidence_score"].to_numpy(dtype="int8")
+
+    codes, categories, bitmaps = {}, {}, {}
+    for column in LABEL_COLUMNS:
+        known = CATEGORY_COLUMNS.get(column, [])
+        observed = sorted(set(df[column].dropna().astype(str)) - set(known))
+        categories[column] = known + observed
+
+        labels = pd.Categorical(df[column].astype(str), categories=categories[column])
+        codes[column] = np.full(shape, -1, dtype="int8")
+        codes[column][rows, cols] = labels.codes
+
+        for k, value in enumerate(categories[column]):
+            bitmaps[(column, value)] = np.packbits(codes[column] == k, axis=1)
+
+    return SignalIndex(dates, symbols, positions, codes, categories, bitmaps, confidence)
+
+
+def bitmap_name(column: str, value: str) -> str:
+    return f"{column}={value}.bitmap.npy"
+
+
+def current_path(index_dir: Path = None) -> Path:
+    return Path(index_dir or INDEX_DIR) / "CURRENT"
+
+
+def current_generation(index_dir: Path = None):
+    """
+    Directory of the generation CURRENT points at, or None if none was built.
+    """
+    pointer = current_path(index_dir)
+    if not pointer.exists():
+        return None
+    return pointer.parent / pointer.read_text().strip()
+
+
+def save_index(index: SignalIndex, index_dir: Path = None) -> Path:
+    """
+    Write the index into a new generation directory, then switch CURRENT
+    to it. Returns the generation directory.
+    """
+    index_dir = Path(index_dir or INDEX_DIR)
+    generation = index_dir / f"gen-{time.time_ns()}"
+    generation.mkdir(parents=True)
+
+    np.save(generation / "dates.npy", index.dates)
+    np.save(generation / "positions.npy", index.positions)
+    np.save(generation / "confidence_score.npy", index.confidence)
+    for column, values in index.codes.items():
+        np.save(generation / f"{column}.npy", values)
+    for (column, value), bitmap in index.bitmaps.items():
+        np.save(generation / bitmap_name(column, value), bitmap)
+
+    meta = {"symbols": index.symbols, "categories": index.categories}
+    (generation / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    tmp_file = index_dir / ".CURRENT.tmp"
+    tmp_file.write_text(generation.name)
+    os.replace(tmp_file, current_path(index_dir))
+
+    prune_generations(index_dir)
+    return generation
+
+
+def prune_generations(index_dir: Path = None):
+    index_dir = Path(index_dir or INDEX_DIR)
+    generations = sorted(
+        (path for path in index_dir.glob("gen-*") if path.is_dir()),
+        key=lambda path: int(path.name.split("-")[1]),
+    )
+    for path in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def load_index(index_dir: Path = None) -> SignalIndex:
+    """
+    Memory-map the current generation. Raises FileNotFoundError if none
+    was built.
+    """
+    generation = current_generation(index_dir)
+    if generation is None:
+        raise FileNotFoundError(f"No signal index under {Path(index_dir or INDEX_DIR)}")
+
+    meta = json.loads((generation / "meta.json").read_text())
+
+    def mapped(name):
+        return np.load(generation / name, mmap_mode="r")
+
+    return SignalIndex(
+        dates=mapped("dates.npy"),
+        symbols=meta["symbols"],
+        positions=mapped("positions.npy"),
+        codes={column: mapped(f"{column}.npy") for column in meta["categories"]},
+        categories=meta["categories"],
+        bitmaps={
+            (column, value): mapped(bitmap_name(column, value))
+            for column, values in meta["categories"].items()
+            for value in values
+        },
+        confidence=mapped("confidence_score.npy"),
+    )
+
+
+def update_signal_index(force: bool = False) -> bool:
+    """
+    Rebuild the index unless no signal file changed since the last build.
+    Returns whether it was rebuilt.
+    """
+    symbols = list_symbols("signals")
+
+    if not symbols:
+        logger.warning("No signal files found for the signal index")
+        return False
+
+    cache = BuildCache("signal_index", code_version(sys.modules[__name__]), force=force)
+    fingerprint = cache.fingerprint(*[symbol_path("signals", s) for s in symbols])
+
+    if cache.is_fresh("universe", fingerprint, [current_path()]):
+        return False
+
+    index = build_index(read_table("signals", columns=INDEX_COLUMNS))
+    save_index(index)
+
+    cache.record("universe", fingerprint)
+    cache.save()
+
+    logger.success(f"Signal index: {len(index.dates)} sessions x {len(index.symbols)} symbols")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signal history screener")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index first")
+    parser.add_argument("--sessions", type=int, default=1, help="Last N sessions to screen")
+    parser.add_argument("--any", action="store_true", help="Match on any session instead of all")
+    parser.add_argument("--regime", help="market_regime to match")
+    parser.add_argument("--signal", help="signal_label to match")
+    parser.add_argument("--strength", help="signal_strength to match")
+    parser.add_argument("--min-confidence", type=int)
+    parser.add_argument("--last-flip", metavar="SYMBOL", help="Last Bearish -> Bullish flip of SYMBOL")
+    args = parser.parse_args()
+
+    update_signal_index(force=args.rebuild)
+    index = load_index()
+
+    if args.last_flip:
+        print(f"{args.last_flip}: last Bearish -> Bullish flip on "
+              f"{index.last_flip(args.last_flip, 'Bearish', 'Bullish')}")
+    else:
+        labels = {
+            column: value for column, value in [
+                ("market_regime", args.regime),
+                ("signal_label", args.signal),
+                ("signal_strength", args.strength),
+            ] if value
+        }
+        print(index.screen(
+            sessions=args.sessions, min_sessions=1 if args.any else None,
+            min_confidence=args.min_confidence, **labels
+        ).to_string(index=False))
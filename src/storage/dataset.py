@@ -0,0 +1,156 @@
+"""
+Read/write API for the processed price tables.
+
+Each table directory (prices, features, market_regime, signals) is read as
+one parquet dataset. Its per-symbol files are the symbol partitions, so a
+symbol filter only opens the files it needs. Every file is sorted by Date
+and split into row groups of roughly one trading year. Their min/max Date
+statistics let date-range filters skip whole row groups, and the symbol
+column is dictionary-encoded. Column types come from src.storage.schema
+and are applied on both write and read.
+"""
+
+import filecmp
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.pipeline.instrumentation import record_io
+from src.storage.schema import apply_schema
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+PROCESSED_DIR = PROJECT_ROOT / "data/processed"
+
+TABLES = ["prices", "features", "market_regime", "signals", "news"]
+
+# About one trading year per row group
+ROW_GROUP_SIZE = 252
+
+
+def table_dir(table: str) -> Path:
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    return PROCESSED_DIR / table
+
+
+def symbol_path(table: str, symbol: str) -> Path:
+    return table_dir(table) / f"{symbol}.parquet"
+
+
+def list_symbols(table: str) -> list:
+    return sorted(path.stem for path in table_dir(table).glob("*.parquet"))
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    if "Date" in df.columns:
+        df = df.sort_values("Date", kind="stable")
+
+    table = pa.Table.from_pandas(apply_schema(df), preserve_index=False)
+
+    if "symbol" in table.column_names:
+        i = table.schema.get_field_index("symbol")
+        symbol = table.column(i)
+        if not pa.types.is_dictionary(symbol.type):
+            table = table.set_column(i, "symbol", pc.dictionary_encode(symbol))
+
+    return table
+
+
+def write_table_atomic(table: pa.Table, output_file: Path, **kwargs) -> bool:
+    """
+    Write to a temporary file next to the target and rename it into place,
+    so readers never see a half-written file. When the new file is
+    byte-identical to the existing one, the existing file is left untouched
+    (same mtime, nothing for git to pick up). Returns whether it was replaced.
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+    pq.write_table(table, tmp_file, **kwargs)
+
+    if output_file.exists() and filecmp.cmp(tmp_file, output_file, shallow=False):
+        tmp_file.unlink()
+        return False
+
+    os.replace(tmp_file, output_file)
+    record_io(written=output_file.stat().st_size)
+    return True
+
+
+def write_frame(df: pd.DataFrame, output_file: Path) -> bool:
+    """
+    Write one symbol partition: sorted by Date, dictionary-encoded symbol,
+    year-sized row groups.
+    """
+    return write_table_atomic(to_arrow(df), output_file, row_group_size=ROW_GROUP_SIZE)
+
+
+def write_symbol(table: str, symbol: str, df: pd.DataFrame) -> bool:
+    return write_frame(df, symbol_path(table, symbol))
+
+
+def _date_filter(start=None, end=None):
+    expression = None
+    if start is not None:
+        expression = ds.field("Date") >= pd.Timestamp(start)
+    if end is not None:
+        upper = ds.field("Date") <= pd.Timestamp(end)
+        expression = upper if expression is None else expression & upper
+    return expression
+
+
+def read_table(table: str, symbols=None, start=None, end=None, columns=None) -> pd.DataFrame:
+    """
+    Rows of `table` for the given symbols between start and end (inclusive),
+    restricted to `columns`. Omitted arguments mean no restriction.
+    Result is sorted by symbol file, then Date.
+    """
+    if symbols is None:
+        files = [symbol_path(table, s) for s in list_symbols(table)]
+    else:
+        files = [symbol_path(table, s) for s in symbols]
+        files = [f for f in files if f.exists()]
+
+    if not files:
+        return apply_schema(pd.DataFrame(columns=columns))
+
+    dataset = ds.dataset([str(f) for f in files], format="parquet")
+
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+
+    result = dataset.to_table(columns=columns, filter=_date_filter(start, end))
+    record_io(read=result.nbytes)
+    return apply_schema(result.to_pandas())
+
+
+def read_symbol(table: str, symbol: str, columns=None) -> pd.DataFrame:
+    return read_table(table, symbols=[symbol], columns=columns)
+
+
+def read_tail(table: str, symbol: str, n_rows: int, columns=None) -> pd.DataFrame:
+    """
+    Last n_rows of a symbol partition, reading only its trailing row groups.
+    """
+    parquet_file = pq.ParquetFile(symbol_path(table, symbol))
+
+    groups = []
+    rows = 0
+    for i in reversed(range(parquet_file.num_row_groups)):
+        groups.insert(0, i)
+        rows += parquet_file.metadata.row_group(i).num_rows
+        if rows >= n_rows:
+            break
+
+    if not groups:
+        return apply_schema(parquet_file.schema_arrow.empty_table().to_pandas())
+
+    result = parquet_file.read_row_groups(groups, columns=columns)
+    record_io(read=result.nbytes)
+    return apply_schema(result.slice(max(result.num_rows - n_rows, 0)).to_pandas())
@@ -0,0 +1,141 @@
+"""
+Dashboard hot cache: uncompressed Arrow IPC (Feather v2) copies of what the
+dashboard displays, under data/hot.
+
+- latest.arrow: the latest_signals snapshot (overview table)
+- signals/<symbol>.arrow: the detail view columns of a symbol, sorted by Date
+
+The files are uncompressed so they can be memory-mapped: reading one maps
+its buffers instead of decompressing and decoding parquet, and every
+Streamlit process reading the same file shares the OS page cache. Files are
+replaced atomically, so a mapped file stays valid until its reader drops it.
+
+The parquet tables remain the source of truth and the hot cache is not
+versioned (data/hot is git-ignored): sync_hot_cache republishes any symbol
+whose signal file is newer than its hot copy, the dashboard rebuilds the
+cache where it runs with refresh_hot_cache, and falls back to parquet when
+a hot file is missing.
+"""
+
+import filecmp
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from loguru import logger
+
+from src.storage.dataset import list_symbols, read_symbol, symbol_path, to_arrow
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+HOT_CACHE_DIR = PROJECT_ROOT / "data/hot"
+
+# Columns the dashboard detail view and price chart read
+DETAIL_COLUMNS = [
+    "Date", "Open", "High", "Low", "Close", "sma_20", "sma_50",
+    "market_regime", "signal_label"
+]
+
+# "uncompressed" keeps reads zero-copy; "lz4" trades that for smaller files
+COMPRESSION = "uncompressed"
+
+
+def hot_cache_enabled() -> bool:
+    # Read on every call so a running dashboard can be switched over
+    return os.environ.get("DASHBOARD_HOT_CACHE", "1") != "0"
+
+
+def latest_path() -> Path:
+    return HOT_CACHE_DIR / "latest.arrow"
+
+
+def hot_path(symbol: str) -> Path:
+    return HOT_CACHE_DIR / "signals" / f"{symbol}.arrow"
+
+
+# ----------------------------
+# WRITE
+# ----------------------------
+def write_ipc_atomic(table: pa.Table, output_file: Path) -> bool:
+    """
+    Same contract as dataset.write_table_atomic, for Arrow IPC files.
+    """
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+    feather.write_feather(table, tmp_file, compression=COMPRESSION)
+
+    if output_file.exists() and filecmp.cmp(tmp_file, output_file, shallow=False):
+        tmp_file.unlink()
+        return False
+
+    os.replace(tmp_file, output_file)
+    return True
+
+
+def publish_latest(latest: pd.DataFrame) -> bool:
+    return write_ipc_atomic(to_arrow(latest), latest_path())
+
+
+def publish_symbol(symbol: str) -> bool:
+    df = read_symbol("signals", symbol, columns=DETAIL_COLUMNS)
+    return write_ipc_atomic(to_arrow(df), hot_path(symbol))
+
+
+def sync_hot_cache() -> int:
+    """
+    Republish every symbol whose signal file changed since its hot copy was
+    written and drop hot copies of symbols that are gone.
+    Returns the number of files rewritten.
+    """
+    symbols = list_symbols("signals")
+    published = 0
+
+    for symbol in symbols:
+        source, target = symbol_path("signals", symbol), hot_path(symbol)
+        if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+            continue
+        published += publish_symbol(symbol)
+
+    for path in (HOT_CACHE_DIR / "signals").glob("*.arrow"):
+        if path.stem not in symbols:
+            path.unlink()
+
+    if published:
+        logger.info(f"Hot cache: {published} symbol file(s) published")
+    return published
+
+
+def refresh_hot_cache(latest_file: Path) -> int:
+    """
+    Bring the whole cache up to date from the parquet tables: every symbol
+    file, and latest.arrow when `latest_file` (the latest_signals parquet)
+    is newer. Returns the number of files rewritten.
+    """
+    published = sync_hot_cache()
+
+    target = latest_path()
+    if latest_file.exists() and (
+        not target.exists() or target.stat().st_mtime_ns < latest_file.stat().st_mtime_ns
+    ):
+        published += publish_latest(pd.read_parquet(latest_file))
+    return published
+
+
+# ----------------------------
+# READ
+# ----------------------------
+def read_hot(path: Path, columns=None) -> pd.DataFrame:
+    """
+    Memory-map an IPC file. Numeric columns without nulls are handed to
+    pandas without copying; the mapping lives as long as those columns do.
+    Files were written through to_arrow, so the dtypes are already those of
+    apply_schema (dictionaries come back as the same categoricals).
+    """
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table.to_pandas(split_blocks=True)
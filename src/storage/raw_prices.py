@@ -0,0 +1,127 @@
+"""
+Raw price files: one typed parquet file per symbol under data/raw/prices.
+
+Ingestion writes the downloaded bars here with the yfinance column levels
+flattened, Date as datetime64 and prices as float64, so validation and
+normalisation read them back without parsing any text. migrate_csv_files
+converts the CSV files written by earlier versions, once.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+from loguru import logger
+
+from src.pipeline.instrumentation import record_io
+from src.storage.dataset import write_frame
+from src.storage.schema import apply_schema
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+RAW_PRICE_DIR = PROJECT_ROOT / "data/raw/prices"
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+
+
+def raw_price_path(symbol: str) -> Path:
+    return RAW_PRICE_DIR / f"{symbol}.parquet"
+
+
+def list_raw_symbols() -> list:
+    return sorted(path.stem for path in RAW_PRICE_DIR.glob("*.parquet"))
+
+
+def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    yfinance returns (Price, Ticker) MultiIndex columns even for a single
+    symbol. Keep only the price level so stored files have flat columns.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+        df.columns.name = None
+    return df
+
+
+def typed_prices(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """
+    Downloaded bars (Date index or column) as a flat, typed raw frame.
+    Already typed columns pass through untouched.
+    """
+    df = flatten_columns(df)
+    if "Date" not in df.columns:
+        df = df.reset_index()
+
+    if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+
+    for col in PRICE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_float_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    if "Volume" in df.columns and not pd.api.types.is_numeric_dtype(df["Volume"]):
+        df["Volume"] = pd.to_numeric(df["Volume"], errors="coerce")
+
+    df["symbol"] = symbol
+    return df
+
+
+def read_raw_prices(symbol: str) -> pd.DataFrame:
+    table = pq.read_table(raw_price_path(symbol))
+    record_io(read=table.nbytes)
+    return apply_schema(table.to_pandas())
+
+
+def write_raw_prices(symbol: str, df: pd.DataFrame) -> bool:
+    return write_frame(df, raw_price_path(symbol))
+
+
+# ----------------------------
+# CSV MIGRATION
+# ----------------------------
+def read_legacy_csv(path: Path) -> pd.DataFrame:
+    """
+    A raw CSV in either stored layout: flat header, or the three header
+    rows (Price / Ticker / Date) of an unflattened yfinance frame.
+    """
+    df = pd.read_csv(path)
+    if "Date" not in df.columns and df.columns[0] == "Price":
+        df = pd.read_csv(path, skiprows=[1, 2]).rename(columns={"Price": "Date"})
+    return df
+
+
+def migrate_csv_files(raw_dir: Path = None) -> int:
+    """
+    Convert every raw CSV to its parquet file and remove the CSV.
+    A CSV next to an existing parquet file is stale and only removed.
+    Returns the number of files converted.
+    """
+    raw_dir = Path(raw_dir or RAW_PRICE_DIR)
+    converted = 0
+
+    for path in sorted(raw_dir.glob("*.csv")):
+        symbol = path.stem
+        target = raw_dir / f"{symbol}.parquet"
+
+        if target.exists():
+            logger.info(f"{path.name} superseded by {target.name}, removing")
+            path.unlink()
+            continue
+
+        try:
+            df = typed_prices(read_legacy_csv(path), symbol)
+        except (ValueError, KeyError, pd.errors.ParserError) as e:
+            logger.error(f"Cannot migrate {path.name}: {e}")
+            continue
+
+        unparsed = int(df["Date"].isna().sum())
+        if unparsed:
+            logger.warning(f"{path.name}: dropping {unparsed} row(s) with unparsed dates")
+            df = df.dropna(subset=["Date"])
+
+        write_frame(df, target)
+        path.unlink()
+        converted += 1
+
+    if converted:
+        logger.success(f"Migrated {converted} raw CSV file(s) to parquet")
+    return converted
@@ -0,0 +1,64 @@
+"""
+Compact column types for the processed tables.
+
+Label columns become categoricals (stored as parquet dictionaries), scores
+become small integers and derived return columns become float32. Prices,
+moving averages and volatility stay float64: regime and signal rules
+compare them directly, so rounding them would change results.
+
+apply_schema runs on every write (to_arrow) and every read (read_table,
+read_tail), so all stages and the dashboard see the same dtypes.
+"""
+
+import pandas as pd
+
+# Known labels, in a fixed order so categoricals from different files concat
+# without falling back to object. Unseen values are appended, never dropped.
+CATEGORY_COLUMNS = {
+    "symbol": [],
+    "market_regime": ["Bullish", "Bearish", "Sideways"],
+    "signal_label": ["Bullish", "Bearish", "Neutral"],
+    "signal_strength": ["Strong", "Weak"],
+    "risk_level": ["Low", "Medium", "High"],
+}
+
+INTEGER_COLUMNS = {
+    "confidence_score": "int8",     # clipped to 0..100
+}
+
+FLOAT32_COLUMNS = [
+    "daily_return",
+    "log_return",
+    "expected_move_pct",            # rounded to 2 decimals
+]
+
+
+def _categorical(values: pd.Series, known: list) -> pd.Categorical:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        observed = list(values.cat.categories)
+    else:
+        observed = sorted(values.dropna().astype(str).unique())
+
+    categories = known + [v for v in observed if v not in known]
+    return pd.Categorical(values.astype("object"), categories=categories)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the columns of df that have a compact type; others are untouched.
+    """
+    df = df.copy(deep=False)
+
+    for col, known in CATEGORY_COLUMNS.items():
+        if col in df.columns:
+            df[col] = _categorical(df[col], known)
+
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype(dtype)
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+
+    return df
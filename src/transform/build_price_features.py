@@ -1,65 +1,69 @@
+import argparse
 import pandas as pd
-import numpy as np
-from pathlib import Path
 from loguru import logger
+from src.pipeline.build_cache import code_version, run_memoized
+from src.storage.dataset import table_dir, list_symbols, read_symbol, write_symbol, symbol_path
+from src.transform import indicators
+from src.transform.indicators import compute_indicators
 
-PRICE_DATA_DIR = Path("data/processed/prices")
-FEATURE_DATA_DIR = Path("data/processed/features")
+FEATURE_DATA_DIR = table_dir("features")
 
 FEATURE_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Stored feature columns, in table order: the returns plus every indicator
+# the regime and signal stages request (see src.transform.indicators)
+FEATURE_INDICATORS = [
+    "daily_return",
+    "log_return",
+    "sma_10",
+    "sma_20",
+    "sma_50",
+    "volatility_20",
+]
 
-def build_features(file_path: Path):
-    logger.info(f"Building features for {file_path.name}")
-
-    # Read clean price data
-    df = pd.read_parquet(file_path)
 
+def add_price_features(df: pd.DataFrame, names=FEATURE_INDICATORS) -> pd.DataFrame:
     # Ensure correct order
     df = df.sort_values("Date").reset_index(drop=True)
 
-    # ----------------------------
-    # FEATURE 1: DAILY RETURN
-    # ----------------------------
-    df["daily_return"] = df["Close"].pct_change()
-    
-    # ----------------------------
-    # FEATURE 2: LOG RETURN
-    # ----------------------------
-    df["log_return"] = np.log(df["Close"] / df["Close"].shift(1))
-
-    # ----------------------------
-    # FEATURE 3: SIMPLE MOVING AVERAGES
-    # ----------------------------
-    df["sma_10"] = df["Close"].rolling(window=10).mean()
-    df["sma_20"] = df["Close"].rolling(window=20).mean()
-    df["sma_50"] = df["Close"].rolling(window=50).mean()
+    return compute_indicators(df, names)
 
 
-    # ----------------------------
-    # FEATURE 4: ROLLING VOLATILITY
-    # ----------------------------
-    df["volatility_20"] = df["log_return"].rolling(window=20).std()
+def build_features(symbol: str):
+    logger.info(f"Building features for {symbol}")
 
+    # Read clean price data
+    df = read_symbol("prices", symbol)
 
+    df = add_price_features(df)
 
     # Save features
-    output_file = FEATURE_DATA_DIR / file_path.name
-    df.to_parquet(output_file, index=False)
+    write_symbol("features", symbol, df)
 
-    logger.success(f"Saved features to {output_file.name}")
+    logger.success(f"Saved features for {symbol}")
 
 
-def run_feature_engineering():
-    parquet_files = list(PRICE_DATA_DIR.glob("*.parquet"))
+def run_feature_engineering(max_workers: int = None, force: bool = False):
+    symbols = list_symbols("prices")
 
-    if not parquet_files:
+    if not symbols:
         logger.error("No price parquet files found")
         return
 
-    for file_path in parquet_files:
-        build_features(file_path)
+    return run_memoized(
+        "build_price_features",
+        code_version(add_price_features, build_features, indicators),
+        build_features,
+        inputs={symbol: [symbol_path("prices", symbol)] for symbol in symbols},
+        outputs=lambda symbol: [symbol_path("features", symbol)],
+        max_workers=max_workers,
+        force=force,
+    )
 
 
 if __name__ == "__main__":
-    run_feature_engineering()
+    parser = argparse.ArgumentParser(description="Price features per symbol")
+    parser.add_argument("--force", action="store_true", help="Rebuild unchanged symbols too")
+    args = parser.parse_args()
+
+    run_feature_engineering(force=args.force)
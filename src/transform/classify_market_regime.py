@@ -1,29 +1,41 @@
+import argparse
 import pandas as pd
 import numpy as np
-from pathlib import Path
 from loguru import logger
+from src.pipeline.build_cache import code_version, run_memoized
+from src.storage.dataset import table_dir, list_symbols, read_symbol, write_symbol, symbol_path
+from src.transform import indicators
+from src.transform.indicators import compute_indicators, sma
 
-FEATURE_DATA_DIR = Path("data/processed/features")
-OUTPUT_DATA_DIR = Path("data/processed/market_regime")
+OUTPUT_DATA_DIR = table_dir("market_regime")
 
 OUTPUT_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Fast / mid / slow SMA windows of the trend structure
+REGIME_WINDOWS = (10, 20, 50)
 
-def classify_regime(df: pd.DataFrame) -> pd.DataFrame:
+# Indicators the regime rules read; computed here if the input lacks them
+REGIME_INDICATORS = [sma(window) for window in REGIME_WINDOWS]
+
+
+def classify_regime(df: pd.DataFrame, windows: tuple = REGIME_WINDOWS) -> pd.DataFrame:
     """
     Classify market regime based on trend structure.
+    `windows` are the fast, mid and slow SMA windows.
     """
+    fast, mid, slow = (sma(window) for window in windows)
+    df = compute_indicators(df, [fast, mid, slow])
 
     conditions = [
         # Bullish regime
-        (df["Close"] > df["sma_50"]) &
-        (df["sma_10"] > df["sma_20"]) &
-        (df["sma_20"] > df["sma_50"]),
+        (df["Close"] > df[slow]) &
+        (df[fast] > df[mid]) &
+        (df[mid] > df[slow]),
 
         # Bearish regime
-        (df["Close"] < df["sma_50"]) &
-        (df["sma_10"] < df["sma_20"]) &
-        (df["sma_20"] < df["sma_50"])
+        (df["Close"] < df[slow]) &
+        (df[fast] < df[mid]) &
+        (df[mid] < df[slow])
     ]
 
     choices = [
@@ -40,31 +52,41 @@ def classify_regime(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def process_file(file_path: Path):
-    logger.info(f"Classifying market regime for {file_path.name}")
+def process_symbol(symbol: str):
+    logger.info(f"Classifying market regime for {symbol}")
 
-    df = pd.read_parquet(file_path)
+    df = read_symbol("features", symbol)
 
     df = df.sort_values("Date").reset_index(drop=True)
 
     df = classify_regime(df)
 
-    output_file = OUTPUT_DATA_DIR / file_path.name
-    df.to_parquet(output_file, index=False)
+    write_symbol("market_regime", symbol, df)
 
-    logger.success(f"Saved market regime data to {output_file.name}")
+    logger.success(f"Saved market regime data for {symbol}")
 
 
-def run_market_regime_classification():
-    parquet_files = list(FEATURE_DATA_DIR.glob("*.parquet"))
+def run_market_regime_classification(max_workers: int = None, force: bool = False):
+    symbols = list_symbols("features")
 
-    if not parquet_files:
+    if not symbols:
         logger.error("No feature parquet files found")
         return
 
-    for file_path in parquet_files:
-        process_file(file_path)
+    return run_memoized(
+        "classify_market_regime",
+        code_version(classify_regime, process_symbol, indicators),
+        process_symbol,
+        inputs={symbol: [symbol_path("features", symbol)] for symbol in symbols},
+        outputs=lambda symbol: [symbol_path("market_regime", symbol)],
+        max_workers=max_workers,
+        force=force,
+    )
 
 
 if __name__ == "__main__":
-    run_market_regime_classification()
+    parser = argparse.ArgumentParser(description="Market regime per symbol")
+    parser.add_argument("--force", action="store_true", help="Rebuild unchanged symbols too")
+    args = parser.parse_args()
+
+    run_market_regime_classification(force=args.force)
@@ -0,0 +1,107 @@
+import argparse
+from functools import partial
+import pandas as pd
+from loguru import logger
+
+from src.pipeline.build_cache import code_version, run_memoized
+from src.storage.dataset import list_symbols, read_symbol, write_symbol, symbol_path
+from src.transform import indicators
+from src.transform.build_price_features import add_price_features
+from src.transform.classify_market_regime import classify_regime
+from src.transform.generate_signals import generate_signals, refresh_latest_signals
+
+# Last column of each intermediate table, in signal table column order
+FEATURE_LAST_COLUMN = "volatility_20"
+REGIME_LAST_COLUMN = "market_regime"
+
+
+def transform_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Features, market regime and signals in one pass over a clean price
+    frame. Same result as running the three stages one after another.
+    """
+    df = add_price_features(df)
+    df = classify_regime(df)
+    return generate_signals(df)
+
+
+def intermediate_views(signals: pd.DataFrame) -> dict:
+    """
+    Slice the feature and market regime tables back out of a signal table.
+    """
+    columns = list(signals.columns)
+    feature_end = columns.index(FEATURE_LAST_COLUMN) + 1
+    regime_end = columns.index(REGIME_LAST_COLUMN) + 1
+
+    return {
+        "features": signals[columns[:feature_end]],
+        "market_regime": signals[columns[:regime_end]],
+    }
+
+
+def save_outputs(symbol: str, signals: pd.DataFrame, write_intermediates: bool = False):
+    write_symbol("signals", symbol, signals)
+
+    if write_intermediates:
+        for table, df in intermediate_views(signals).items():
+            write_symbol(table, symbol, df)
+
+
+def process_symbol(symbol: str, write_intermediates: bool = False):
+    logger.info(f"Transforming {symbol}")
+
+    df = read_symbol("prices", symbol)
+    df = transform_prices(df)
+
+    save_outputs(symbol, df, write_intermediates)
+
+    logger.success(f"Saved signals for {symbol}")
+
+
+def output_paths(symbol: str, write_intermediates: bool = False) -> list:
+    tables = ["signals"]
+    if write_intermediates:
+        tables += ["features", "market_regime"]
+    return [symbol_path(table, symbol) for table in tables]
+
+
+def fused_version(write_intermediates: bool = False) -> str:
+    return code_version(
+        add_price_features, classify_regime, generate_signals, transform_prices, indicators,
+        params={"write_intermediates": write_intermediates}
+    )
+
+
+def run_fused_transform(write_intermediates: bool = False, max_workers: int = None,
+                        force: bool = False):
+    symbols = list_symbols("prices")
+
+    if not symbols:
+        logger.error("No price parquet files found")
+        return
+
+    results = run_memoized(
+        "fused_transform",
+        fused_version(write_intermediates),
+        partial(process_symbol, write_intermediates=write_intermediates),
+        inputs={symbol: [symbol_path("prices", symbol)] for symbol in symbols},
+        outputs=lambda symbol: output_paths(symbol, write_intermediates),
+        max_workers=max_workers,
+        force=force,
+    )
+
+    refresh_latest_signals()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prices -> signals in one pass")
+    parser.add_argument(
+        "--write-intermediates",
+        action="store_true",
+        help="Also write the features and market_regime tables"
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild unchanged symbols too")
+    args = parser.parse_args()
+
+    run_fused_transform(write_intermediates=args.write_intermediates, force=args.force)
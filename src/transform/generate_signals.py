@@ -1,20 +1,41 @@
+import argparse
 import pandas as pd
 import numpy as np
-from pathlib import Path
 from loguru import logger
+from src.pipeline.build_cache import code_version, run_memoized
+from src.storage.dataset import (
+    PROCESSED_DIR, table_dir, list_symbols, read_symbol, read_tail,
+    write_symbol, write_frame, symbol_path
+)
+from src.transform import indicators
+from src.transform.indicators import compute_indicators
 
 # -------------------------
 # Paths
 # -------------------------
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-MARKET_REGIME_DIR = PROJECT_ROOT / "data/processed/market_regime"
-SIGNAL_OUTPUT_DIR = PROJECT_ROOT / "data/processed/signals"
+SIGNAL_OUTPUT_DIR = table_dir("signals")
+
+# One row per symbol, for the dashboard overview
+LATEST_SIGNALS_FILE = PROCESSED_DIR / "latest_signals.parquet"
+LATEST_SIGNAL_COLUMNS = [
+    "symbol",
+    "Date",
+    "market_regime",
+    "signal_label",
+    "signal_strength",
+    "confidence_score",
+    "expected_move_pct",
+    "risk_level",
+]
 
 SIGNAL_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Indicators the signal rules read; computed here if the input lacks them
+SIGNAL_INDICATORS = ["sma_20", "sma_50", "volatility_20"]
+
 
 def generate_signals(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    df = compute_indicators(df.copy(), SIGNAL_INDICATORS)
 
     # -------------------------
     # Base signal
@@ -70,31 +91,65 @@ def generate_signals(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def process_file(file_path: Path):
-    logger.info(f"Generating signals for {file_path.name}")
+def refresh_latest_signals():
+    """
+    Rebuild the latest_signals snapshot from the last row of every signal
+    file. Only the final row group of each file is read.
+    """
+    rows = []
+    for symbol in list_symbols("signals"):
+        tail = read_tail("signals", symbol, 1, columns=LATEST_SIGNAL_COLUMNS)
+        if not tail.empty:
+            tail["symbol"] = symbol
+            rows.append(tail)
+
+    if not rows:
+        logger.warning("No signal files found for latest_signals")
+        return
+
+    latest = pd.concat(rows, ignore_index=True)[LATEST_SIGNAL_COLUMNS]
+    write_frame(latest, LATEST_SIGNALS_FILE)
+    logger.success(f"Saved latest signals for {len(latest)} symbols")
+
 
-    df = pd.read_parquet(file_path)
+def process_symbol(symbol: str):
+    logger.info(f"Generating signals for {symbol}")
+
+    df = read_symbol("market_regime", symbol)
     df = df.sort_values("Date").reset_index(drop=True)
 
     df = generate_signals(df)
 
-    output_file = SIGNAL_OUTPUT_DIR / file_path.name
-    df.to_parquet(output_file, index=False)
+    write_symbol("signals", symbol, df)
 
-    logger.success(f"Saved signals to {output_file.name}")
+    logger.success(f"Saved signals for {symbol}")
 
 
-def run_signal_generation():
-    files = list(MARKET_REGIME_DIR.glob("*.parquet"))
+def run_signal_generation(max_workers: int = None, force: bool = False):
+    symbols = list_symbols("market_regime")
 
-    if not files:
+    if not symbols:
         logger.error("No market regime parquet files found")
         return
 
-    for file in files:
-        process_file(file)
+    results = run_memoized(
+        "generate_signals",
+        code_version(generate_signals, process_symbol, indicators),
+        process_symbol,
+        inputs={symbol: [symbol_path("market_regime", symbol)] for symbol in symbols},
+        outputs=lambda symbol: [symbol_path("signals", symbol)],
+        max_workers=max_workers,
+        force=force,
+    )
+
+    refresh_latest_signals()
+    return results
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signals per symbol")
+    parser.add_argument("--force", action="store_true", help="Rebuild unchanged symbols too")
+    args = parser.parse_args()
+
     logger.info("Starting signal generation")
-    run_signal_generation()
+    run_signal_generation(force=args.force)
@@ -0,0 +1,191 @@
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from loguru import logger
+
+from src.pipeline.instrumentation import record_io
+from src.storage.dataset import list_symbols, read_symbol, read_tail, symbol_path
+from src.storage.schema import apply_schema
+from src.transform.build_price_features import FEATURE_INDICATORS
+from src.transform.fused_transform import transform_prices, save_outputs
+from src.transform.generate_signals import refresh_latest_signals
+from src.transform.indicators import warmup_rows
+
+# Longest warm-up of the stored features (sma_50: 49 rows). Every recomputed
+# row needs this many earlier rows to produce the same value as a full run.
+WARMUP_ROWS = warmup_rows(FEATURE_INDICATORS)
+
+# Extra stored rows re-checked against the price file, so bars revised by
+# the ingestion overlap window are recomputed too
+REVISION_ROWS = 10
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def find_recompute_start(prices: pd.DataFrame, tail: pd.DataFrame):
+    """
+    First Date whose signals must be (re)computed: the earliest stored bar
+    whose prices changed or disappeared, otherwise the first new bar.
+    Returns None when the stored output is already up to date.
+    """
+    columns = [c for c in PRICE_COLUMNS if c in prices.columns and c in tail.columns]
+
+    stored = tail[["Date"] + columns].merge(
+        prices[["Date"] + columns], on="Date", how="left", suffixes=("_stored", "")
+    )
+
+    # Tolerance absorbs float noise from the CSV round trip, not real revisions
+    changed = np.zeros(len(stored), dtype=bool)
+    for col in columns:
+        old = stored[f"{col}_stored"].to_numpy(dtype="float64")
+        new = stored[col].to_numpy(dtype="float64")
+        changed |= ~np.isclose(old, new, rtol=1e-9, atol=0, equal_nan=True)
+
+    if changed.any():
+        return stored.loc[changed, "Date"].min()
+
+    newer = prices.loc[prices["Date"] > tail["Date"].max(), "Date"]
+    return newer.min() if not newer.empty else None
+
+
+def update_signals(prices: pd.DataFrame, symbol: str):
+    """
+    Bring one symbol's signal table up to date with its price frame.
+
+    The stored tail (warm-up plus revision window) decides what changed;
+    features are recomputed for the changed rows only, using the warm-up
+    rows before them, then spliced onto the unchanged history. Falls back
+    to a full recompute when there is not enough history.
+
+    Only the compute is incremental: the splice reads the symbol's whole
+    signal file, and save_outputs rewrites each output file in full, since
+    a parquet file cannot be appended to in place. I/O per updated symbol
+    still grows with its history.
+
+    Returns (signals, rows_recomputed); signals is None when nothing changed.
+    """
+    prices = prices.sort_values("Date").reset_index(drop=True)
+    output_file = symbol_path("signals", symbol)
+
+    if not output_file.exists():
+        return transform_prices(prices), len(prices)
+
+    tail = read_tail("signals", symbol, WARMUP_ROWS + REVISION_ROWS)
+    if len(tail) < WARMUP_ROWS + REVISION_ROWS:
+        return transform_prices(prices), len(prices)
+
+    start = find_recompute_start(prices, tail)
+    if start is None:
+        return None, 0
+
+    warmup = tail[tail["Date"] < start].tail(WARMUP_ROWS)
+    if len(warmup) < WARMUP_ROWS:
+        logger.warning(f"{symbol}: change before the stored tail, full recompute")
+        return transform_prices(prices), len(prices)
+
+    window = pd.concat(
+        [warmup[list(prices.columns)], prices[prices["Date"] >= start]],
+        ignore_index=True
+    )
+    fresh = transform_prices(window).iloc[len(warmup):]
+
+    # Splice onto the unchanged history without converting it row by row.
+    # This reads the full file; see the docstring.
+    history = pq.read_table(output_file)
+    record_io(read=history.nbytes)
+    cutoff = pa.scalar(start, type=history.schema.field("Date").type)
+    history = history.filter(pc.less(history["Date"], cutoff))
+    signals = pd.concat([history.to_pandas(), fresh], ignore_index=True)
+
+    return signals, len(fresh)
+
+
+def compare_signals(incremental: pd.DataFrame, full: pd.DataFrame) -> list:
+    """
+    Columns where an incremental result differs from a full rebuild.
+    """
+    if len(incremental) != len(full):
+        return ["<row count>"]
+
+    # Compare at stored precision, whichever side was read back from disk
+    incremental = apply_schema(incremental)
+    full = apply_schema(full)
+
+    mismatched = []
+    for col in full.columns:
+        if col not in incremental.columns:
+            mismatched.append(col)
+            continue
+
+        a = incremental[col].reset_index(drop=True)
+        b = full[col].reset_index(drop=True)
+
+        if pd.api.types.is_float_dtype(b):
+            same = np.allclose(a.to_numpy(dtype="float64"), b.to_numpy(dtype="float64"),
+                               rtol=1e-9, atol=1e-12, equal_nan=True)
+        else:
+            same = a.astype(str).equals(b.astype(str))
+
+        if not same:
+            mismatched.append(col)
+
+    return mismatched
+
+
+def process_symbol(symbol: str, verify: bool = False):
+    prices = read_symbol("prices", symbol)
+
+    signals, recomputed = update_signals(prices, symbol)
+
+    if verify:
+        incremental = signals if signals is not None else read_symbol("signals", symbol)
+        mismatched = compare_signals(incremental, transform_prices(prices))
+
+        if mismatched:
+            logger.error(f"{symbol}: incremental differs from full rebuild in {mismatched}")
+        else:
+            logger.success(f"{symbol}: incremental matches full rebuild")
+        return not mismatched
+
+    if signals is None:
+        logger.info(f"{symbol}: up to date")
+        return True
+
+    save_outputs(symbol, signals)
+    logger.success(f"Updated signals for {symbol} ({recomputed} rows recomputed)")
+    return True
+
+
+def run_incremental_transform(verify: bool = False):
+    symbols = list_symbols("prices")
+
+    if not symbols:
+        logger.error("No price parquet files found")
+        return
+
+    results = [process_symbol(symbol, verify) for symbol in symbols]
+
+    if verify:
+        failed = results.count(False)
+        if failed:
+            logger.error(f"Verification failed for {failed}/{len(results)} symbols")
+        else:
+            logger.success(f"Verification passed for {len(results)} symbols")
+        return
+
+    refresh_latest_signals()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update signals for new bars only")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Diff the incremental result against a full rebuild instead of writing"
+    )
+    args = parser.parse_args()
+
+    run_incremental_transform(verify=args.verify)
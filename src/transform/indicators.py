@@ -0,0 +1,212 @@
+"""
+Indicator registry.
+
+Every indicator declares the columns or other indicators it is computed
+from, its window and its warm-up: the rows of history it needs before its
+first value equals a full-history computation. Consumers ask for the
+indicators they use and compute_indicators evaluates only the dependency
+closure of that request, skipping anything already present as a column.
+
+Shared intermediates are ordinary (non-public) registry entries: the close
+ratio behind daily and log returns, rolling close sums behind the SMAs,
+true range behind ATR. Each is computed once per call however many
+indicators depend on it. EMA-style indicators (EMA, MACD, Wilder's RSI and
+ATR) use pandas' recursive O(n) ewm with adjust=False.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# EMA-style indicators never forget their first value; after this many
+# rows its weight is below EMA_TOLERANCE and a restarted series agrees with
+# the full-history one (see warmup_rows)
+EMA_TOLERANCE = 1e-10
+
+
+@dataclass(frozen=True)
+class Indicator:
+    name: str
+    inputs: tuple                   # source columns or other indicators
+    func: Callable                  # func(*input series) -> pd.Series
+    window: int = 1
+    warmup: int = 0                 # own rows of history, on top of its inputs'
+    public: bool = True             # False for shared intermediates
+
+
+REGISTRY = {}
+
+
+def register(name: str, inputs, func, window: int = 1, warmup: int = None,
+             public: bool = True):
+    REGISTRY[name] = Indicator(
+        name=name,
+        inputs=tuple(inputs),
+        func=func,
+        window=window,
+        warmup=window - 1 if warmup is None else warmup,
+        public=public,
+    )
+
+
+def ema_warmup(alpha: float) -> int:
+    return math.ceil(math.log(EMA_TOLERANCE) / math.log(1 - alpha))
+
+
+def ema(values: pd.Series, span: int = None, alpha: float = None) -> pd.Series:
+    window = span or round(1 / alpha)
+    return values.ewm(span=span, alpha=alpha, adjust=False, min_periods=window).mean()
+
+
+# ----------------------------
+# RETURNS
+# ----------------------------
+register("prev_close", ["Close"], lambda close: close.shift(1), window=2, public=False)
+register("close_ratio", ["Close", "prev_close"], lambda close, prev: close / prev,
+         warmup=0, public=False)
+register("daily_return", ["close_ratio"], lambda ratio: ratio - 1, warmup=0)
+register("log_return", ["close_ratio"], np.log, warmup=0)
+
+
+# ----------------------------
+# MOVING AVERAGES
+# ----------------------------
+def register_sma(window: int):
+    register(f"close_sum_{window}", ["Close"],
+             lambda close: close.rolling(window=window).sum(), window=window, public=False)
+    register(f"sma_{window}", [f"close_sum_{window}"],
+             lambda total: total / window, window=window, warmup=0)
+
+
+def register_ema(span: int):
+    register(f"ema_{span}", ["Close"], lambda close: ema(close, span=span),
+             window=span, warmup=ema_warmup(2 / (span + 1)))
+
+
+def sma(window: int) -> str:
+    """
+    Name of the SMA over `window` bars, registering it on first use so
+    callers can ask for windows outside the defaults (see regime_sweep).
+    """
+    name = f"sma_{window}"
+    if name not in REGISTRY:
+        register_sma(window)
+    return name
+
+
+for _window in (10, 20, 50, 200):
+    register_sma(_window)
+
+for _span in (12, 26):
+    register_ema(_span)
+
+
+# ----------------------------
+# VOLATILITY
+# ----------------------------
+register("volatility_20", ["log_return"],
+         lambda log_return: log_return.rolling(window=20).std(), window=20)
+
+register("close_std_20", ["Close"], lambda close: close.rolling(window=20).std(),
+         window=20, public=False)
+register("bb_upper_20", ["sma_20", "close_std_20"], lambda mid, std: mid + 2 * std, warmup=0)
+register("bb_lower_20", ["sma_20", "close_std_20"], lambda mid, std: mid - 2 * std, warmup=0)
+register("bb_width_20", ["bb_upper_20", "bb_lower_20", "sma_20"],
+         lambda upper, lower, mid: (upper - lower) / mid, warmup=0)
+
+register("true_range", ["High", "Low", "prev_close"],
+         lambda high, low, prev: pd.concat(
+             [high - low, (high - prev).abs(), (low - prev).abs()], axis=1
+         ).max(axis=1, skipna=False).fillna(high - low),
+         warmup=0, public=False)
+register("atr_14", ["true_range"], lambda tr: ema(tr, alpha=1 / 14),
+         window=14, warmup=ema_warmup(1 / 14))
+
+
+# ----------------------------
+# MOMENTUM
+# ----------------------------
+register("close_diff", ["Close"], lambda close: close.diff(), window=2, public=False)
+register("avg_gain_14", ["close_diff"], lambda diff: ema(diff.clip(lower=0), alpha=1 / 14),
+         window=14, warmup=ema_warmup(1 / 14), public=False)
+register("avg_loss_14", ["close_diff"], lambda diff: ema(-diff.clip(upper=0), alpha=1 / 14),
+         window=14, warmup=ema_warmup(1 / 14), public=False)
+register("rsi_14", ["avg_gain_14", "avg_loss_14"],
+         lambda gain, loss: 100 - 100 / (1 + gain / loss), warmup=0)
+
+register("macd", ["ema_12", "ema_26"], lambda fast, slow: fast - slow, warmup=0)
+register("macd_signal", ["macd"], lambda macd: ema(macd, span=9),
+         window=9, warmup=ema_warmup(2 / 10))
+register("macd_hist", ["macd", "macd_signal"], lambda macd, signal: macd - signal, warmup=0)
+
+
+# ----------------------------
+# ENGINE
+# ----------------------------
+def closure(names, available=()) -> list:
+    """
+    Registry entries needed for `names`, dependencies first. Anything in
+    `available` (existing columns) is taken as is and not expanded.
+    """
+    order, seen = [], set(available)
+
+    def visit(name):
+        if name in seen:
+            return
+        if name not in REGISTRY:
+            raise KeyError(f"Unknown indicator or missing column: {name}")
+        seen.add(name)
+        for dependency in REGISTRY[name].inputs:
+            visit(dependency)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def warmup_rows(names) -> int:
+    """
+    Rows of history the slowest of `names` needs, through its whole
+    dependency chain, before its values match a full-history computation.
+    """
+    memo = {}
+
+    def total(name):
+        if name not in REGISTRY:
+            return 0
+        if name not in memo:
+            indicator = REGISTRY[name]
+            memo[name] = indicator.warmup + max((total(i) for i in indicator.inputs), default=0)
+        return memo[name]
+
+    return max((total(name) for name in names), default=0)
+
+
+def compute_indicators(df: pd.DataFrame, names) -> pd.DataFrame:
+    """
+    Add the requested indicator columns to `df`, in request order, and
+    return it. Columns already in `df` are reused, not recomputed, so a
+    mapping of column arrays that already holds them (the panel engine)
+    passes through untouched. Intermediates live only for the call.
+    """
+    names = [name for name in names if name not in df]
+    if not names:
+        return df
+
+    values = {}
+    for name in closure(names, available=list(df)):
+        indicator = REGISTRY[name]
+        inputs = [values[i] if i in values else df[i] for i in indicator.inputs]
+        values[name] = indicator.func(*inputs)
+
+    for name in names:
+        df[name] = values[name]
+    return df
+
+
+def public_indicators() -> list:
+    return [name for name, indicator in REGISTRY.items() if indicator.public]
@@ -1,22 +1,24 @@
+import argparse
 import pandas as pd
 from pathlib import Path
 from loguru import logger
+from src.pipeline.build_cache import code_version, run_memoized
+from src.storage.dataset import table_dir, write_frame
+from src.storage.raw_prices import RAW_PRICE_DIR, migrate_csv_files, read_raw_prices
 
 # Input (raw) and output (processed) directories
-RAW_PRICE_DIR = Path("data/raw/prices")
-PROCESSED_PRICE_DIR = Path("data/processed/prices")
+PROCESSED_PRICE_DIR = table_dir("prices")
 
 PROCESSED_PRICE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def process_price_file(file_path: Path):
-    logger.info(f"Processing {file_path.name}")
-
-    # Read raw CSV
-    df = pd.read_csv(file_path)
+def normalize_price_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Raw parquet files are already typed: steps 1 and 5 only convert
+    # frames that still hold text
 
     # 1. Convert Date to datetime
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
 
     # 2. Drop rows with invalid dates
     df = df.dropna(subset=["Date"])
@@ -30,26 +32,53 @@ def process_price_file(file_path: Path):
     # 5. Convert numeric columns safely
     numeric_cols = ["Open", "High", "Low", "Close", "Volume"]
     for col in numeric_cols:
-        if col in df.columns:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
+    return df
+
+
+def process_price_file(file_path: Path):
+    logger.info(f"Processing {file_path.name}")
+
+    # Read typed raw parquet
+    df = read_raw_prices(file_path.stem)
+
+    df = normalize_price_frame(df)
+
     # 6. Save cleaned data as Parquet
-    output_file = PROCESSED_PRICE_DIR / file_path.with_suffix(".parquet").name
-    df.to_parquet(output_file, index=False)
+    output_file = output_path(file_path)
+    write_frame(df, output_file)
 
     logger.success(f"Saved cleaned data to {output_file.name}")
 
 
-def run_processing():
-    csv_files = list(RAW_PRICE_DIR.glob("*.csv"))
+def output_path(file_path: Path) -> Path:
+    return PROCESSED_PRICE_DIR / file_path.name
 
-    if not csv_files:
-        logger.error("No raw CSV files found")
+
+def run_processing(max_workers: int = None, force: bool = False):
+    migrate_csv_files()
+    raw_files = sorted(RAW_PRICE_DIR.glob("*.parquet"))
+
+    if not raw_files:
+        logger.error("No raw price files found")
         return
 
-    for file_path in csv_files:
-        process_price_file(file_path)
+    return run_memoized(
+        "normalize_prices",
+        code_version(normalize_price_frame, process_price_file),
+        process_price_file,
+        inputs={path: [path] for path in raw_files},
+        outputs=lambda path: [output_path(path)],
+        max_workers=max_workers,
+        force=force,
+    )
 
 
 if __name__ == "__main__":
-    run_processing()
+    parser = argparse.ArgumentParser(description="Raw price parquet -> clean price parquet")
+    parser.add_argument("--force", action="store_true", help="Rebuild unchanged files too")
+    args = parser.parse_args()
+
+    run_processing(force=args.force)
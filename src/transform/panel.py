@@ -0,0 +1,274 @@
+"""
+Cross-sectional panel engine.
+
+Holds every symbol's prices as one dates x symbols NumPy array per column
+and computes features, market regime and signals for the whole universe at
+once. Rolling windows use a single cumulative-sum / sum-of-squares pass
+instead of one pandas rolling call per symbol and column.
+
+Rolling windows run over each symbol's own bars, not over calendar dates,
+just like the per-symbol pandas code. A symbol that lists later or skips
+a session therefore gets the same numbers as in its own file.
+"""
+
+import argparse
+from dataclasses import dataclass, field
+
+import numpy as np
+from loguru import logger
+
+from src.storage.dataset import read_table, write_symbol
+from src.transform.classify_market_regime import classify_regime
+from src.transform.fused_transform import transform_prices
+from src.transform.generate_signals import refresh_latest_signals
+
+PANEL_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+SMA_WINDOWS = [10, 20, 50]
+VOLATILITY_WINDOW = 20
+
+FEATURE_COLUMNS = [
+    "daily_return", "log_return", "sma_10", "sma_20", "sma_50", "volatility_20"
+]
+SIGNAL_COLUMNS = [
+    "market_regime", "signal_label", "signal_strength",
+    "confidence_score", "expected_move_pct", "risk_level"
+]
+
+
+@dataclass
+class Panel:
+    dates: np.ndarray                 # (T,) datetime64, union of all sessions
+    symbols: list                     # (N,)
+    present: np.ndarray               # (T, N) bool, symbol has a bar that day
+    values: dict = field(default_factory=dict)   # column -> (T, N) float64
+    frames: dict = field(default_factory=dict)   # symbol -> sorted source frame
+
+
+def build_panel(frames: dict) -> Panel:
+    """
+    Stack per-symbol price frames into a dates x symbols panel.
+    """
+    symbols = sorted(frames)
+    frames = {
+        symbol: frames[symbol].sort_values("Date").reset_index(drop=True)
+        for symbol in symbols
+    }
+
+    dates = np.unique(np.concatenate([
+        frames[s]["Date"].to_numpy(dtype="datetime64[ns]") for s in symbols
+    ])) if symbols else np.array([], dtype="datetime64[ns]")
+
+    shape = (len(dates), len(symbols))
+    present = np.zeros(shape, dtype=bool)
+    values = {col: np.full(shape, np.nan) for col in PANEL_COLUMNS}
+
+    for j, symbol in enumerate(symbols):
+        df = frames[symbol]
+        rows = np.searchsorted(dates, df["Date"].to_numpy(dtype="datetime64[ns]"))
+        present[rows, j] = True
+        for col in PANEL_COLUMNS:
+            if col in df.columns:
+                values[col][rows, j] = df[col].to_numpy(dtype="float64")
+
+    return Panel(dates, symbols, present, values, frames)
+
+
+# ----------------------------
+# BAR-ALIGNED VIEW
+# ----------------------------
+def _bar_order(present: np.ndarray) -> np.ndarray:
+    """
+    Row permutation per column that moves missing sessions to the top and
+    keeps the symbol's own bars in order at the bottom. Rolling windows on
+    the permuted array then span consecutive bars of one symbol.
+    """
+    return np.argsort(present, axis=0, kind="stable")
+
+
+def _to_bars(x: np.ndarray, order: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(x, order, axis=0)
+
+
+def _from_bars(x: np.ndarray, order: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    np.put_along_axis(out, order, x, axis=0)
+    return out
+
+
+def _shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+def _window_sums(x: np.ndarray, window: int):
+    """
+    Rolling count of finite values, sum and sum of squares over `window`
+    rows, from one cumulative pass. Values are centred on each column's
+    first finite value to keep the cumulative sums well conditioned.
+    """
+    finite = np.isfinite(x)
+    first = x[np.argmax(finite, axis=0), np.arange(x.shape[1])] if len(x) else 0.0
+    first = np.nan_to_num(first)
+    centred = np.where(finite, x - first, 0.0)
+
+    def rolling(a):
+        c = np.cumsum(np.vstack([np.zeros((1, a.shape[1])), a]), axis=0)
+        out = np.full(a.shape, np.nan)
+        if len(a) >= window:
+            out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    count = rolling(finite.astype("float64"))
+    total = rolling(centred)
+    squares = rolling(centred * centred)
+    return count, total, squares, first
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    count, total, _, first = _window_sums(x, window)
+    return np.where(count == window, total / window + first, np.nan)
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    count, total, squares, _ = _window_sums(x, window)
+    var = (squares - total * total / window) / (window - 1)
+    return np.where(count == window, np.sqrt(np.clip(var, 0.0, None)), np.nan)
+
+
+# ----------------------------
+# FEATURES / REGIME / SIGNALS
+# ----------------------------
+def compute_features(panel: Panel) -> dict:
+    order = _bar_order(panel.present)
+    close = _to_bars(panel.values["Close"], order)
+    previous = _shift(close)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bars = {
+            "daily_return": close / previous - 1,
+            "log_return": np.log(close / previous),
+        }
+
+    for window in SMA_WINDOWS:
+        bars[f"sma_{window}"] = rolling_mean(close, window)
+
+    bars[f"volatility_{VOLATILITY_WINDOW}"] = rolling_std(bars["log_return"], VOLATILITY_WINDOW)
+
+    return {name: _from_bars(values, order) for name, values in bars.items()}
+
+
+def generate_signals_panel(cols: dict) -> dict:
+    """
+    generate_signals from src.transform.generate_signals on 2-D arrays.
+    """
+    close = cols["Close"]
+    regime = cols["market_regime"]
+
+    bullish = (regime == "Bullish") & (close > cols["sma_20"])
+    bearish = (regime == "Bearish") & (close < cols["sma_20"])
+
+    label = np.where(bullish, "Bullish", np.where(bearish, "Bearish", "Neutral"))
+    strength = np.where(bullish | bearish, "Strong", "Weak")
+
+    confidence = (
+        50
+        + 20 * (bullish | bearish)
+        + 15 * (close > cols["sma_50"])
+        + 15 * (close < cols["sma_50"])
+    ).clip(0, 100).astype("int64")
+
+    expected = np.round(cols["volatility_20"] * np.sqrt(5) * 100, 2)
+    expected = np.where(label == "Bearish", -expected, expected)
+
+    risk = np.where(confidence >= 70, "Low", np.where(confidence < 40, "High", "Medium"))
+
+    return {
+        "signal_label": label,
+        "signal_strength": strength,
+        "confidence_score": confidence,
+        "expected_move_pct": expected,
+        "risk_level": risk,
+    }
+
+
+def transform_panel(panel: Panel) -> dict:
+    """
+    Features, regime and signals for every symbol of the panel.
+    Returns column -> (T, N) array.
+    """
+    cols = dict(panel.values)
+    cols.update(compute_features(panel))
+
+    # classify_regime only indexes columns and assigns one, so the 2-D
+    # arrays go through the exact same rules as a DataFrame would
+    classify_regime(cols)
+
+    cols.update(generate_signals_panel(cols))
+    return cols
+
+
+def panel_to_frames(panel: Panel, cols: dict) -> dict:
+    """
+    Per-symbol signal tables with the same columns as the per-file pipeline.
+    """
+    frames = {}
+    for j, symbol in enumerate(panel.symbols):
+        rows = panel.present[:, j]
+        df = panel.frames[symbol].copy()
+        for col in FEATURE_COLUMNS + SIGNAL_COLUMNS:
+            df[col] = cols[col][rows, j]
+        frames[symbol] = df
+    return frames
+
+
+def run_panel_transform(verify: bool = False):
+    prices = read_table("prices")
+
+    if prices.empty:
+        logger.error("No price parquet files found")
+        return
+
+    frames = {
+        str(symbol): df.reset_index(drop=True)
+        for symbol, df in prices.groupby("symbol", observed=True)
+    }
+    logger.info(f"Building panel for {len(frames)} symbols")
+
+    panel = build_panel(frames)
+    signals = panel_to_frames(panel, transform_panel(panel))
+
+    if verify:
+        from src.transform.incremental_transform import compare_signals
+
+        failed = 0
+        for symbol, df in signals.items():
+            mismatched = compare_signals(df, transform_prices(frames[symbol]))
+            if mismatched:
+                failed += 1
+                logger.error(f"{symbol}: panel differs from per-file output in {mismatched}")
+
+        if failed:
+            logger.error(f"Verification failed for {failed}/{len(signals)} symbols")
+        else:
+            logger.success(f"Panel output matches per-file output for {len(signals)} symbols")
+        return
+
+    for symbol, df in signals.items():
+        write_symbol("signals", symbol, df)
+
+    refresh_latest_signals()
+
+    logger.success(f"Saved signals for {len(signals)} symbols")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Whole-universe features and signals")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compare against the per-file transform instead of writing"
+    )
+    args = parser.parse_args()
+
+    run_panel_transform(verify=args.verify)
@@ -1,81 +1,374 @@
-import pandas as pd
+"""
+Validation gate for raw price bars.
+
+All symbols are stacked into one long frame and every check runs as a
+single vectorised pass over it:
+
+- error checks (the row is quarantined): unparsed_date, duplicate_date,
+  missing_price, non_positive_price, negative_volume, high_below_low
+- warning checks (reported only): out_of_order, off_calendar, and gaps
+  against the trading calendar
+
+The trading calendar is the consensus of the universe: a date is a trading
+day when at least CALENDAR_QUORUM of the symbols listed at the time have a
+bar on it. A symbol whose quarantined share exceeds MAX_QUARANTINE_FRACTION
+is rejected as a whole. Results are a JSON report (data/validation/report.json)
+and per-symbol quarantine files holding the offending rows.
+"""
+
+import argparse
+import json
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
+
+import numpy as np
+import pandas as pd
 from loguru import logger
 
-RAW_PRICE_DIR = Path("data/raw/prices")
+from src.pipeline.instrumentation import record_failure
+from src.storage.dataset import write_frame
+from src.storage.raw_prices import list_raw_symbols, migrate_csv_files, read_raw_prices
 
-EXPECTED_PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+VALIDATION_DIR = PROJECT_ROOT / "data/validation"
+REPORT_FILE = VALIDATION_DIR / "report.json"
+QUARANTINE_DIR = VALIDATION_DIR / "quarantine"
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
 VOLUME_COLUMN = "Volume"
 
+ERROR_CHECKS = [
+    "unparsed_date",
+    "duplicate_date",
+    "missing_price",
+    "non_positive_price",
+    "negative_volume",
+    "high_below_low",
+]
+WARNING_CHECKS = ["out_of_order", "off_calendar"]
 
-def validate_price_file(file_path: Path):
-    logger.info(f"Validating {file_path.name}")
+# Share of listed symbols that must have a bar for a date to be a trading day
+CALENDAR_QUORUM = 0.5
 
-    df = pd.read_csv(file_path)
+# Above this share of quarantined rows the whole symbol is rejected
+MAX_QUARANTINE_FRACTION = 0.05
 
-    # ----------------------------
-    # DATA TYPE NORMALIZATION
-    # ----------------------------
+# Missing dates listed per symbol in the report
+MAX_GAPS_REPORTED = 20
 
-    # Date parsing
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
 
-    # ----------------------------
-    # BASIC STRUCTURE CHECKS
-    # ----------------------------
+@dataclass
+class ValidationResult:
+    clean: dict                                     # symbol -> rows that passed
+    quarantine: pd.DataFrame                        # offending rows with their issues
+    report: dict = field(default_factory=dict)
 
-    if df.empty:
-        logger.error("File is empty")
-        return
+    @property
+    def passed(self) -> bool:
+        return self.report.get("passed", False)
 
-    if df["Date"].isna().any():
-        logger.warning("Some dates could not be parsed")
 
-    if df["Date"].duplicated().any():
-        logger.warning("Duplicate dates found")
+# ----------------------------
+# LOADING
+# ----------------------------
+def stack_frames(frames: dict) -> pd.DataFrame:
+    """
+    One long frame with a `_key` column for the symbol each row came from.
+    """
+    if not frames:
+        return pd.DataFrame(columns=["_key", "Date"] + PRICE_COLUMNS + [VOLUME_COLUMN])
 
-    if not df["Date"].is_monotonic_increasing:
-        logger.warning("Dates are not sorted")
+    long = pd.concat(frames.values(), keys=list(frames), names=["_key", None])
+    long = long.reset_index(level=0).reset_index(drop=True)
+    long["_key"] = long["_key"].astype("category")
+    return long
 
-    # ----------------------------
-    # PRICE COLUMN VALIDATION
-    # ----------------------------
 
-    for col in EXPECTED_PRICE_COLUMNS:
-        if col not in df.columns:
-            logger.warning(f"Missing column: {col}")
-            continue
+def load_raw_prices() -> dict:
+    migrate_csv_files()
+    return {symbol: read_raw_prices(symbol) for symbol in list_raw_symbols()}
 
-        df[col] = pd.to_numeric(df[col], errors="coerce")
 
-        if (df[col] <= 0).any():
-            logger.error(f"Non-positive values found in {col}")
+# ----------------------------
+# CHECKS
+# ----------------------------
+def trading_calendar(dates: pd.Series, keys: pd.Series) -> pd.DatetimeIndex:
+    """
+    Consensus trading days: dates on which at least CALENDAR_QUORUM of the
+    symbols listed at the time (between their first and last bar) traded.
+    """
+    bars = pd.DataFrame({"key": keys, "Date": dates}).dropna().drop_duplicates()
+    if bars.empty:
+        return pd.DatetimeIndex([], name="Date")
 
-    # ----------------------------
-    # VOLUME VALIDATION
-    # ----------------------------
+    counts = bars.groupby("Date").size()
+    spans = bars.groupby("key", observed=True)["Date"].agg(["min", "max"])
 
-    if VOLUME_COLUMN not in df.columns:
-        logger.error("Volume column missing")
-    else:
-        df[VOLUME_COLUMN] = pd.to_numeric(df[VOLUME_COLUMN], errors="coerce")
+    days = counts.index.values
+    listed = (
+        np.searchsorted(np.sort(spans["min"].values), days, side="right")
+        - np.searchsorted(np.sort(spans["max"].values), days, side="left")
+    )
+    return pd.DatetimeIndex(days[counts.values >= CALENDAR_QUORUM * listed], name="Date")
+
+
+def parse_bars(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Date, OHLC and Volume of the long frame as datetime/float, with values
+    that do not parse set to NaT/NaN.
+    """
+    parsed = {"Date": pd.to_datetime(long["Date"], errors="coerce")}
+    for col in PRICE_COLUMNS + [VOLUME_COLUMN]:
+        parsed[col] = pd.to_numeric(long[col], errors="coerce") if col in long else np.nan
+    return pd.DataFrame(parsed, index=long.index)
+
+
+def row_checks(keys: pd.Series, bars: pd.DataFrame, calendar: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Boolean frame, one column per check, True where the row fails it.
+    """
+    dates = bars["Date"]
+    prices = bars[PRICE_COLUMNS]
+
+    unparsed = dates.isna()
+    previous_max = dates.groupby(keys, observed=True).cummax().groupby(keys, observed=True).shift()
+
+    checks = pd.DataFrame({
+        "unparsed_date": unparsed,
+        # The last copy wins, as when incremental ingestion replaces a bar
+        "duplicate_date": ~unparsed & pd.DataFrame({"k": keys, "d": dates}).duplicated(keep="last"),
+        "missing_price": prices.isna().any(axis=1),
+        "non_positive_price": (prices <= 0).any(axis=1),
+        "negative_volume": bars[VOLUME_COLUMN] < 0,
+        "high_below_low": prices["High"] < prices["Low"],
+        "out_of_order": dates < previous_max,
+        "off_calendar": ~unparsed & ~dates.isin(calendar),
+    }, index=bars.index)
+    return checks.fillna(False).astype(bool)
+
+
+def calendar_gaps(dates: pd.Series, keys: pd.Series, calendar: pd.DatetimeIndex) -> dict:
+    """
+    symbol -> trading days between its first and last bar with no bar.
+    """
+    bars = pd.DataFrame({"key": keys, "Date": dates}).dropna().drop_duplicates()
+    bars = bars[bars["Date"].isin(calendar)]
+    if bars.empty:
+        return {}
+
+    by_key = bars.groupby("key", observed=True)["Date"]
+    spans = by_key.agg(["min", "max", "size"])
+    expected = (
+        np.searchsorted(calendar.values, spans["max"].values, side="right")
+        - np.searchsorted(calendar.values, spans["min"].values, side="left")
+    )
+    missing = pd.Series(expected - spans["size"].values, index=spans.index)
+
+    gaps = {}
+    for key in missing[missing > 0].index:
+        first, last = spans.loc[key, ["min", "max"]]
+        window = calendar[(calendar >= first) & (calendar <= last)]
+        gaps[str(key)] = window.difference(pd.DatetimeIndex(by_key.get_group(key)))
+    return gaps
+
+
+def label_issues(checks: pd.DataFrame) -> pd.Series:
+    """
+    Comma separated names of the failed checks of each row.
+    """
+    names = pd.Series([f"{name}," for name in checks.columns], index=checks.columns)
+    return checks.dot(names).str.rstrip(",")
+
+
+def check_prices(frames: dict, calendar: pd.DatetimeIndex = None) -> ValidationResult:
+    """
+    Validate raw price frames (symbol -> DataFrame) without writing anything.
+    `calendar` overrides the consensus trading calendar.
+    """
+    long = stack_frames(frames)
+    keys = long["_key"]
+    bars = parse_bars(long)
+    dates = bars["Date"]
+
+    if calendar is None:
+        calendar = trading_calendar(dates, keys)
+
+    checks = row_checks(keys, bars, calendar)
+    bad = checks[ERROR_CHECKS].any(axis=1)
+
+    quarantine = bars[bad].assign(
+        symbol=keys[bad].astype(str),
+        raw_date=long.loc[bad, "Date"].astype(str),
+        issues=label_issues(checks.loc[bad, ERROR_CHECKS]),
+    )
 
-        if (df[VOLUME_COLUMN] < 0).any():
-            logger.error("Negative volume values found")
+    # Per-symbol counts of every check in one groupby
+    counts = checks.assign(_bad=bad).groupby(keys, observed=True).sum()
+    rows = keys.value_counts()
+    gaps = calendar_gaps(dates, keys, calendar)
 
-    logger.success("Basic validation completed")
+    by_symbol = {}
+    for key in frames:
+        n_rows = int(rows.get(key, 0))
+        issues = counts.loc[key] if n_rows else pd.Series(0, index=counts.columns)
+        quarantined = int(issues.pop("_bad"))
+        missing = gaps.get(str(key), pd.DatetimeIndex([]))
+
+        if n_rows == 0 or quarantined == n_rows or quarantined > MAX_QUARANTINE_FRACTION * n_rows:
+            status = "rejected"
+        elif quarantined:
+            status = "quarantined"
+        elif issues[WARNING_CHECKS].any() or len(missing):
+            status = "warning"
+        else:
+            status = "ok"
+
+        by_symbol[str(key)] = {
+            "status": status,
+            "rows": n_rows,
+            "quarantined_rows": quarantined,
+            "issues": {name: int(n) for name, n in issues.items() if n},
+            "missing_days": len(missing),
+            "missing_dates": [d.strftime("%Y-%m-%d") for d in missing[:MAX_GAPS_REPORTED]],
+        }
+
+    rejected = sorted(key for key, entry in by_symbol.items() if entry["status"] == "rejected")
+
+    clean_rows = long[~bad & ~keys.isin(rejected)]
+    clean = {
+        key: df.drop(columns="_key").reset_index(drop=True)
+        for key, df in clean_rows.groupby("_key", observed=True, sort=False)
+    }
+
+    report = {
+        "generated_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "passed": not rejected,
+        "symbols": len(frames),
+        "rows": len(long),
+        "quarantined_rows": int(bad.sum()),
+        "rejected_symbols": rejected,
+        "checks": {
+            name: {
+                "severity": "error" if name in ERROR_CHECKS else "warning",
+                "rows": int(checks[name].sum()),
+            }
+            for name in ERROR_CHECKS + WARNING_CHECKS
+        },
+        "calendar": {
+            "trading_days": len(calendar),
+            "first": calendar.min().strftime("%Y-%m-%d") if len(calendar) else None,
+            "last": calendar.max().strftime("%Y-%m-%d") if len(calendar) else None,
+            "missing_days": sum(len(d) for d in gaps.values()),
+        },
+        "by_symbol": by_symbol,
+    }
+
+    return ValidationResult(clean=clean, quarantine=quarantine, report=report)
+
+
+# ----------------------------
+# OUTPUTS
+# ----------------------------
+def without_timestamp(report: dict) -> dict:
+    return {key: value for key, value in report.items() if key != "generated_at"}
+
+
+def write_report(report: dict, report_file: Path = REPORT_FILE) -> Path:
+    """
+    Write the report unless only its generated_at differs from the stored
+    one, so an unchanged validation leaves report.json untouched in git.
+    generated_at then records when the current findings first appeared.
+    """
+    if report_file.exists():
+        try:
+            stored = json.loads(report_file.read_text())
+        except ValueError:
+            stored = None
+        if stored is not None and without_timestamp(stored) == without_timestamp(report):
+            return report_file
+
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = report_file.with_name(f".{report_file.name}.tmp")
+    tmp_file.write_text(json.dumps(report, indent=2))
+    os.replace(tmp_file, report_file)
+    return report_file
+
+
+def save_quarantine(quarantine: pd.DataFrame, quarantine_dir: Path = QUARANTINE_DIR):
+    """
+    Add quarantined rows to the per-symbol quarantine files. A row that is
+    quarantined again on the next run is kept once.
+    """
+    if quarantine.empty:
+        return
+
+    quarantine = quarantine.assign(quarantined_at=pd.Timestamp.now(tz="UTC"))
+
+    for symbol, rows in quarantine.groupby("symbol", sort=False):
+        path = quarantine_dir / f"{symbol}.parquet"
+        if path.exists():
+            rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+            rows = rows.drop_duplicates(subset=["raw_date", "issues"], keep="first")
+        write_frame(rows, path)
+
+
+def validate_prices(frames: dict, calendar: pd.DatetimeIndex = None) -> ValidationResult:
+    """
+    Validation gate: check, write the report and quarantine, log a summary.
+    Rejected symbols are recorded as failures of the running pipeline stage.
+    """
+    result = check_prices(frames, calendar)
+    report = result.report
+
+    write_report(report)
+    save_quarantine(result.quarantine)
+
+    for name, check in report["checks"].items():
+        if check["rows"]:
+            log = logger.error if check["severity"] == "error" else logger.warning
+            log(f"{name}: {check['rows']} row(s)")
+
+    for symbol in report["rejected_symbols"]:
+        entry = report["by_symbol"][symbol]
+        error = f"{entry['quarantined_rows']}/{entry['rows']} rows failed validation"
+        logger.error(f"{symbol} rejected: {error}")
+        record_failure(symbol, error)
+
+    logger.info(
+        f"Validated {report['rows']} rows of {report['symbols']} symbols: "
+        f"{report['quarantined_rows']} quarantined, "
+        f"{len(report['rejected_symbols'])} symbol(s) rejected"
+    )
+    return result
 
 
 def run_validation():
-    csv_files = list(RAW_PRICE_DIR.glob("*.csv"))
+    frames = load_raw_prices()
 
-    if not csv_files:
-        logger.error("No CSV files found")
+    if not frames:
+        logger.error("No raw price files found")
         return
 
-    for file_path in csv_files:
-        validate_price_file(file_path)
+    result = validate_prices(frames)
+
+    if result.passed:
+        logger.success(f"Validation passed → {REPORT_FILE}")
+    else:
+        logger.error(f"Validation failed → {REPORT_FILE}")
+    return result
 
 
 if __name__ == "__main__":
-    run_validation()
+    parser = argparse.ArgumentParser(description="Validate raw price files")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit with status 1 when a symbol is rejected"
+    )
+    args = parser.parse_args()
+
+    result = run_validation()
+
+    if args.strict and (result is None or not result.passed):
+        raise SystemExit(1)
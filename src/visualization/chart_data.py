@@ -0,0 +1,159 @@
+"""
+Chart data layer for the dashboard price chart.
+
+Line traces are thinned with Largest-Triangle-Three-Buckets, which keeps
+the visually important peaks and troughs. Candles are aggregated to weekly
+or monthly OHLC bars when a range holds more daily bars than the chart
+budget. Either way the browser receives at most about MAX_POINTS points
+per trace; zoomed-in ranges stay at full daily resolution.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Points per trace sent to the browser
+MAX_POINTS = 500
+
+# Visible range -> lookback from the latest bar (None = full history)
+RANGES = {
+    "3M": pd.DateOffset(months=3),
+    "6M": pd.DateOffset(months=6),
+    "1Y": pd.DateOffset(years=1),
+    "3Y": pd.DateOffset(years=3),
+    "All": None,
+}
+
+# Candle resolutions from finest to coarsest, with their resample rule
+RESOLUTIONS = {
+    "Daily": None,
+    "Weekly": "W-FRI",
+    "Monthly": "ME",
+}
+
+LINE_COLUMNS = ["Close", "sma_20", "sma_50"]
+OHLC_COLUMNS = ["Open", "High", "Low", "Close"]
+
+
+# ----------------------------
+# RANGE
+# ----------------------------
+def filter_range(df: pd.DataFrame, range_key: str) -> pd.DataFrame:
+    """
+    Rows of a Date-sorted frame inside the visible range.
+    """
+    offset = RANGES[range_key]
+    if offset is None or df.empty:
+        return df
+
+    start = df["Date"].iloc[-1] - offset
+    return df[df["Date"] >= start]
+
+
+# ----------------------------
+# LTTB
+# ----------------------------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Row positions kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The rest is split into
+    n_out - 2 buckets; from each bucket the point forming the largest
+    triangle with the previously kept point and the next bucket's mean
+    is kept. NaN values in y are skipped.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype("float64")
+    y = y.astype("float64")
+
+    finite = np.isfinite(y)
+    if not finite.all():
+        kept = np.flatnonzero(finite)
+        return kept[lttb_indices(x[kept], y[kept], n_out)]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype("int64")
+    selected = np.empty(n_out, dtype="int64")
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Mean of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_lo, next_hi = hi, edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def line_chart_data(df: pd.DataFrame, max_points: int = MAX_POINTS,
+                    extra_columns=()) -> pd.DataFrame:
+    """
+    Date plus the line columns (and any overlay columns), downsampled on
+    Close so every trace shares the same x values.
+    """
+    columns = ["Date"] + [c for c in LINE_COLUMNS + list(extra_columns) if c in df.columns]
+    df = df[columns].reset_index(drop=True)
+
+    if len(df) <= max_points:
+        return df
+
+    x = df["Date"].to_numpy(dtype="datetime64[ns]").astype("int64")
+    keep = lttb_indices(x, df["Close"].to_numpy(dtype="float64"), max_points)
+    return df.iloc[keep].reset_index(drop=True)
+
+
+# ----------------------------
+# OHLC
+# ----------------------------
+def pick_resolution(df: pd.DataFrame, max_points: int = MAX_POINTS) -> str:
+    """
+    Finest candle resolution that fits the range into max_points bars.
+    """
+    if len(df) <= max_points:
+        return "Daily"
+
+    span_days = (df["Date"].iloc[-1] - df["Date"].iloc[0]).days
+    if span_days / 7 <= max_points:
+        return "Weekly"
+    return "Monthly"
+
+
+def resample_ohlc(df: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    rule = RESOLUTIONS[resolution]
+    df = df[["Date"] + OHLC_COLUMNS]
+
+    if rule is None:
+        return df.reset_index(drop=True)
+
+    bars = df.set_index("Date").resample(rule).agg({
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+    })
+    return bars.dropna(subset=["Close"]).reset_index()
+
+
+def ohlc_chart_data(df: pd.DataFrame, resolution: str = None, max_points: int = MAX_POINTS):
+    """
+    Candles for the range at the given resolution, or the finest one that
+    fits when resolution is None. Returns (bars, resolution).
+    """
+    if resolution is None:
+        resolution = pick_resolution(df, max_points)
+    return resample_ohlc(df, resolution), resolution
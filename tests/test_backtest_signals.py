@@ -0,0 +1,26 @@
+import numpy as np
+
+from src.backtest.backtest_signals import forward_returns
+
+# Three symbols sorted by symbol: three bars, a single bar, two bars
+CLOSE = np.array([10.0, 11.0, 12.0, 50.0, 20.0, 22.0])
+CODES = np.array([0, 0, 0, 1, 2, 2])
+
+
+def test_forward_returns_stop_at_symbol_boundaries():
+    np.testing.assert_allclose(
+        forward_returns(CLOSE, CODES, 1),
+        [0.1, 1 / 11, np.nan, np.nan, 0.1, np.nan],
+    )
+
+
+def test_longer_horizons_never_reach_into_the_next_symbol():
+    np.testing.assert_allclose(
+        forward_returns(CLOSE, CODES, 2),
+        [0.2, np.nan, np.nan, np.nan, np.nan, np.nan],
+    )
+
+
+def test_horizon_past_the_whole_array():
+    assert np.isnan(forward_returns(CLOSE, CODES, len(CLOSE))).all()
+    assert np.isnan(forward_returns(CLOSE[:1], CODES[:1], 1)).all()
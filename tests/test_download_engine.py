@@ -0,0 +1,76 @@
+import time
+
+import pandas as pd
+
+from src.ingestion.download_engine import download_universe
+from src.ingestion.price_provider import FakePriceProvider
+
+START = "2025-12-01"
+END = "2026-01-09"
+BARS = len(pd.bdate_range(START, END))
+SYMBOLS = ["AAA.NS", "BBB.NS", "CCC.NS", "DDD.NS", "EEE.NS"]
+
+
+def download(provider, on_frame=None, **kwargs):
+    kwargs = {"batch_size": 2, "rate_limit": 0, "backoff": 0.01, **kwargs}
+    return download_universe(
+        {symbol: START for symbol in SYMBOLS}, provider, on_frame=on_frame, **kwargs
+    )
+
+
+def test_batches_every_symbol_once():
+    provider = FakePriceProvider(end=END)
+    saved = []
+
+    results = download(provider, on_frame=lambda symbol, df: saved.append(symbol))
+
+    assert all(r.ok and r.attempts == 1 and r.rows == BARS for r in results.values())
+    assert sorted(saved) == SYMBOLS
+    assert provider.calls == 3
+
+
+def test_missing_symbol_is_retried_with_backoff():
+    provider = FakePriceProvider(end=END, failures={"BBB.NS": 2})
+
+    start = time.monotonic()
+    results = download(provider, backoff=0.05)
+    elapsed = time.monotonic() - start
+
+    assert all(r.ok for r in results.values())
+    assert results["BBB.NS"].attempts == 3
+    assert results["AAA.NS"].attempts == 1
+    # Retries wait 0.05s, then 0.1s
+    assert elapsed >= 0.15
+
+
+def test_symbol_failing_every_attempt():
+    provider = FakePriceProvider(end=END, failures={"CCC.NS": 10})
+
+    results = download(provider, max_retries=2)
+
+    failed = results["CCC.NS"]
+    assert not failed.ok
+    assert failed.attempts == 3
+    assert failed.error == "no data returned"
+    assert all(r.ok for symbol, r in results.items() if symbol != "CCC.NS")
+
+
+def test_on_frame_error_fails_only_that_symbol():
+    provider = FakePriceProvider(end=END)
+    saved = []
+
+    def on_frame(symbol, df):
+        if symbol == "BBB.NS":
+            raise OSError("disk full")
+        saved.append(symbol)
+
+    results = download(provider, on_frame=on_frame, max_retries=1)
+
+    # AAA.NS shares the batch and is saved once, without a retry
+    assert results["AAA.NS"].ok and results["AAA.NS"].attempts == 1
+    assert saved.count("AAA.NS") == 1
+
+    failed = results["BBB.NS"]
+    assert not failed.ok
+    assert failed.attempts == 2
+    assert failed.error == "OSError: disk full"
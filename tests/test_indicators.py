@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.transform.indicators import closure, compute_indicators, ema_warmup, warmup_rows
+
+
+def wilder(values, alpha):
+    # Recursive average seeded with the first value, as ewm(adjust=False)
+    out, average = [], None
+    for value in values:
+        average = value if average is None else (1 - alpha) * average + alpha * value
+        out.append(average)
+    return np.array(out)
+
+
+def price_frame(closes):
+    close = pd.Series(closes, dtype="float64")
+    return pd.DataFrame({"High": close + 1, "Low": close - 1, "Close": close})
+
+
+# ----------------------------
+# CLOSURE
+# ----------------------------
+def test_closure_lists_dependencies_first_and_once():
+    order = closure(["log_return", "daily_return"], available=["Close"])
+    assert order == ["prev_close", "close_ratio", "log_return", "daily_return"]
+
+
+def test_closure_does_not_expand_available_columns():
+    assert closure(["sma_20"], available=["Close"]) == ["close_sum_20", "sma_20"]
+    assert closure(["bb_upper_20"], available=["Close", "sma_20"]) == [
+        "close_std_20", "bb_upper_20"
+    ]
+
+
+def test_closure_rejects_unknown_names():
+    with pytest.raises(KeyError):
+        closure(["sma_20"])
+    with pytest.raises(KeyError):
+        closure(["no_such_indicator"], available=["Close"])
+
+
+# ----------------------------
+# WARM-UP
+# ----------------------------
+def test_warmup_rows_follows_the_dependency_chain():
+    assert warmup_rows([]) == 0
+    assert warmup_rows(["daily_return"]) == 1
+    assert warmup_rows(["sma_50"]) == 49
+    # 19 rows of rolling std on top of the one row log_return needs
+    assert warmup_rows(["volatility_20"]) == 20
+    assert warmup_rows(["sma_10", "sma_50", "daily_return"]) == 49
+    assert warmup_rows(["rsi_14"]) == ema_warmup(1 / 14) + 1
+
+
+def test_restart_after_warmup_matches_full_history():
+    closes = 100 + np.cumsum(np.sin(np.arange(800) / 7) + 0.1)
+    full = compute_indicators(price_frame(closes), ["sma_50", "rsi_14"])
+
+    start = 600
+    rows = warmup_rows(["sma_50", "rsi_14"])
+    restarted = compute_indicators(price_frame(closes[start - rows:]), ["sma_50", "rsi_14"])
+
+    for name in ["sma_50", "rsi_14"]:
+        np.testing.assert_allclose(
+            restarted[name].to_numpy()[rows:], full[name].to_numpy()[start:], rtol=1e-9
+        )
+
+
+# ----------------------------
+# WILDER INDICATORS
+# ----------------------------
+def test_rsi_matches_wilder_smoothing():
+    # +2, -1, +2, -1, ... so gains and losses alternate
+    closes = 100 + np.cumsum([0] + [2, -1] * 15)
+    rsi = compute_indicators(price_frame(closes), ["rsi_14"])["rsi_14"].to_numpy()
+
+    diff = np.diff(closes)
+    gain = wilder(np.clip(diff, 0, None), 1 / 14)
+    loss = wilder(np.clip(-diff, 0, None), 1 / 14)
+    with np.errstate(divide="ignore"):
+        expected = 100 - 100 / (1 + gain / loss)
+
+    # Index 0 has no change and the average needs 14 changes
+    assert np.isnan(rsi[:14]).all()
+    np.testing.assert_allclose(rsi[14:], expected[13:], rtol=1e-12)
+
+
+def test_rsi_of_a_rising_series_is_100():
+    rsi = compute_indicators(price_frame(np.arange(30.0) + 50), ["rsi_14"])["rsi_14"]
+    assert (rsi.dropna() == 100).all()
+
+
+def test_true_range_covers_gaps_from_the_previous_close():
+    df = pd.DataFrame({
+        "High": [10.0, 12.0, 11.0, 15.0],
+        "Low": [8.0, 9.0, 7.0, 14.0],
+        "Close": [9.0, 11.0, 8.0, 14.5],
+    })
+    true_range = compute_indicators(df, ["true_range"])["true_range"]
+
+    # High - Low on the first bar, then the largest of the three ranges
+    assert true_range.tolist() == [2.0, 3.0, 4.0, 7.0]
+
+
+def test_atr_matches_wilder_smoothing():
+    high = np.array([10, 12, 11, 15, 16, 14, 13, 17, 18, 16, 15, 19, 20, 18, 17, 21, 22, 20],
+                    dtype="float64")
+    low = high - np.array([2, 3, 4, 1, 2, 3, 2, 1, 4, 2, 3, 2, 1, 3, 2, 4, 2, 1])
+    close = (high + low) / 2
+    df = pd.DataFrame({"High": high, "Low": low, "Close": close})
+
+    atr = compute_indicators(df, ["atr_14"])["atr_14"].to_numpy()
+
+    prev = np.concatenate([[np.nan], close[:-1]])
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+    expected = wilder(true_range, 1 / 14)
+
+    assert np.isnan(atr[:13]).all()
+    np.testing.assert_allclose(atr[13:], expected[13:], rtol=1e-12)
@@ -0,0 +1,130 @@
+import pandas as pd
+import pytest
+
+from src.screener.signal_index import (
+    KEEP_GENERATIONS, build_index, current_generation, load_index, save_index
+)
+
+DATES = pd.date_range("2024-01-01", periods=5, freq="B")
+
+# symbol -> one (signal_label, confidence_score) per session, None for no bar
+BARS = {
+    "AAA": [("Bullish", 85)] * 5,
+    "BBB": [("Bullish", 85)] * 3 + [("Bullish", 40), ("Neutral", 50)],
+    "CCC": [None, ("Bullish", 85), ("Bearish", 85), ("Bullish", 85), ("Bullish", 85)],
+    "DDD": [("Bearish", 85), ("Neutral", 50), ("Neutral", 50), ("Bullish", 85), ("Neutral", 50)],
+    "EEE": [("Bullish", 85), None, ("Bearish", 85), None, None],
+}
+
+
+def signal_frame():
+    rows = [
+        {
+            "Date": date,
+            "symbol": symbol,
+            "confidence_score": bar[1],
+            "market_regime": "Sideways",
+            "signal_label": bar[0],
+            "signal_strength": "Strong" if bar[1] >= 80 else "Weak",
+        }
+        for symbol, bars in BARS.items()
+        for date, bar in zip(DATES, bars)
+        if bar is not None
+    ]
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def index():
+    return build_index(signal_frame())
+
+
+def screened(result):
+    return dict(zip(result["symbol"], result["matched_sessions"]))
+
+
+# ----------------------------
+# SCREEN
+# ----------------------------
+def test_screen_requires_every_session_by_default(index):
+    result = index.screen(sessions=3, signal_label="Bullish")
+    assert screened(result) == {"AAA": 3}
+    assert result["last_match"].tolist() == [DATES[-1]]
+
+
+def test_screen_min_sessions(index):
+    result = index.screen(sessions=3, min_sessions=2, signal_label="Bullish")
+    assert screened(result) == {"AAA": 3, "BBB": 2, "CCC": 2}
+    assert dict(zip(result["symbol"], result["last_match"])) == {
+        "AAA": DATES[4], "BBB": DATES[3], "CCC": DATES[4]
+    }
+
+
+def test_screen_min_confidence_over_sessions(index):
+    # BBB's Bullish bar on the fourth session is below the threshold
+    result = index.screen(sessions=3, min_sessions=2, min_confidence=80, signal_label="Bullish")
+    assert screened(result) == {"AAA": 3, "CCC": 2}
+
+    result = index.screen(sessions=5, min_confidence=80)
+    assert screened(result) == {"AAA": 5}
+
+
+def test_screen_date_range_counts_missing_bars_as_misses(index):
+    # CCC has no bar on the first session
+    result = index.screen(start=DATES[0], end=DATES[1], signal_label="Bullish")
+    assert screened(result) == {"AAA": 2, "BBB": 2}
+
+
+def test_screen_any_of_several_labels(index):
+    result = index.screen(sessions=1, signal_label=["Bearish", "Neutral"])
+    assert screened(result) == {"BBB": 1, "DDD": 1}
+
+
+def test_sessions_matching(index):
+    counts = index.sessions_matching(start=DATES[0], end=DATES[-1], signal_label="Bullish")
+    assert counts.tolist() == [3, 3, 2, 4, 2]
+
+
+# ----------------------------
+# FLIPS
+# ----------------------------
+def test_flips_skip_neutral_gaps(index):
+    assert index.flips("DDD", "Bearish", "Bullish").tolist() == [DATES[3]]
+    assert index.last_flip("DDD", "Bearish", "Bullish") == DATES[3]
+
+
+def test_flips_to_or_from_neutral_are_not_skipped(index):
+    assert index.flips("DDD", "Bearish", "Neutral").tolist() == [DATES[1]]
+    assert index.flips("DDD", "Bullish", "Neutral").tolist() == [DATES[4]]
+
+
+def test_flips_across_missing_bars(index):
+    assert index.flips("EEE", "Bullish", "Bearish").tolist() == [DATES[2]]
+    assert index.flips("CCC", "Bearish", "Bullish").tolist() == [DATES[3]]
+    assert index.last_flip("AAA", "Bearish", "Bullish") is None
+
+
+def test_position_in_symbol_file(index):
+    assert index.position("CCC", DATES[1]) == 0
+    assert index.position("EEE", DATES[2]) == 1
+    assert index.position("EEE", DATES[1]) == -1
+
+
+# ----------------------------
+# STORAGE
+# ----------------------------
+def test_save_switches_generations(index, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_index(tmp_path)
+
+    generations = [save_index(index, tmp_path) for _ in range(KEEP_GENERATIONS + 1)]
+
+    assert current_generation(tmp_path) == generations[-1]
+    assert not generations[0].exists()
+    assert sorted(tmp_path.glob("gen-*")) == sorted(generations[1:])
+
+    loaded = load_index(tmp_path)
+    pd.testing.assert_frame_equal(
+        loaded.screen(sessions=3, min_sessions=2, signal_label="Bullish"),
+        index.screen(sessions=3, min_sessions=2, signal_label="Bullish"),
+    )